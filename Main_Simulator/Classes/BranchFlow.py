@@ -0,0 +1,88 @@
+import numpy as np
+
+from Classes.CompiledNetwork import CompiledNetwork
+from Classes.Results import BranchFlowResult
+
+
+class BranchFlowKernel:
+    """
+    Vectorized branch flows of every line and transformer for a bus-voltage vector.
+
+    The per-branch admittances, end buses, current bases and ratings are taken once from a
+    CompiledNetwork; each evaluation is then a handful of array operations over all branches,
+    cheap enough to run after every step of a time-series or contingency study.
+
+    With the power-flow stamps [[y_ff, y_ft], [y_tf, y_tt]] of a branch:
+        I_from = y_ff·V_f + y_ft·V_t,   S_from = V_f·conj(I_from)
+        I_to   = y_tf·V_f + y_tt·V_t,   S_to   = V_t·conj(I_to)
+    and the branch loss is S_from + S_to.
+    """
+
+    def __init__(self, network: CompiledNetwork):
+        self.network = network
+        self.f = np.ascontiguousarray(network.branch_from, dtype=np.intp)
+        self.t = np.ascontiguousarray(network.branch_to, dtype=np.intp)
+
+        stamps = network.branch_stamps["pf"]
+        self.y_ff = np.ascontiguousarray(stamps[:, 0, 0])
+        self.y_ft = np.ascontiguousarray(stamps[:, 0, 1])
+        self.y_tf = np.ascontiguousarray(stamps[:, 1, 0])
+        self.y_tt = np.ascontiguousarray(stamps[:, 1, 1])
+
+        # Per-unit current -> amps at each end: I_base = S_base / (√3 · V_base)
+        kv = network.base_kv
+        self.i_base_from = network.base_power * 1e3 / (np.sqrt(3) * kv[self.f])
+        self.i_base_to = network.base_power * 1e3 / (np.sqrt(3) * kv[self.t])
+
+        # Rated current at each end (A); NaN where the branch has no rating
+        self.rated_from = network.branch_rating * 1e3 / (np.sqrt(3) * kv[self.f])
+        self.rated_to = network.branch_rating * 1e3 / (np.sqrt(3) * kv[self.t])
+
+    @classmethod
+    def from_circuit(cls, circuit):
+        return cls(CompiledNetwork.from_circuit(circuit))
+
+    def currents(self, V):
+        """Per-unit complex currents entering each branch at its from and to ends."""
+        V_f = V[self.f]
+        V_t = V[self.t]
+        return self.y_ff * V_f + self.y_ft * V_t, self.y_tf * V_f + self.y_tt * V_t
+
+    def losses(self, V):
+        """Complex losses of every branch (pu), without the rest of the result."""
+        I_from, I_to = self.currents(V)
+        return V[self.f] * np.conj(I_from) + V[self.t] * np.conj(I_to)
+
+    def total_losses(self, V):
+        """Total complex losses of the network (pu)."""
+        return complex(self.losses(V).sum())
+
+    def compute(self, V):
+        """
+        Branch flows for the complex bus voltages `V` (pu, in the network bus order, e.g.
+        PowerFlowResult.complex_voltage).
+
+        Returns:
+            BranchFlowResult with S_from/S_to in pu, end currents in A and loading in % of the
+            rating (the more loaded end counts).
+        """
+        V = np.asarray(V, dtype=complex)
+        if V.shape != (self.network.num_buses,):
+            raise ValueError(f"Expected {self.network.num_buses} bus voltages, got shape {V.shape}.")
+
+        I_from, I_to = self.currents(V)
+        s_from = V[self.f] * np.conj(I_from)
+        s_to = V[self.t] * np.conj(I_to)
+        i_from = np.abs(I_from) * self.i_base_from
+        i_to = np.abs(I_to) * self.i_base_to
+        with np.errstate(invalid="ignore", divide="ignore"):
+            loading = 100 * np.maximum(i_from / self.rated_from, i_to / self.rated_to)
+
+        names = self.network.bus_names
+        return BranchFlowResult(self.network.branch_names, names[self.f], names[self.t],
+                                s_from, s_to, i_from, i_to, loading)
+
+
+def branch_flows(circuit, V):
+    """One-off branch flows of a Circuit for the complex bus voltages `V` (circuit bus order)."""
+    return BranchFlowKernel.from_circuit(circuit).compute(V)
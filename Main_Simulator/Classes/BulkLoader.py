@@ -0,0 +1,428 @@
+import numpy as np
+import pandas as pd
+
+from Classes.Circuit import Circuit
+from Classes.CompiledNetwork import CompiledNetwork, LINE, TRANSFORMER, PQ, PV, SLACK, line_rating
+from Classes.bus import Bus
+from Classes.bundle import Bundle
+from Classes.conductor import Conductor
+from Classes.geometry import Geometry
+from Classes.CarsonEquations import carson_constants, line_configuration
+from Classes.transformer import Transformer
+from Classes.transmission_line import LINE_MODELS, TransmissionLine, equivalent_pi, line_constants
+
+# Optional columns and their defaults (same defaults as the component constructors)
+LINE_DEFAULTS = {"bundle": None, "geometry": None, "length": 1.0, "r_pu": np.nan, "x_pu": np.nan, "b_pu": 0.0,
+                 "connection_type": "transposed", "zero_seq_model": "enabled", "line_model": "nominal",
+                 "rating_mva": np.nan}
+TRANSFORMER_DEFAULTS = {"primary_connection_type": "wye", "secondary_connection_type": "wye",
+                        "grounding_impedance_ohm_bus1": 0.0, "grounding_impedance_ohm_bus2": 0.0,
+                        "is_grounded_bus1": True, "is_grounded_bus2": True, "tap_ratio": 1.0,
+                        "rating_mva": np.nan}
+GENERATOR_DEFAULTS = {"x1": np.nan, "x2": np.nan, "x0": np.nan, "grounding_impedance_ohm": np.nan,
+                      "is_grounded": True, "connection_type": "wye", "q_min": np.nan, "q_max": np.nan,
+                      "p_min": np.nan, "p_max": np.nan, "cost_c2": np.nan, "cost_c1": np.nan, "cost_c0": np.nan}
+
+BUS_COLUMNS = ["name", "base_kv"]
+LINE_COLUMNS = ["name", "bus1", "bus2"]
+TRANSFORMER_COLUMNS = ["name", "bus1", "bus2", "power_rating", "impedance_percent", "x_over_r_ratio"]
+GENERATOR_COLUMNS = ["name", "bus", "per_unit", "real_power"]
+LOAD_COLUMNS = ["name", "bus", "real_power", "reactive_power"]
+
+
+def read_table(source, columns, defaults=None):
+    """
+    Returns `source` as a DataFrame with the required `columns` and the optional ones filled
+    with `defaults`. `source` may be a DataFrame, a dict of columns, a .csv or a .parquet path,
+    or None for an empty table.
+    """
+    if source is None:
+        table = pd.DataFrame(columns=columns)
+    elif isinstance(source, pd.DataFrame):
+        table = source.reset_index(drop=True)
+    elif isinstance(source, dict):
+        table = pd.DataFrame(source)
+    else:
+        path = str(source)
+        if path.endswith(".parquet") or path.endswith(".pq"):
+            table = pd.read_parquet(path)
+        elif path.endswith(".csv"):
+            table = pd.read_csv(path)
+        else:
+            raise ValueError(f"Unsupported table source '{path}'. Use a DataFrame, dict, .csv or .parquet file.")
+
+    missing = [c for c in columns if c not in table.columns]
+    if missing:
+        raise ValueError(f"Table is missing required columns: {missing}")
+
+    for column, value in (defaults or {}).items():
+        if column not in table.columns:
+            table[column] = value
+        elif value is not None and not pd.isna(value):
+            table[column] = table[column].fillna(value)
+    return table
+
+
+def _library(source, cls, columns, conductors=None):
+    """Returns a dictionary name -> object for conductor/bundle/geometry references."""
+    if source is None:
+        return {}
+    if isinstance(source, dict) and all(isinstance(v, cls) for v in source.values()):
+        return dict(source)
+
+    table = read_table(source, columns)
+    objects = {}
+    for row in table.itertuples(index=False):
+        if cls is Conductor:
+            objects[row.name] = Conductor(row.name, row.diam, row.GMR, row.resistance, row.ampacity)
+        elif cls is Bundle:
+            if row.conductor not in conductors:
+                raise ValueError(f"Bundle '{row.name}' references unknown conductor '{row.conductor}'.")
+            objects[row.name] = Bundle(row.name, int(row.num_conductors), row.spacing, conductors[row.conductor])
+        else:
+            objects[row.name] = Geometry(row.name, row.xa, row.ya, row.xb, row.yb, row.xc, row.yc)
+    return objects
+
+
+def _optional(value):
+    """Converts a table cell to float, mapping missing values to None."""
+    return None if pd.isna(value) else float(value)
+
+
+def _cost(row):
+    """(c2, c1, c0) of a generator row, or None when the row has no cost curve."""
+    coefficients = (row.cost_c2, row.cost_c1, row.cost_c0)
+    if all(pd.isna(c) for c in coefficients):
+        return None
+    return tuple(0.0 if pd.isna(c) else float(c) for c in coefficients)
+
+
+def _stamps(y_ff, y_ft, y_tf, y_tt):
+    """Stacks four (m,) admittance arrays into (m, 2, 2) branch stamps."""
+    return np.stack([np.stack([y_ff, y_ft], axis=-1), np.stack([y_tf, y_tt], axis=-1)], axis=-2)
+
+
+class BulkNetworkLoader:
+    """
+    Builds a network from component tables in one pass instead of one object at a time.
+
+    Tables (DataFrame, dict of columns, .csv or .parquet):
+        buses:        name, base_kv
+        lines:        name, bus1, bus2 and either bundle, geometry, length or r_pu, x_pu [, b_pu]
+                      (system-base per-unit impedances) [, connection_type, zero_seq_model, line_model,
+                      rating_mva]
+        transformers: name, bus1, bus2, power_rating, impedance_percent, x_over_r_ratio
+                      [, primary/secondary_connection_type, grounding_impedance_ohm_bus1/2, is_grounded_bus1/2,
+                      tap_ratio, rating_mva]
+        generators:   name, bus, per_unit, real_power [, x1, x2, x0, grounding_impedance_ohm, is_grounded,
+                      connection_type, q_min, q_max]
+        loads:        name, bus, real_power, reactive_power
+
+    `conductors`, `bundles` and `geometries` are either dictionaries of existing objects or
+    tables (conductors: name, diam, GMR, resistance, ampacity; bundles: name, num_conductors,
+    spacing, conductor; geometries: name, xa, ya, xb, yb, xc, yc). Line impedances and shunts
+    are computed for all lines at once with the TransmissionLine formulas.
+
+    `compile()` goes straight to a CompiledNetwork without creating component objects;
+    `to_circuit()` populates a regular Circuit.
+    """
+
+    def __init__(self, system_settings, buses, lines=None, transformers=None, generators=None, loads=None,
+                 conductors=None, bundles=None, geometries=None):
+        self.settings = system_settings
+        self.buses = read_table(buses, BUS_COLUMNS)
+        self.lines = read_table(lines, LINE_COLUMNS, LINE_DEFAULTS)
+        self.transformers = read_table(transformers, TRANSFORMER_COLUMNS, TRANSFORMER_DEFAULTS)
+        self.generators = read_table(generators, GENERATOR_COLUMNS, GENERATOR_DEFAULTS)
+        self.loads = read_table(loads, LOAD_COLUMNS)
+
+        self.conductors = _library(conductors, Conductor, ["name", "diam", "GMR", "resistance", "ampacity"])
+        self.bundles = _library(bundles, Bundle, ["name", "num_conductors", "spacing", "conductor"],
+                                conductors=self.conductors)
+        self.geometries = _library(geometries, Geometry, ["name", "xa", "ya", "xb", "yb", "xc", "yc"])
+
+        self.bus_index = pd.Index(self.buses["name"])
+        if not self.bus_index.is_unique:
+            raise ValueError("Bus names must be unique.")
+        self.base_kv = self.buses["base_kv"].to_numpy(dtype=float)
+
+    def _lookup_buses(self, names, table):
+        idx = self.bus_index.get_indexer(names)
+        if np.any(idx < 0):
+            unknown = sorted(set(np.asarray(names)[idx < 0]))
+            raise ValueError(f"{table} reference unknown buses: {unknown}")
+        return idx
+
+    def line_parameters(self):
+        """
+        Vectorized series resistance/reactance (Ω) and shunt susceptance (S) of every line.
+        Lines given by bundle/geometry use the TransmissionLine formulas; lines given by
+        per-unit impedances are converted with the base impedance of their buses. The
+        zero-sequence impedance of untransposed bundle/geometry lines comes from Carson's
+        equations, evaluated for all distinct configurations in one batched call.
+
+        Returns:
+            dict with arrays 'from', 'to', 'r', 'x', 'b' and 'z0' (complex Ω, NaN where the
+            zero-sequence impedance follows from r and x).
+        """
+        lines = self.lines
+        f = self._lookup_buses(lines["bus1"], "Lines")
+        t = self._lookup_buses(lines["bus2"], "Lines")
+        if np.any(self.base_kv[f] != self.base_kv[t]):
+            bad = lines["name"][self.base_kv[f] != self.base_kv[t]].tolist()
+            raise ValueError(f"Buses must have the same voltage rating (lines {bad}).")
+
+        r = np.zeros(len(lines))
+        x = np.zeros(len(lines))
+        b = np.zeros(len(lines))
+        z0 = np.full(len(lines), np.nan, dtype=complex)
+
+        geometric = lines["bundle"].notna().to_numpy()
+        per_unit = ~geometric & lines["r_pu"].notna().to_numpy() & lines["x_pu"].notna().to_numpy()
+        if not np.all(geometric | per_unit):
+            bad = lines["name"][~(geometric | per_unit)].tolist()
+            raise ValueError(f"Lines need either bundle/geometry or r_pu/x_pu: {bad}")
+
+        if np.any(geometric):
+            geo = lines[geometric]
+            bundle_names = pd.Index(list(self.bundles))
+            geometry_names = pd.Index(list(self.geometries))
+            b_idx = bundle_names.get_indexer(geo["bundle"])
+            g_idx = geometry_names.get_indexer(geo["geometry"])
+            if np.any(b_idx < 0):
+                raise ValueError(f"Lines reference unknown bundles: {sorted(set(geo['bundle'][b_idx < 0]))}")
+            if np.any(g_idx < 0):
+                raise ValueError(f"Lines reference unknown geometries: {sorted(set(geo['geometry'][g_idx < 0]))}")
+
+            # Shared per-mile constants of each distinct bundle/geometry pair, gathered per line
+            pairs, inverse = np.unique(np.stack([b_idx, g_idx]), axis=1, return_inverse=True)
+            constants = [line_constants(self.bundles[bundle_names[i]], self.geometries[geometry_names[j]],
+                                        self.settings.frequency) for i, j in pairs.T]
+            per_mile = np.array([[c.r, c.x, c.b] for c in constants])[inverse.ravel()]
+
+            length = geo["length"].to_numpy(dtype=float)
+            r[geometric] = per_mile[:, 0] * length
+            x[geometric] = per_mile[:, 1] * length
+            b[geometric] = per_mile[:, 2] * length
+
+            untransposed = geo["connection_type"].to_numpy() == "untransposed"
+            if np.any(untransposed):
+                used = np.unique(inverse.ravel()[untransposed])
+                carson = carson_constants(
+                    line_configuration(self.bundles[bundle_names[i]], self.geometries[geometry_names[j]],
+                                       self.settings.frequency) for i, j in pairs[:, used].T)
+                z0_per_mile = np.zeros(pairs.shape[1], dtype=complex)
+                z0_per_mile[used] = [c.z0 for c in carson]
+                z0[np.flatnonzero(geometric)[untransposed]] = (z0_per_mile[inverse.ravel()] * length)[untransposed]
+
+        if np.any(per_unit):
+            pu = lines[per_unit]
+            z_base = (self.base_kv[f[per_unit]] * 1e3) ** 2 / (self.settings.base_power * 1e6)
+            r[per_unit] = pu["r_pu"].to_numpy(dtype=float) * z_base
+            x[per_unit] = pu["x_pu"].to_numpy(dtype=float) * z_base
+            b[per_unit] = pu["b_pu"].to_numpy(dtype=float) / z_base
+
+        return {"from": f, "to": t, "r": r, "x": x, "b": b, "z0": z0}
+
+    def _line_stamps(self, params):
+        """Per-unit stamps of all lines, same model as TransmissionLine.calc_yprim_pu/calc_yprim_sequence."""
+        kv = self.base_kv[params["from"]]
+        z_base = (kv * 1e3) ** 2 / (self.settings.base_power * 1e6)
+        z_pu = (params["r"] + 1j * params["x"]) / z_base
+        with np.errstate(divide="ignore", invalid="ignore"):
+            y = np.where(z_pu != 0, 1 / z_pu, 0)
+        b_pu = params["b"] * z_base
+
+        # Total shunt of the π; long lines get the exact equivalent π, all at once
+        y_shunt = 1j * b_pu
+        model = self.lines["line_model"].to_numpy()
+        unsupported = ~np.isin(model, LINE_MODELS)
+        if np.any(unsupported):
+            raise ValueError(f"Unsupported line model: {model[unsupported][0]}. Must be 'nominal' or 'long'.")
+        long = model == "long"
+        if np.any(long):
+            z_pi, y_shunt[long] = equivalent_pi(z_pu[long], y_shunt[long])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                y[long] = np.where(z_pi != 0, 1 / z_pi, 0)
+
+        connection = self.lines["connection_type"].to_numpy()
+        unsupported = ~np.isin(connection, ["transposed", "untransposed"])
+        if np.any(unsupported):
+            raise ValueError(f"Unsupported connection type: {connection[unsupported][0]}")
+        z0 = np.where(connection == "untransposed", 2.5, 1.0) * z_pu
+        carson = ~np.isnan(params["z0"])
+        z0[carson] = params["z0"][carson] / z_base[carson]
+        y0 = np.where(self.lines["zero_seq_model"].to_numpy() == "enabled", 1 / z0, 0)
+
+        return {
+            "pf": _stamps(y + y_shunt / 2, -y, -y, y + y_shunt / 2),
+            "positive": _stamps(y, -y, -y, y),
+            "negative": _stamps(y, -y, -y, y),
+            "zero": _stamps(y0, -y0, -y0, y0),
+        }
+
+    def _transformer_stamps(self, f, t):
+        """Per-unit stamps of all transformers, same model as Transformer.calc_yprim_sequence."""
+        tr = self.transformers
+        s_base = self.settings.base_power
+        theta = np.arctan(tr["x_over_r_ratio"].to_numpy(dtype=float))
+        z_pu = (tr["impedance_percent"].to_numpy(dtype=float) / 100 * np.exp(1j * theta)
+                * s_base / tr["power_rating"].to_numpy(dtype=float))
+
+        tap = tr["tap_ratio"].to_numpy(dtype=float)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            y = np.where(np.abs(z_pu) > 1e-9, 1 / z_pu, 0)
+            z_series = np.where(y != 0, 1 / y, np.inf)
+
+            wye1 = tr["primary_connection_type"].str.lower().to_numpy() == "wye"
+            wye2 = tr["secondary_connection_type"].str.lower().to_numpy() == "wye"
+            grounded1 = tr["is_grounded_bus1"].to_numpy(dtype=bool)
+            grounded2 = tr["is_grounded_bus2"].to_numpy(dtype=bool)
+            zn1 = tr["grounding_impedance_ohm_bus1"].to_numpy(dtype=float)
+            zn2 = tr["grounding_impedance_ohm_bus2"].to_numpy(dtype=float)
+
+            # A zero grounding impedance gives Yn = 0 in Transformer, i.e. no zero-sequence path
+            zn1_pu = np.where(zn1 != 0, zn1 / (self.base_kv[f] ** 2 / s_base), np.inf)
+            zn2_pu = np.where(zn2 != 0, zn2 / (self.base_kv[t] ** 2 / s_base), np.inf)
+            y11 = np.where(wye1 & grounded1, 1 / (z_series + zn1_pu), 0)
+            y22 = np.where(wye2 & grounded2, 1 / (z_series + zn2_pu), 0)
+            y_mutual = np.where(wye1 & wye2 & grounded1 & grounded2, -1 / z_series, 0)
+
+        return {
+            "pf": _stamps(y / tap ** 2, -y / tap, -y / tap, y),
+            "positive": _stamps(y / tap ** 2, -y / tap, -y / tap, y),
+            "negative": _stamps(y / tap ** 2, -y / tap, -y / tap, y),
+            "zero": _stamps(y11 / tap ** 2, y_mutual / tap, y_mutual / tap, y22),
+        }
+
+    def _generator_data(self):
+        """
+        Vectorized Generator admittances and the bus bookkeeping of Circuit.add_generator:
+        the first generator makes its bus the slack bus, the others make theirs PV, every
+        generator adds to the power of its bus and the first one of a bus sets its voltage.
+        """
+        gens = self.generators
+        n = len(self.buses)
+        s_sys = self.settings.base_power
+        g_bus = self._lookup_buses(gens["bus"], "Generators")
+        p = gens["real_power"].to_numpy(dtype=float)
+        first_on_bus = ~pd.Series(g_bus).duplicated().to_numpy()
+
+        bus_type = np.full(n, PQ, dtype=np.int8)
+        bus_type[g_bus] = PV
+        if len(g_bus):
+            bus_type[g_bus[0]] = SLACK
+        on_slack = (g_bus == g_bus[0]) & ~first_on_bus if len(g_bus) else np.zeros(0, dtype=bool)
+
+        # Generator.__init__: machine base = system base on the slack bus or for P = 0
+        s_gen = np.where(on_slack | (p == 0), s_sys, p)
+        ratio = s_sys / s_gen
+        x1, x2, x0 = (gens[c].to_numpy(dtype=float) * ratio for c in ("x1", "x2", "x0"))
+        has_x = ~(np.isnan(x1) | np.isnan(x2) | np.isnan(x0))
+
+        grounded = gens["is_grounded"].to_numpy(dtype=bool)
+        zn_ohm = gens["grounding_impedance_ohm"].to_numpy(dtype=float)
+        has_zn = grounded & ~np.isnan(zn_ohm) & (zn_ohm != 0)
+        zn_pu = np.where(has_zn, zn_ohm / (self.base_kv[g_bus] ** 2 / s_gen) * ratio, 0)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            y1 = np.where(has_x & (x1 != 0), 1 / (1j * x1), 0)
+            y2 = np.where(has_x & (x2 != 0), 1 / (1j * x2), 0)
+            y0 = np.where(has_x & grounded, 1 / (3 * zn_pu + 1j * x0), 0)
+
+        p_gen = np.zeros(n)
+        v_set = np.ones(n)
+        np.add.at(p_gen, g_bus, p)
+        v_set[g_bus[first_on_bus]] = gens["per_unit"].to_numpy(dtype=float)[first_on_bus]
+
+        shunts = {"pf": np.zeros(len(g_bus), dtype=complex), "positive": y1, "negative": y2, "zero": y0}
+        return g_bus, shunts, bus_type, p_gen, v_set
+
+    def branch_ratings(self, params):
+        """
+        MVA ratings of the transformers then the lines. An explicit positive rating_mva wins;
+        otherwise transformers use power_rating and bundled lines the ampacity of their bundle.
+        """
+        tr_rating = self.transformers["rating_mva"].to_numpy(dtype=float)
+        tr_rating = np.where(tr_rating > 0, tr_rating, self.transformers["power_rating"].to_numpy(dtype=float))
+
+        line_rating_mva = self.lines["rating_mva"].to_numpy(dtype=float)
+        bundle_ampacity = {name: bd.conductor.ampacity * bd.num_conductors for name, bd in self.bundles.items()}
+        ampacity = self.lines["bundle"].map(bundle_ampacity).to_numpy(dtype=float)
+        from_bundle = line_rating(self.base_kv[params["from"]], ampacity)
+        line_rating_mva = np.where(line_rating_mva > 0, line_rating_mva, from_bundle)
+        return np.concatenate([tr_rating, line_rating_mva])
+
+    def compile(self, name="Bulk Network"):
+        """Builds the CompiledNetwork directly from the tables, without component objects."""
+        n = len(self.buses)
+        params = self.line_parameters()
+        tf = self._lookup_buses(self.transformers["bus1"], "Transformers")
+        tt = self._lookup_buses(self.transformers["bus2"], "Transformers")
+        line_stamps = self._line_stamps(params)
+        transformer_stamps = self._transformer_stamps(tf, tt)
+
+        g_bus, gen_shunts, bus_type, p_gen, v_set = self._generator_data()
+
+        l_bus = self._lookup_buses(self.loads["bus"], "Loads")
+        p_load = np.bincount(l_bus, weights=self.loads["real_power"].to_numpy(dtype=float), minlength=n)
+        q_load = np.bincount(l_bus, weights=self.loads["reactive_power"].to_numpy(dtype=float), minlength=n)
+
+        # Transformers first, then lines (same order as CompiledNetwork.from_circuit)
+        branch_stamps = {seq: np.concatenate([transformer_stamps[seq], line_stamps[seq]]).reshape(-1, 2, 2)
+                         for seq in line_stamps}
+        n_tr, n_line = len(self.transformers), len(self.lines)
+
+        return CompiledNetwork(
+            name, self.settings.base_power, self.settings.frequency,
+            self.buses["name"].to_numpy(dtype=str), self.base_kv, bus_type,
+            p_gen - p_load, -q_load, v_set,
+            np.concatenate([self.transformers["name"].to_numpy(dtype=str), self.lines["name"].to_numpy(dtype=str)]),
+            np.concatenate([np.full(n_tr, TRANSFORMER), np.full(n_line, LINE)]),
+            np.concatenate([tf, params["from"]]), np.concatenate([tt, params["to"]]),
+            branch_stamps,
+            self.generators["name"].to_numpy(dtype=str), g_bus, gen_shunts,
+            branch_rating=self.branch_ratings(params))
+
+    def to_circuit(self, name="Bulk Network"):
+        """Populates a Circuit with component objects; line parameters come from the vectorized pass."""
+        circuit = Circuit(name, self.settings)
+        s_base = self.settings.base_power
+
+        for row in self.buses.itertuples(index=False):
+            circuit.add_bus(Bus(row.name, row.base_kv))
+
+        for row in self.loads.itertuples(index=False):
+            circuit.add_load(row.name, row.bus, row.real_power, row.reactive_power)
+
+        for row in self.generators.itertuples(index=False):
+            circuit.add_generator(row.name, row.bus, per_unit=row.per_unit, real_power=row.real_power,
+                                  x1=_optional(row.x1), x2=_optional(row.x2), x0=_optional(row.x0),
+                                  grounding_impedance_ohm=_optional(row.grounding_impedance_ohm),
+                                  is_grounded=bool(row.is_grounded), connection_type=row.connection_type,
+                                  q_min=_optional(row.q_min), q_max=_optional(row.q_max),
+                                  p_min=_optional(row.p_min), p_max=_optional(row.p_max), cost=_cost(row))
+
+        for row in self.transformers.itertuples(index=False):
+            circuit.add_transformer(Transformer(
+                row.name, circuit.buses[row.bus1], circuit.buses[row.bus2], power_rating=row.power_rating,
+                impedance_percent=row.impedance_percent, x_over_r_ratio=row.x_over_r_ratio, s_base=s_base,
+                primary_connection_type=row.primary_connection_type,
+                secondary_connection_type=row.secondary_connection_type,
+                grounding_impedance_ohm_bus1=row.grounding_impedance_ohm_bus1,
+                grounding_impedance_ohm_bus2=row.grounding_impedance_ohm_bus2,
+                is_grounded_bus1=bool(row.is_grounded_bus1), is_grounded_bus2=bool(row.is_grounded_bus2),
+                tap_ratio=row.tap_ratio, rating_mva=_optional(row.rating_mva)))
+
+        params = self.line_parameters()
+        buses = list(circuit.buses.values())
+        for k, row in enumerate(self.lines.itertuples(index=False)):
+            circuit.add_transmission_line(TransmissionLine.from_parameters(
+                row.name, buses[params["from"][k]], buses[params["to"][k]],
+                self.bundles.get(row.bundle), self.geometries.get(row.geometry), row.length, s_base,
+                self.settings.frequency, float(params["r"][k]), float(params["x"][k]), float(params["b"][k]),
+                connection_type=row.connection_type, zero_seq_model=row.zero_seq_model, line_model=row.line_model,
+                rating_mva=_optional(row.rating_mva)))
+
+        return circuit
@@ -0,0 +1,184 @@
+import math
+import cmath
+
+import numpy as np
+
+# Earth resistivity (Ω·m) of the earth-return path
+EARTH_RESISTIVITY = 100.0
+
+# Symmetrical-component transformation: V_abc = A · V_012
+_a = cmath.exp(2j * math.pi / 3)
+SEQUENCE_MATRIX = np.array([[1, 1, 1], [1, _a ** 2, _a], [1, _a, _a ** 2]], dtype=complex)
+_SEQUENCE_INVERSE = np.linalg.inv(SEQUENCE_MATRIX)
+
+G = 0.1609347e-3  # Ω/mi, μ0/(8π) per mile: the coefficient of Carson's equations
+P_COEFFICIENT = 11.17689  # mi/μF, 1/(2π ε0) per mile
+
+# Subconductor positions (ft) around the bundle center for a spacing of 1 ft: regular polygons
+# with side 1, so that the bundle GMR is the DSL of Bundle.calc_DSL
+_BUNDLE_OFFSETS = {
+    1: np.zeros((1, 2)),
+    2: np.array([[-0.5, 0.0], [0.5, 0.0]]),
+    3: np.array([[0.0, 1 / math.sqrt(3)], [-0.5, -0.5 / math.sqrt(3)], [0.5, -0.5 / math.sqrt(3)]]),
+    4: np.array([[-0.5, -0.5], [0.5, -0.5], [0.5, 0.5], [-0.5, 0.5]]),
+}
+
+
+class CarsonConstants:
+    """
+    Per-mile 3×3 phase impedance matrix z (Ω/mi) and shunt admittance matrix y (S/mi) of a line
+    configuration, phases in a, b, c order, after the bundles and ground wires are reduced out,
+    with the sequence impedance matrix z012 = A⁻¹ z A. `y` is None when the geometry gives no
+    conductor heights above ground. Instances are shared and must not be modified.
+    """
+
+    __slots__ = ("z", "y", "z012")
+
+    def __init__(self, z, y, z012):
+        self.z = z
+        self.y = y
+        self.z012 = z012
+
+    @property
+    def z0(self):
+        """Zero-sequence impedance (Ω/mi)."""
+        return complex(self.z012[0, 0])
+
+    @property
+    def z1(self):
+        """Positive-sequence impedance (Ω/mi)."""
+        return complex(self.z012[1, 1])
+
+    @property
+    def z2(self):
+        """Negative-sequence impedance (Ω/mi)."""
+        return complex(self.z012[2, 2])
+
+    def __repr__(self):
+        return f"CarsonConstants(z0={self.z0:.6g} Ω/mi, z1={self.z1:.6g} Ω/mi, z2={self.z2:.6g} Ω/mi)"
+
+
+def line_configuration(bundle, geometry, frequency, earth_resistivity=EARTH_RESISTIVITY):
+    """
+    Hashable key of a line configuration: the values Carson's equations depend on, so equal
+    conductors/bundles/geometries defined as separate objects resolve to the same entry.
+    """
+    conductor = bundle.conductor
+    ground = geometry.ground_conductor
+    return (int(bundle.num_conductors), float(bundle.spacing),
+            float(conductor.resistance), float(conductor.GMR), float(conductor.radius),
+            (float(geometry.xa), float(geometry.ya), float(geometry.xb), float(geometry.yb),
+             float(geometry.xc), float(geometry.yc)),
+            tuple((float(x), float(y)) for x, y in geometry.ground_wires),
+            () if ground is None else (float(ground.resistance), float(ground.GMR), float(ground.radius)),
+            float(frequency), float(earth_resistivity))
+
+
+_cache = {}
+
+
+def carson_constants(configurations):
+    """
+    Returns the CarsonConstants of every configuration (keys from `line_configuration`), in
+    order. Configurations not computed before are evaluated together: one batch of stacked
+    matrices per bundle size and ground-wire count, however many tower types the model has.
+    Results are cached per configuration.
+    """
+    configurations = list(configurations)
+    missing = list(dict.fromkeys(key for key in configurations if key not in _cache))
+    groups = {}
+    for key in missing:
+        groups.setdefault((key[0], len(key[6])), []).append(key)
+    for (num_conductors, num_ground), keys in groups.items():
+        _cache.update(zip(keys, _evaluate(keys, num_conductors, num_ground)))
+    return [_cache[key] for key in configurations]
+
+
+def _evaluate(keys, num_conductors, num_ground):
+    """Carson's equations and Kron reduction for K configurations of the same shape."""
+    spacing = np.array([key[1] for key in keys])
+    phase_xy = np.array([key[5] for key in keys]).reshape(-1, 3, 2)
+    frequency = np.array([key[8] for key in keys])
+    rho = np.array([key[9] for key in keys])
+
+    # Conductor positions and data (K, N): phase a subconductors, b, c, then the ground wires
+    sub_xy = phase_xy[:, :, None, :] + spacing[:, None, None, None] * _BUNDLE_OFFSETS[num_conductors]
+    xy = sub_xy.reshape(len(keys), -1, 2)
+    phase_data = np.repeat(np.array([key[2:5] for key in keys]), 3 * num_conductors, axis=0)
+    phase_data = phase_data.reshape(len(keys), 3 * num_conductors, 3)
+    if num_ground:
+        xy = np.concatenate([xy, np.array([key[6] for key in keys])], axis=1)
+        ground_data = np.repeat(np.array([key[7] for key in keys]), num_ground, axis=0)
+        phase_data = np.concatenate([phase_data, ground_data.reshape(len(keys), num_ground, 3)], axis=1)
+    resistance, gmr, radius = np.moveaxis(phase_data, 2, 0)
+    x, y = xy[..., 0], xy[..., 1]
+
+    dx = x[:, :, None] - x[:, None, :]
+    distance = np.hypot(dx, y[:, :, None] - y[:, None, :])
+    image = np.hypot(dx, y[:, :, None] + y[:, None, :])
+    diag = np.arange(x.shape[1])
+
+    # Carson's equations (Kersting): z_ij = 4ωP_ij·G + j2ωG·(ln(S_ij/D_ij) + 2Q_ij), D_ii = GMR_i.
+    # The full series terms need the image distances S_ij; without heights (y = 0) only their
+    # first terms are kept, in which S_ij cancels (the modified Carson's equations).
+    omega = 2 * np.pi * frequency[:, None, None]
+    root = np.sqrt(frequency / rho)[:, None, None]
+    distance[:, diag, diag] = gmr
+    P = np.full(distance.shape, np.pi / 8)
+    L = np.log(1 / distance) - 0.0772 + np.log(2 / (8.565e-4 * root))
+    heights = np.all(y > 0, axis=1)
+    if np.any(heights):
+        S = image[heights]
+        k = 8.565e-4 * S * root[heights]
+        cos = (y[heights][:, :, None] + y[heights][:, None, :]) / S
+        cos2 = 2 * cos ** 2 - 1
+        P[heights] += -k * cos / (3 * math.sqrt(2)) + k ** 2 / 16 * cos2 * (0.6728 + np.log(2 / k))
+        Q = -0.0386 + 0.5 * np.log(2 / k) + k * cos / (3 * math.sqrt(2))
+        L[heights] = np.log(S / distance[heights]) + 2 * Q
+    z = 4 * omega * P * G + 2j * omega * G * L
+    z[:, diag, diag] += resistance
+
+    # Potential coefficients with the conductor images, D_ii = radius (only with heights)
+    potential = None
+    if np.any(heights):
+        distance[:, diag, diag] = radius
+        potential = P_COEFFICIENT * np.log(image[heights] / distance[heights])
+
+    z = _reduce(z, num_conductors)
+    shunt = [None] * len(keys)
+    if potential is not None:
+        capacitance = np.linalg.inv(_reduce(potential, num_conductors))
+        y_shunt = 2j * np.pi * frequency[heights, None, None] * 1e-6 * capacitance
+        for k, value in zip(np.flatnonzero(heights), y_shunt):
+            value.flags.writeable = False
+            shunt[k] = value
+    z012 = _SEQUENCE_INVERSE @ z @ SEQUENCE_MATRIX
+
+    # Read-only stacks, so that the per-configuration views are read-only as well
+    z.flags.writeable = False
+    z012.flags.writeable = False
+    return [CarsonConstants(z[k], shunt[k], z012[k]) for k in range(len(keys))]
+
+
+def _reduce(matrix, num_conductors):
+    """
+    Reduces stacked (K, N, N) conductor matrices to the three phases. The subconductors of a
+    bundle share one voltage (their differences to the first subconductor are zero) and the
+    ground wires are at ground potential, so both are Kron-eliminated:
+        M' = T M Tᵀ,  M_red = M'_kk - M'_ke M'_ee⁻¹ M'_ek
+    """
+    n = matrix.shape[1]
+    transform = np.eye(n)
+    for phase in range(3):
+        first = phase * num_conductors
+        transform[first + 1:first + num_conductors, first] = -1
+    matrix = transform @ matrix @ transform.T
+
+    keep = np.arange(3) * num_conductors
+    eliminate = np.setdiff1d(np.arange(n), keep)
+    reduced = matrix[:, keep][:, :, keep]
+    if len(eliminate):
+        coupling = matrix[:, keep][:, :, eliminate]
+        reduced = reduced - coupling @ np.linalg.solve(matrix[:, eliminate][:, :, eliminate],
+                                                       matrix[:, eliminate][:, :, keep])
+    return reduced
@@ -0,0 +1,393 @@
+import csv
+import re
+
+import numpy as np
+import pandas as pd
+
+from Classes.BulkLoader import BulkNetworkLoader
+from Classes.system_setting import SystemSettings
+
+# Branches with a smaller impedance are treated as jumpers; the component models turn a zero
+# impedance into a zero admittance (an open branch), so jumpers get this reactance instead.
+MIN_IMPEDANCE_PU = 1e-4
+
+_MATPOWER_SECTION = re.compile(r"^\s*mpc\.(\w+)\s*=\s*(.*)$")
+
+
+def _open_text(path):
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+def _clamp_impedance(r, x):
+    """Replaces (near) zero series impedances by MIN_IMPEDANCE_PU reactance."""
+    r = np.asarray(r, dtype=float)
+    x = np.asarray(x, dtype=float)
+    jumper = np.hypot(r, x) < MIN_IMPEDANCE_PU
+    return np.where(jumper, 0.0, r), np.where(jumper, MIN_IMPEDANCE_PU, x)
+
+
+def _transformer_table(names, f_names, t_names, r, x, tap, s_base, rating=np.nan):
+    """Transformer table rows for per-unit (system base) impedances."""
+    r, x = _clamp_impedance(r, x)
+    with np.errstate(divide="ignore"):
+        x_over_r = np.where(r != 0, x / np.where(r != 0, r, 1), np.inf * np.sign(x))
+    return pd.DataFrame({
+        "name": names, "bus1": f_names, "bus2": t_names,
+        "power_rating": np.full(len(names), float(s_base)),
+        "impedance_percent": 100 * np.hypot(r, x),
+        "x_over_r_ratio": x_over_r,
+        "tap_ratio": tap,
+        "rating_mva": rating,
+    })
+
+
+def _branch_names(f_names, t_names, ids):
+    """Unique branch names 'from-to-id'."""
+    return [f"{a}-{b}-{c}" for a, b, c in zip(f_names, t_names, ids)]
+
+
+def _generator_table(bus_names, p, v_set, slack_buses, q_max=np.nan, q_min=np.nan, p_max=np.nan, p_min=np.nan,
+                     cost=None):
+    """
+    Generator rows with the slack-bus generator first so that Circuit.add_generator makes it
+    the slack. Units with cost curves (c2, c1, c0 columns of `cost`) are kept one row each,
+    named 'G<bus>', 'G<bus>-2', ... on a bus with several, so that a dispatch sees every
+    curve and its limits. Without costs the units of a bus are merged into one row 'G<bus>'
+    with their real power and limits added up.
+    """
+    gens = pd.DataFrame({"bus": bus_names, "real_power": p, "per_unit": v_set, "q_max": q_max, "q_min": q_min,
+                         "p_max": p_max, "p_min": p_min})
+    costs = ["cost_c2", "cost_c1", "cost_c0"]
+    gens[costs] = np.nan if cost is None else np.asarray(cost, dtype=float)
+    if gens[costs].notna().all(axis=1).any():
+        unit = gens.groupby("bus", sort=False).cumcount().to_numpy() + 1
+        suffix = np.where(unit > 1, "-" + unit.astype(str), "")
+        gens.insert(0, "name", "G" + gens["bus"].astype(str) + suffix)
+    else:
+        limits = ["q_max", "q_min", "p_max", "p_min"]
+        unlimited = gens[limits].isna().groupby(gens["bus"], sort=False).any()
+        gens = gens.groupby("bus", sort=False).agg(real_power=("real_power", "sum"), per_unit=("per_unit", "first"),
+                                                    **{c: (c, "sum") for c in limits},
+                                                    **{c: (c, "first") for c in costs})
+        gens[limits] = gens[limits].mask(unlimited)
+        gens = gens.reset_index()
+        gens.insert(0, "name", "G" + gens["bus"].astype(str))
+    slack = gens["bus"].isin(slack_buses)
+    gens = gens.loc[slack.sort_values(ascending=False, kind="stable").index]
+    return gens.reset_index(drop=True)
+
+
+def _polynomial_costs(gencost, n_gen):
+    """
+    (c2, c1, c0) per generator from MATPOWER gencost rows. Only polynomial costs (model 2) of
+    up to second order are taken; other rows, and generators without a row, get NaN.
+    """
+    cost = np.full((n_gen, 3), np.nan)
+    for i, row in enumerate(gencost[:n_gen]):
+        row = [float(v) for v in row]
+        if len(row) < 4 or int(row[0]) != 2:
+            continue
+        n = int(row[3])
+        coefficients = row[4:4 + n]
+        if len(coefficients) != n or n > 3:
+            continue
+        cost[i] = [0.0] * (3 - n) + coefficients
+    return cost
+
+
+def _iter_matpower_rows(path):
+    """
+    Streams a MATPOWER case file, yielding (section, row) for every matrix row and
+    ('baseMVA', value) for the base power. The file is read line by line.
+    """
+    section = None
+    with _open_text(path) as f:
+        for line in f:
+            line = line.split("%", 1)[0]
+            if section is None:
+                m = _MATPOWER_SECTION.match(line)
+                if not m:
+                    continue
+                name, rest = m.group(1), m.group(2)
+                if "[" not in rest:
+                    if name == "baseMVA":
+                        yield "baseMVA", float(rest.strip().rstrip(";"))
+                    continue
+                section = name
+                line = rest.split("[", 1)[1]
+
+            closed = "]" in line
+            if closed:
+                line = line.split("]", 1)[0]
+            for row in line.split(";"):
+                values = row.replace(",", " ").split()
+                if values:
+                    yield section, values
+            if closed:
+                section = None
+
+
+def read_matpower(path, frequency=60):
+    """
+    Imports a MATPOWER (.m) case into a BulkNetworkLoader.
+
+    Buses are named by their MATPOWER number. Branches with a tap ratio or between different
+    voltage levels become transformers (system-base impedance, off-nominal tap); the others
+    become lines with per-unit r, x, b. The reference-bus generator is placed first so it
+    becomes the slack; real power limits and polynomial gencost curves are kept for dispatch
+    studies, one generator per unit (units on the same bus are merged when the case has no
+    gencost). Isolated buses and
+    out-of-service equipment are skipped. Bus shunts and phase-shift angles are not modelled.
+    """
+    base_mva = 100.0
+    rows = {"bus": [], "gen": [], "branch": [], "gencost": []}
+    widths = {"bus": 13, "gen": 10, "branch": 13, "gencost": None}
+    for section, values in _iter_matpower_rows(path):
+        if section == "baseMVA":
+            base_mva = values
+        elif section in rows:
+            rows[section].append(values[:widths[section]])
+
+    bus = np.array(rows["bus"], dtype=float).reshape(-1, 13)
+    gen = np.array(rows["gen"], dtype=float).reshape(-1, 10)
+    gen_cost = _polynomial_costs(rows["gencost"], len(gen))
+    branch = np.array([r[:11] for r in rows["branch"]], dtype=float).reshape(-1, 11)
+    settings = SystemSettings(frequency=frequency, base_power=base_mva)
+
+    # Drop isolated buses (type 4), out-of-service equipment and anything attached to them
+    isolated = bus[bus[:, 1] == 4, 0]
+    bus = bus[bus[:, 1] != 4]
+    in_service = (gen[:, 7] > 0) & ~np.isin(gen[:, 0], isolated)
+    gen, gen_cost = gen[in_service], gen_cost[in_service]
+    branch = branch[(branch[:, 10] > 0) & ~np.isin(branch[:, 0], isolated) & ~np.isin(branch[:, 1], isolated)]
+
+    bus_names = bus[:, 0].astype(int).astype(str)
+    base_kv = np.where(bus[:, 9] > 0, bus[:, 9], 1.0)  # some cases leave baseKV at 0
+    kv = dict(zip(bus_names, base_kv))
+    buses = pd.DataFrame({"name": bus_names, "base_kv": base_kv})
+
+    has_load = (bus[:, 2] != 0) | (bus[:, 3] != 0)
+    loads = pd.DataFrame({"name": "L" + bus_names[has_load], "bus": bus_names[has_load],
+                          "real_power": bus[has_load, 2], "reactive_power": bus[has_load, 3]})
+
+    generators = _generator_table(gen[:, 0].astype(int).astype(str), gen[:, 1], gen[:, 5],
+                                  set(bus_names[bus[:, 1] == 3]), q_max=gen[:, 3], q_min=gen[:, 4],
+                                  p_max=gen[:, 8], p_min=gen[:, 9], cost=gen_cost)
+
+    f_names = branch[:, 0].astype(int).astype(str)
+    t_names = branch[:, 1].astype(int).astype(str)
+    # Parallel branches are numbered 1, 2, ... like PSS/E circuit ids
+    ids = pd.DataFrame({"f": f_names, "t": t_names}).groupby(["f", "t"]).cumcount().to_numpy() + 1
+    names = np.array(_branch_names(f_names, t_names, ids))
+
+    kv_f = np.array([kv[b] for b in f_names])
+    kv_t = np.array([kv[b] for b in t_names])
+    is_transformer = (branch[:, 8] != 0) | (kv_f != kv_t)
+    tap = np.where(branch[:, 8] != 0, branch[:, 8], 1.0)
+
+    r, x = _clamp_impedance(branch[~is_transformer, 2], branch[~is_transformer, 3])
+    lines = pd.DataFrame({"name": names[~is_transformer], "bus1": f_names[~is_transformer],
+                          "bus2": t_names[~is_transformer], "r_pu": r, "x_pu": x,
+                          "b_pu": branch[~is_transformer, 4], "rating_mva": branch[~is_transformer, 5]})
+    transformers = _transformer_table(names[is_transformer], f_names[is_transformer], t_names[is_transformer],
+                                      branch[is_transformer, 2], branch[is_transformer, 3], tap[is_transformer],
+                                      base_mva, branch[is_transformer, 5])
+
+    return BulkNetworkLoader(settings, buses, lines=lines, transformers=transformers,
+                             generators=generators, loads=loads)
+
+
+def _split_record(line):
+    """Splits a PSS/E RAW record into fields, dropping the '/' comment and quotes."""
+    if "/" in line:
+        quoted = False
+        for i, ch in enumerate(line):
+            if ch == "'":
+                quoted = not quoted
+            elif ch == "/" and not quoted:
+                line = line[:i]
+                break
+    if "'" in line:
+        fields = next(csv.reader([line], quotechar="'", skipinitialspace=True))
+    else:
+        fields = line.split(",")
+    return [field.strip() for field in fields]
+
+
+def _is_terminator(line):
+    """True for the '0 / END OF ... DATA' and 'Q' records that close a RAW section."""
+    head = line.split("/", 1)[0].strip().rstrip(",").strip()
+    return head in ("0", "Q")
+
+
+def _field(fields, i, default=0.0):
+    """Numeric field `i` of a record, with PSS/E default for blank or missing fields."""
+    if i < len(fields) and fields[i] != "":
+        return float(fields[i])
+    return default
+
+
+# Section order of the RAW formats that are supported
+_RAW_SECTIONS = {
+    33: ["bus", "load", "fixed_shunt", "generator", "branch", "transformer"],
+    34: ["system", "bus", "load", "fixed_shunt", "generator", "branch", "switching_device", "transformer"],
+    35: ["system", "bus", "load", "fixed_shunt", "generator", "branch", "switching_device", "transformer"],
+}
+
+
+def read_psse_raw(path):
+    """
+    Imports a PSS/E RAW case (revisions 33 to 35) into a BulkNetworkLoader.
+
+    The file is parsed line by line and only the bus, load, generator, branch and transformer
+    sections are read. Buses are named by their number; isolated buses (type 4) and
+    out-of-service equipment are skipped. Constant-current and constant-admittance load parts
+    are added at 1 p.u. voltage. Two-winding transformers keep their off-nominal ratio;
+    three-winding transformers are replaced by a star bus and three two-winding units.
+    Fixed shunts and phase-shift angles are not modelled.
+    """
+    buses, loads, gens, branches, xfmrs = [], [], [], [], []
+
+    with _open_text(path) as f:
+        header = _split_record(f.readline())
+        s_base = _field(header, 1, 100.0)
+        rev = int(_field(header, 2, 33))
+        frequency = _field(header, 5, 60.0)
+        if rev not in _RAW_SECTIONS:
+            raise ValueError(f"Unsupported PSS/E RAW revision {rev}; supported: {sorted(_RAW_SECTIONS)}.")
+        sections = _RAW_SECTIONS[rev]
+
+        f.readline()  # two case identification lines
+        f.readline()
+
+        section = 0
+        while section < len(sections):
+            line = f.readline()
+            if not line:
+                break
+            if _is_terminator(line):
+                section += 1
+                continue
+
+            name = sections[section]
+            if name == "system":
+                continue
+            fields = _split_record(line)
+
+            if name == "bus":
+                if int(_field(fields, 3, 1)) != 4:
+                    buses.append((fields[0], _field(fields, 2), int(_field(fields, 3, 1))))
+            elif name == "load":
+                if int(_field(fields, 2, 1)):
+                    p = _field(fields, 5) + _field(fields, 7) + _field(fields, 9)
+                    q = _field(fields, 6) + _field(fields, 8) - _field(fields, 10)
+                    loads.append((fields[0], fields[1], p, q))
+            elif name == "generator":
+                status = 15 if rev >= 34 else 14
+                if int(_field(fields, status, 1)):
+                    pt = 17 if rev >= 34 else 16
+                    gens.append((fields[0], _field(fields, 2), _field(fields, 6, 1.0),
+                                 _field(fields, 4, np.nan), _field(fields, 5, np.nan),
+                                 _field(fields, pt, np.nan), _field(fields, pt + 1, np.nan)))
+            elif name == "branch":
+                status = 23 if rev >= 34 else 13
+                if int(_field(fields, status, 1)):
+                    branches.append((fields[0], fields[1], fields[2], _field(fields, 3), _field(fields, 4),
+                                     _field(fields, 5), _field(fields, 6 if rev < 34 else 7)))
+            elif name == "transformer":
+                three_winding = int(_field(fields, 2)) != 0
+                records = [fields] + [_split_record(f.readline()) for _ in range(4 if three_winding else 3)]
+                if int(_field(fields, 11, 1)):
+                    xfmrs.append(records)
+
+    settings = SystemSettings(frequency=frequency, base_power=s_base)
+    bus_table = pd.DataFrame(buses, columns=["name", "base_kv", "type"])
+    bus_table["base_kv"] = bus_table["base_kv"].where(bus_table["base_kv"] > 0, 1.0)
+    kv = dict(zip(bus_table["name"], bus_table["base_kv"]))
+
+    load_table = pd.DataFrame(loads, columns=["bus", "id", "real_power", "reactive_power"])
+    load_table = load_table[load_table["bus"].isin(kv)]
+    load_table.insert(0, "name", "L" + load_table["bus"] + "-" + load_table["id"])
+
+    gen_table = pd.DataFrame(gens, columns=["bus", "real_power", "per_unit", "q_max", "q_min", "p_max", "p_min"])
+    gen_table = gen_table[gen_table["bus"].isin(kv)]
+    generators = _generator_table(gen_table["bus"].to_numpy(), gen_table["real_power"].to_numpy(),
+                                  gen_table["per_unit"].to_numpy(),
+                                  set(bus_table["name"][bus_table["type"] == 3]),
+                                  q_max=gen_table["q_max"].to_numpy(), q_min=gen_table["q_min"].to_numpy(),
+                                  p_max=gen_table["p_max"].to_numpy(), p_min=gen_table["p_min"].to_numpy())
+
+    br = pd.DataFrame(branches, columns=["bus1", "bus2", "ckt", "r_pu", "x_pu", "b_pu", "rating_mva"])
+    br = br[br["bus1"].isin(kv) & br["bus2"].isin(kv)]
+    br.insert(0, "name", _branch_names(br["bus1"], br["bus2"], br["ckt"]))
+    kv_f = br["bus1"].map(kv).to_numpy()
+    kv_t = br["bus2"].map(kv).to_numpy()
+    off_nominal = kv_f != kv_t
+    br["r_pu"], br["x_pu"] = _clamp_impedance(br["r_pu"], br["x_pu"])
+    lines = br[~off_nominal].drop(columns="ckt")
+
+    # Two-winding units as (name, from, to, r, x, tap) on the system base
+    units = [(r.name, r.bus1, r.bus2, r.r_pu, r.x_pu, 1.0) for r in br[off_nominal].itertuples(index=False)]
+    bus_table = bus_table.drop(columns="type")
+    star_buses = []
+    for records in xfmrs:
+        units.extend(_psse_transformer_units(records, kv, s_base, star_buses))
+    if star_buses:
+        bus_table = pd.concat([bus_table, pd.DataFrame(star_buses, columns=["name", "base_kv"])], ignore_index=True)
+
+    transformers = _transformer_table([u[0] for u in units], [u[1] for u in units], [u[2] for u in units],
+                                      [u[3] for u in units], [u[4] for u in units], [u[5] for u in units], s_base)
+
+    return BulkNetworkLoader(settings, bus_table, lines=lines, transformers=transformers,
+                             generators=generators, loads=load_table)
+
+
+def _psse_transformer_units(records, kv, s_base, star_buses):
+    """Converts one RAW transformer record group to two-winding units on the system base."""
+    head, z = records[0], records[1]
+    windings = [head[0], head[1]] + ([head[2]] if head[2] not in ("", "0") else [])
+    if any(w not in kv for w in windings):
+        return []
+    cw = int(_field(head, 4, 1))
+    cz = int(_field(head, 5, 1))
+    ckt = head[3] or "1"
+
+    def winding_ratio(record, bus):
+        windv = _field(record, 0, 1.0)
+        nomv = _field(record, 1, 0.0) or kv[bus]
+        if cw == 2:
+            return windv / kv[bus]
+        if cw == 3:
+            return windv * nomv / kv[bus]
+        return windv
+
+    def impedance(r, x, winding_base):
+        if cz == 3:
+            # r is the load loss in W, x the impedance magnitude, both on the winding base
+            r = r / 1e6 / winding_base
+            x = np.sqrt(max(x ** 2 - r ** 2, 0.0))
+        if cz in (2, 3):
+            scale = s_base / winding_base
+            return r * scale, x * scale
+        return r, x
+
+    if len(windings) == 2:
+        r, x = impedance(_field(z, 0), _field(z, 1), _field(z, 2, s_base))
+        tap = winding_ratio(records[2], windings[0]) / winding_ratio(records[3], windings[1])
+        return [(f"{windings[0]}-{windings[1]}-{ckt}", windings[0], windings[1], r, x, tap)]
+
+    # Three-winding: star equivalent Z1 = (Z12 + Z31 - Z23) / 2, ...
+    z12 = complex(*impedance(_field(z, 0), _field(z, 1), _field(z, 2, s_base)))
+    z23 = complex(*impedance(_field(z, 3), _field(z, 4), _field(z, 5, s_base)))
+    z31 = complex(*impedance(_field(z, 6), _field(z, 7), _field(z, 8, s_base)))
+    z_star = [(z12 + z31 - z23) / 2, (z12 + z23 - z31) / 2, (z23 + z31 - z12) / 2]
+
+    star = f"{'-'.join(windings)}-{ckt}*"
+    star_buses.append((star, kv[windings[0]]))
+    kv[star] = kv[windings[0]]
+    units = []
+    for k, (bus, zk) in enumerate(zip(windings, z_star)):
+        tap = winding_ratio(records[2 + k], bus)
+        # Tap on the winding side: the unit goes winding -> star
+        units.append((f"{star}{k + 1}", bus, star, zk.real, zk.imag, tap))
+    return units
@@ -1,10 +1,12 @@
 import numpy as np
-import pandas as pd
 from Classes.transformer import Transformer
 from Classes.transmission_line import TransmissionLine
 from Classes.generator import Generator
-from Classes.load import Load
+from Classes.load import Load, UnbalancedLoad
 from Classes.system_setting import SystemSettings
+from Classes.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
 
 
 class Circuit:
@@ -21,13 +23,21 @@ class Circuit:
         self.generators = {}  # Stores Generator objects
         self.loads = {}  # Stores Load objects
         self.first_generator_added = False
+        self._fork_base = None  # Shared by the forks of this circuit (see fork)
 
         self.ybus: pd.DataFrame = None  # Explicitly hinting it's a DataFrame
 
     def add_bus(self, bus):
-        """Adds a bus object to the circuit. Raises an error if the bus already exists."""
+        """
+        Adds a bus object to the circuit and assigns its index (the next position in this
+        circuit). Raises an error if the bus already exists. A bus keeps the index of the first
+        circuit it is added to (derived circuits such as ReducedCircuit share their parent's
+        buses); use `bus_index()` for the positions within a given circuit.
+        """
         if bus.name in self.buses:
             raise ValueError(f"Bus '{bus.name}' already exists in the circuit.")
+        if bus.index is None:
+            bus.index = len(self.buses)
         self.buses[bus.name] = bus
         self.bus_type[bus.name] = bus.bus_type
 
@@ -51,21 +61,34 @@ class Circuit:
         self.loads[name] = Load(name, self.buses[bus], real_power, reactive_power)
         self.buses[bus].real_power -= real_power
         self.buses[bus].reactive_power -= reactive_power
-
-        if not hasattr(self.buses[bus], 'loads'):
-            self.buses[bus].loads = []
         self.buses[bus].loads.append(self.loads[name])
 
+    def add_unbalanced_load(self, name: str, bus: str, real_power, reactive_power, connection="wye"):
+        """
+        Adds a constant-power load given per phase (MW / Mvar for phases a, b, c, or for the
+        phase pairs ab, bc, ca when delta-connected) for the three-phase power flow. The
+        balanced solvers see its three-phase totals.
+        """
+        if name in self.loads:
+            raise ValueError(f"Load '{name}' already exists in the circuit.")
+        load = UnbalancedLoad(name, self.buses[bus], real_power, reactive_power, connection)
+        self.loads[name] = load
+        self.buses[bus].real_power -= load.real_power
+        self.buses[bus].reactive_power -= load.reactive_power
+        self.buses[bus].loads.append(load)
+
 
     def add_generator(self, name: str, bus: str, per_unit: float, real_power: float,
-                      x1=None, x2=None, x0=None, grounding_impedance_ohm=None, is_grounded=True, connection_type="wye"):
+                      x1=None, x2=None, x0=None, grounding_impedance_ohm=None, is_grounded=True, connection_type="wye",
+                      verbose=False, q_min=None, q_max=None, p_min=None, p_max=None, cost=None):
         if name in self.generators:
             raise ValueError(f"Generator '{name}' already exists in the circuit.")
 
         generator = Generator(name, self.buses[bus], real_power, per_unit,
                               x1=x1, x2=x2, x0=x0, system_settings=self.settings,
                               grounding_impedance_ohm=grounding_impedance_ohm,
-                              is_grounded=is_grounded, connection_type=connection_type
+                              is_grounded=is_grounded, connection_type=connection_type,
+                              q_min=q_min, q_max=q_max, p_min=p_min, p_max=p_max, cost=cost
                               )
         self.generators[name] = generator
 
@@ -79,7 +102,28 @@ class Circuit:
         elif self.buses[bus].bus_type != "Slack Bus":
             self.buses[bus].bus_type = "PV Bus"
 
-        print(f"[DEBUG] Added generator '{name}' to {bus} → P = {real_power}")
+        if verbose:
+            print(f"[DEBUG] Added generator '{name}' to {bus} → P = {real_power}")
+
+    def set_load(self, name, real_power=None, reactive_power=None):
+        """Changes the power (MW / Mvar) of a load and the injection of its bus."""
+        if name not in self.loads:
+            raise ValueError(f"Load '{name}' not found in circuit '{self.name}'.")
+        load = self.loads[name]
+        if real_power is not None:
+            load.bus.real_power -= real_power - load.real_power
+            load.real_power = real_power
+        if reactive_power is not None:
+            load.bus.reactive_power -= reactive_power - load.reactive_power
+            load.reactive_power = reactive_power
+
+    def set_generation(self, name, real_power):
+        """Changes the real-power setpoint (MW) of a generator and the injection of its bus."""
+        if name not in self.generators:
+            raise ValueError(f"Generator '{name}' not found in circuit '{self.name}'.")
+        generator = self.generators[name]
+        generator.bus.real_power += real_power - generator.real_power
+        generator.real_power = real_power
 
     def update_bus_data(self):
         self.bus_type = {}
@@ -100,41 +144,50 @@ class Circuit:
             elif self.buses[b].bus_type == "PV Bus":
                 self.num_PV_buses += 1
 
-            print(f"[TRACE] During update: {b} classified as {self.buses[b].bus_type}")
+    def branch_stamps(self, sequence="pf"):
+        """
+        Integer bus indices (from, to) and the stacked (m, 2, 2) per-unit stamps of all
+        transformers and transmission lines, in that order, for one sequence
+        ("pf", "positive", "negative" or "zero").
+        """
+        index = self.bus_index()
+        branches = [*self.transformers.values(), *self.transmission_lines.values()]
+        f = np.array([index[branch.bus1.name] for branch in branches], dtype=np.intp)
+        t = np.array([index[branch.bus2.name] for branch in branches], dtype=np.intp)
+        stamps = np.array([branch.stamps[sequence] for branch in branches], dtype=complex).reshape(-1, 2, 2)
+        return f, t, stamps
+
+    def assemble_ybus(self, sequence="pf"):
+        """
+        Dense per-unit Ybus (labelled DataFrame) of one sequence from the branch stamps and the
+        generator shunts. Contributions are accumulated component by component, in the order
+        the components were added.
+        """
+        bus_names = list(self.buses.keys())
+        index = self.bus_index()
+        ybus = np.zeros((len(bus_names), len(bus_names)), dtype=complex)
+
+        f, t, stamps = self.branch_stamps(sequence)
+        rows = np.stack([f, f, t, t], axis=1).ravel()
+        cols = np.stack([f, t, f, t], axis=1).ravel()
+        np.add.at(ybus, (rows, cols), stamps.ravel())
+
+        for gen in self.generators.values():
+            shunt = gen.shunts[sequence]
+            if shunt != 0:
+                k = index[gen.bus.name]
+                ybus[k, k] += shunt
+
+        return pd.DataFrame(ybus, index=bus_names, columns=bus_names)
 
     def calc_ybus(self):
         """Computes the system-wide Ybus admittance matrix in per-unit."""
-        num_buses = len(self.buses)
-        bus_names = list(self.buses.keys())
-        # Initialize the Ybus matrix as an N x N zero matrix
-        self.ybus = pd.DataFrame(np.zeros((num_buses, num_buses), dtype=complex), index=bus_names, columns=bus_names)
-
-        # Accumulate contributions from all transformers
-        for transformer in self.transformers.values():
-            yprim_pu = transformer.yprim_pu  # Ensure using per-unit values
-            if not isinstance(yprim_pu, pd.DataFrame):
-                raise TypeError(f"{transformer.name} yprim_pu is not a DataFrame!")
-            bus1, bus2 = transformer.bus1.name, transformer.bus2.name
-            self.ybus.loc[bus1, bus1] += yprim_pu.loc[bus1, bus1]
-            self.ybus.loc[bus2, bus2] += yprim_pu.loc[bus2, bus2]
-            self.ybus.loc[bus1, bus2] += yprim_pu.loc[bus1, bus2]  # Off-diagonal term
-            self.ybus.loc[bus2, bus1] += yprim_pu.loc[bus2, bus1]  # Mutual admittance (negative)
-
-        # Accumulate contributions from all transmission lines
-        for line in self.transmission_lines.values():
-            yprim_pu = line.yprim_pu  # Ensure using per-unit values
-            if not isinstance(yprim_pu, pd.DataFrame):
-                raise TypeError(f"{line.name} yprim_pu is not a DataFrame!")
-            bus1, bus2 = line.bus1.name, line.bus2.name
-            self.ybus.loc[bus1, bus1] += yprim_pu.loc[bus1, bus1]
-            self.ybus.loc[bus2, bus2] += yprim_pu.loc[bus2, bus2]
-            self.ybus.loc[bus1, bus2] += yprim_pu.loc[bus1, bus2]  # Off-diagonal term
-            self.ybus.loc[bus2, bus1] += yprim_pu.loc[bus2, bus1]  # Mutual admittance (negative)
+        self.ybus = self.assemble_ybus("pf")
 
         # Ensure numerical stability by checking that all buses have self-admittance entries
-        for bus in bus_names:
-            if self.ybus.loc[bus, bus] == 0:
-                raise ValueError(f"Numerical instability detected: Bus {bus} has no self-admittance.")
+        missing = np.flatnonzero(np.diag(self.ybus.values) == 0)
+        if len(missing):
+            raise ValueError(f"Numerical instability detected: Bus {self.ybus.index[missing[0]]} has no self-admittance.")
 
         return self.ybus
 
@@ -142,101 +195,70 @@ class Circuit:
         """Constructs the Ybus matrix for symmetrical fault analysis (positive-sequence only),
         including generator subtransient admittances.
         """
-        bus_names = list(self.buses.keys())
-        Ybus_aug = pd.DataFrame(0j, index=bus_names, columns=bus_names)
-
-
-        for transformer in self.transformers.values():
-            yprim = transformer.calc_yprim_sequence("positive")
-            if yprim is not None:
-                for i in yprim.index:
-                    for j in yprim.columns:
-                        Ybus_aug.loc[i, j] += yprim.loc[i, j]
-
-
-        for line in self.transmission_lines.values():
-            yprim = line.calc_yprim_sequence("positive")
-            if yprim is not None:
-                for i in yprim.index:
-                    for j in yprim.columns:
-                        Ybus_aug.loc[i, j] += yprim.loc[i, j]
-
-
-        for gen in self.generators.values():
-            gen.calc_admittances()  # Ensure admittances are calculated
-
-            if gen.Y1 is not None:
-                bus_name = gen.bus.name
-                if bus_name not in Ybus_aug.index:
-                    raise ValueError(f"Bus {bus_name} not in Ybus index!")
-                Ybus_aug.loc[bus_name, bus_name] += gen.Y1
-
-
-        return Ybus_aug
+        return self.assemble_ybus("positive")
 
     def calc_ybus_negative(self):
         """Constructs the negative-sequence Ybus matrix."""
-        bus_names = list(self.buses.keys())
-        Ybus_neg = pd.DataFrame(0j, index=bus_names, columns=bus_names)
+        return self.assemble_ybus("negative")
 
-        # Add transformer negative-sequence Yprim
-        for transformer in self.transformers.values():
-            yprim = transformer.calc_yprim_sequence("negative")
-            for i in yprim.index:
-                for j in yprim.columns:
-                    Ybus_neg.loc[i, j] += yprim.loc[i, j]
+    def calc_ybus_zero(self):
+        """
+        Constructs the zero-sequence Ybus matrix.
+        Only includes contributions from components that allow zero-sequence current flow.
+        """
+        return self.assemble_ybus("zero")
 
-        # Add transmission line negative-sequence Yprim
-        for line in self.transmission_lines.values():
-            yprim = line.calc_yprim_sequence("negative")
-            for i in yprim.index:
-                for j in yprim.columns:
-                    Ybus_neg.loc[i, j] += yprim.loc[i, j]
+    def calc_sequence_networks(self):
+        """
+        Builds the zero-, positive- and negative-sequence Ybus matrices in one pass, on a shared
+        sparsity pattern (see SequenceNetworks). Preferred over the three calc_ybus_* calls when
+        all sequences are needed, e.g. for unbalanced faults and fault sweeps.
+        """
+        from Classes.SequenceNetworks import SequenceNetworks
+        return SequenceNetworks.from_circuit(self)
 
-        # Add generator negative-sequence admittance (shunt)
-        for gen in self.generators.values():
-            gen.calc_admittances()
-            if gen.Y2 is not None:
-                Ybus_neg.loc[gen.bus.name, gen.bus.name] += gen.Y2
-                # print(f"[DEBUG] Added Y2 of Generator '{gen.name}' to bus {gen.bus.name}: {gen.Y2}")
+    def compile(self):
+        """
+        Returns the array form of the circuit (CompiledNetwork): bus tables, branch stamps
+        and CSR Ybus matrices for the power flow and every sequence network.
+        """
+        from Classes.CompiledNetwork import CompiledNetwork
+        return CompiledNetwork.from_circuit(self)
 
-        return Ybus_neg
+    def reduce(self, eliminated, voltages=None):
+        """
+        Returns a Ward equivalent of this circuit with the `eliminated` PQ buses removed
+        (see NetworkReduction.ReducedCircuit). Optional `voltages` (bus name -> complex p.u.)
+        replace the flat profile when converting external injections to boundary injections.
+        """
+        from Classes.NetworkReduction import ReducedCircuit
+        return ReducedCircuit(self, eliminated, voltages=voltages)
 
-    def calc_ybus_zero(self):
+    def frequency_scan(self, frequencies, buses=None, sequence="positive", **kwargs):
         """
-        Constructs the zero-sequence Ybus matrix.
-        Only includes contributions from components that allow zero-sequence current flow.
+        Driving-point and transfer impedances at `buses` over a grid of `frequencies` (Hz) for
+        resonance screening (see FrequencyScan.FrequencyScan).
         """
-        bus_names = list(self.buses.keys())
-        Ybus_zero = pd.DataFrame(0j, index=bus_names, columns=bus_names)
+        from Classes.FrequencyScan import frequency_scan
+        return frequency_scan(self, frequencies, buses=buses, sequence=sequence, **kwargs)
 
-        # Add transformer zero-sequence Yprim
-        for transformer in self.transformers.values():
-            yprim = transformer.calc_yprim_sequence("zero")
-            if yprim is not None:
-                for i in yprim.index:
-                    for j in yprim.columns:
-                        Ybus_zero.loc[i, j] += yprim.loc[i, j]
-            # print(f"[DEBUG] Transformer {transformer.name} Yprim zero:\n{yprim}")
-
-        # Add transmission line zero-sequence Yprim
-        for line in self.transmission_lines.values():
-            yprim = line.calc_yprim_sequence("zero")
-            if yprim is not None:
-                for i in yprim.index:
-                    for j in yprim.columns:
-                        Ybus_zero.loc[i, j] += yprim.loc[i, j]
-            # print(f"[DEBUG] Line {line.name} Yprim zero:\n{yprim}")
-
-        # Add generator zero-sequence admittance
-        for gen in self.generators.values():
-            gen.calc_admittances()
-            if gen.Y0 is not None and gen.Yn is not None:
-                bus_name = gen.bus.name
-                Ybus_zero.loc[bus_name, bus_name] += gen.Y0
-            # print(f"[DEBUG] Added Y0 of Generator '{gen.name}' to bus {bus_name}: {gen.Y0}")
+    def fault_sweep(self, fault_type="3ph", buses=None, prefault=None, branches=False, **kwargs):
+        """
+        Faults at `buses` (default: all) solved together by superposition, optionally from the
+        converged power-flow voltages `prefault` and with the line/transformer contributions
+        (`branches`; see FaultStudySolver.FaultSweep).
+        """
+        from Classes.FaultStudySolver import fault_sweep
+        return fault_sweep(self, fault_type, buses=buses, prefault=prefault, branches=branches, **kwargs)
 
-        return Ybus_zero
+    def fork(self, name=None):
+        """
+        Returns a copy-on-write scenario variant of this circuit (see CircuitFork.CircuitFork):
+        it shares the components and the compiled network with this circuit and stores only its
+        own load/generation changes and branch outages. Do not modify this circuit afterwards.
+        """
+        from Classes.CircuitFork import CircuitFork
+        return CircuitFork(self, name)
 
     def get_base_power(self):
         """Returns the base power of the system."""
@@ -250,6 +272,10 @@ class Circuit:
         """Returns the ordered list of bus names."""
         return list(self.buses.keys())
 
+    def bus_index(self):
+        """Returns a dictionary mapping bus names to their position in this circuit."""
+        return {name: i for i, name in enumerate(self.buses)}
+
     def bus_types(self):
         """Returns a dictionary mapping bus names to their types."""
         return {bus.name: bus.bus_type for bus in self.buses.values()}
@@ -258,8 +284,8 @@ class Circuit:
         real_power = {}
 
         for bus in self.buses.values():
-            P_load = sum(load.real_power for load in getattr(bus, "loads", []))
-            P_gen = sum(gen.real_power for gen in getattr(bus, "generators", []))
+            P_load = sum(load.real_power for load in bus.loads)
+            P_gen = sum(gen.real_power for gen in bus.generators)
 
             total_P = P_gen - P_load
             real_power[bus.name] = total_P
@@ -272,9 +298,8 @@ class Circuit:
         reactive_power = {}
 
         for bus in self.buses.values():
-            Q_load = sum(load.reactive_power for load in getattr(bus, "loads", []))
+            Q_load = sum(load.reactive_power for load in bus.loads)
             reactive_power[bus.name] = -Q_load  # 🔥 NEGATIVE SIGN for PQ buses
-            print(f"[DEBUG] {bus.name}: Q_load = {Q_load}, total = {-Q_load}")
 
         return reactive_power
 
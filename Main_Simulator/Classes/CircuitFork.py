@@ -0,0 +1,232 @@
+import copy
+
+import numpy as np
+
+from Classes.Circuit import Circuit
+from Classes.CompiledNetwork import CompiledNetwork, SEQUENCES
+
+
+class ForkBase:
+    """
+    Data shared by every fork of one circuit (the root): bus and branch positions and the
+    compiled network, which is built on first use and never copied.
+    """
+
+    def __init__(self, root: Circuit):
+        self.root = root
+        self.bus_index = root.bus_index()
+        self.branch_names = [*root.transformers, *root.transmission_lines]
+        self.branch_index = {name: i for i, name in enumerate(self.branch_names)}
+        self._network = None
+
+    def network(self):
+        if self._network is None:
+            self._network = self.root.compile()
+        return self._network
+
+
+class CircuitFork(Circuit):
+    """
+    Copy-on-write scenario variant of a Circuit.
+
+    A fork shares the buses, components and compiled arrays of its root circuit and stores only
+    what the scenario changes:
+        - load and generator setpoints (`set_load`, `scale_loads`, `set_generation`): the changed
+          Load/Generator objects are shallow copies, and the net injections are kept as per-bus
+          MW/Mvar offsets from the root;
+        - branch outages (`outage`, `restore`): a boolean in-service mask over the branches.
+    The offset vectors and the mask are allocated on the first change and shared with forks of
+    this fork until either side changes them, so an unchanged fork costs a few attributes.
+
+    A fork behaves like a Circuit for the solvers (its `transformers` and `transmission_lines`
+    views leave out the outaged branches). Adding components is not supported; build them into
+    the root before forking, and do not modify the root while it has forks. Results the solvers
+    write back onto shared objects (e.g. Generator.Q) land on the root's generators.
+    """
+
+    def __init__(self, parent: Circuit, name=None):
+        if parent._fork_base is None:
+            parent._fork_base = ForkBase(parent)
+        base = self._fork_base = parent._fork_base
+        self.parent = parent
+        self.name = name if name is not None else f"{parent.name} (fork)"
+        self.settings = parent.settings
+        self.buses = base.root.buses
+        self.bus_type = base.root.bus_type
+        self.first_generator_added = True
+        self.ybus = None
+
+        if isinstance(parent, CircuitFork):
+            self._changed_loads = dict(parent._changed_loads)
+            self._changed_generators = dict(parent._changed_generators)
+            self._p_offset, self._q_offset, self._status = parent._p_offset, parent._q_offset, parent._status
+            # The arrays are shared from now on: either side copies them on its next change
+            parent._owns_offsets = parent._owns_status = False
+        else:
+            self._changed_loads = {}
+            self._changed_generators = {}
+            self._p_offset = self._q_offset = self._status = None
+        self._owns_offsets = self._owns_status = False
+
+    # --- Views ------------------------------------------------------------------------
+
+    @property
+    def root(self):
+        return self._fork_base.root
+
+    @property
+    def loads(self):
+        loads = self.root.loads
+        return {**loads, **self._changed_loads} if self._changed_loads else loads
+
+    @property
+    def generators(self):
+        generators = self.root.generators
+        return {**generators, **self._changed_generators} if self._changed_generators else generators
+
+    @property
+    def in_service(self):
+        """In-service mask of the branches (root transformers, then lines)."""
+        if self._status is None:
+            return np.ones(len(self._fork_base.branch_names), dtype=bool)
+        return self._status
+
+    def _in_service(self, components):
+        if self._status is None:
+            return components
+        index, status = self._fork_base.branch_index, self._status
+        return {name: c for name, c in components.items() if status[index[name]]}
+
+    @property
+    def transformers(self):
+        return self._in_service(self.root.transformers)
+
+    @property
+    def transmission_lines(self):
+        return self._in_service(self.root.transmission_lines)
+
+    # --- Scenario changes -------------------------------------------------------------
+
+    def _offsets(self):
+        if not self._owns_offsets:
+            n = len(self.buses)
+            self._p_offset = np.zeros(n) if self._p_offset is None else self._p_offset.copy()
+            self._q_offset = np.zeros(n) if self._q_offset is None else self._q_offset.copy()
+            self._owns_offsets = True
+        return self._p_offset, self._q_offset
+
+    def set_load(self, name, real_power=None, reactive_power=None):
+        """Changes the power (MW / Mvar) of a load in this fork only."""
+        if name not in self.root.loads:
+            raise ValueError(f"Load '{name}' not found in circuit '{self.root.name}'.")
+        load = copy.copy(self.loads[name])
+        p_offset, q_offset = self._offsets()
+        k = self._fork_base.bus_index[load.bus.name]
+        if real_power is not None:
+            p_offset[k] -= real_power - load.real_power
+            load.real_power = real_power
+        if reactive_power is not None:
+            q_offset[k] -= reactive_power - load.reactive_power
+            load.reactive_power = reactive_power
+        self._changed_loads[name] = load
+
+    def scale_loads(self, factor, buses=None):
+        """Scales the loads (all, or those at `buses`) of this fork by `factor`."""
+        buses = None if buses is None else set(buses)
+        for name, load in self.loads.items():
+            if buses is None or load.bus.name in buses:
+                self.set_load(name, load.real_power * factor, load.reactive_power * factor)
+
+    def set_generation(self, name, real_power):
+        """Changes the real-power setpoint (MW) of a generator in this fork only."""
+        if name not in self.root.generators:
+            raise ValueError(f"Generator '{name}' not found in circuit '{self.root.name}'.")
+        generator = copy.copy(self.generators[name])
+        p_offset, _ = self._offsets()
+        p_offset[self._fork_base.bus_index[generator.bus.name]] += real_power - generator.real_power
+        generator.real_power = real_power
+        self._changed_generators[name] = generator
+
+    def _set_status(self, names, value):
+        if not self._owns_status:
+            self._status = self.in_service.copy()
+            self._owns_status = True
+        for name in names:
+            if name not in self._fork_base.branch_index:
+                raise ValueError(f"Branch '{name}' not found in circuit '{self.root.name}'.")
+            self._status[self._fork_base.branch_index[name]] = value
+
+    def outage(self, *names):
+        """Takes branches (transformers or lines) out of service in this fork."""
+        self._set_status(names, False)
+
+    def restore(self, *names):
+        """Returns outaged branches to service."""
+        self._set_status(names, True)
+
+    def fork(self, name=None):
+        return CircuitFork(self, name)
+
+    def add_bus(self, bus):
+        raise ValueError("A fork shares the buses of its root circuit; add buses to the root before forking.")
+
+    def add_transformer(self, transformer):
+        raise ValueError("A fork shares the branches of its root circuit; use outage/restore instead.")
+
+    def add_transmission_line(self, transmission_line):
+        raise ValueError("A fork shares the branches of its root circuit; use outage/restore instead.")
+
+    def add_load(self, name, bus, real_power, reactive_power):
+        raise ValueError("A fork shares the loads of its root circuit; use set_load to change them.")
+
+    def add_unbalanced_load(self, name, bus, real_power, reactive_power, connection="wye"):
+        raise ValueError("A fork shares the loads of its root circuit; use set_load to change them.")
+
+    def add_generator(self, name, bus, per_unit, real_power, **kwargs):
+        raise ValueError("A fork shares the generators of its root circuit; use set_generation to change them.")
+
+    # --- Injections and compiled form ---------------------------------------------------
+
+    def real_power_vector(self):
+        real_power = self.root.real_power_vector()
+        if self._p_offset is not None:
+            for name, offset in zip(self.buses, self._p_offset.tolist()):
+                real_power[name] += offset
+        return real_power
+
+    def reactive_power_vector(self):
+        reactive_power = self.root.reactive_power_vector()
+        if self._q_offset is not None:
+            for name, offset in zip(self.buses, self._q_offset.tolist()):
+                reactive_power[name] += offset
+        return reactive_power
+
+    def compile(self):
+        """
+        CompiledNetwork of the scenario. The bus, branch and generator arrays are those of the
+        root's compiled network (shared, not copied); only the injections are new when loads or
+        generation changed, and the branch stamps and Ybus matrices when branches are outaged
+        (outaged branches keep their row with zero stamps).
+        """
+        network = self._fork_base.network()
+        p_spec, q_spec = network.p_spec, network.q_spec
+        if self._p_offset is not None:
+            p_spec = p_spec + self._p_offset
+            q_spec = q_spec + self._q_offset
+
+        branch_stamps, ybus = network.branch_stamps, network.ybus
+        if self._status is not None and not self._status.all():
+            mask = self._status[:, None, None]
+            branch_stamps = {seq: np.where(mask, network.branch_stamps[seq], 0) for seq in SEQUENCES}
+            ybus = None
+
+        return CompiledNetwork(self.name, network.base_power, network.frequency,
+                               network.bus_names, network.base_kv, network.bus_type, p_spec, q_spec, network.v_set,
+                               network.branch_names, network.branch_kind, network.branch_from, network.branch_to,
+                               branch_stamps, network.gen_names, network.gen_bus, network.gen_shunts,
+                               ybus=ybus, branch_rating=network.branch_rating)
+
+    def __repr__(self):
+        outaged = 0 if self._status is None else int((~self._status).sum())
+        return (f"CircuitFork(name='{self.name}', root='{self.root.name}', changed_loads={len(self._changed_loads)}, "
+                f"changed_generators={len(self._changed_generators)}, outaged_branches={outaged})")
@@ -0,0 +1,305 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from scipy import sparse
+
+# Integer codes used for the bus-type table
+PQ, PV, SLACK = 0, 1, 2
+BUS_TYPE_CODES = {"PQ Bus": PQ, "PV Bus": PV, "Slack Bus": SLACK}
+BUS_TYPE_NAMES = {code: name for name, code in BUS_TYPE_CODES.items()}
+
+# Branch kinds
+LINE, TRANSFORMER = 0, 1
+
+# "pf" is the power-flow Ybus (calc_ybus), the others are the fault sequence networks
+SEQUENCES = ("pf", "positive", "negative", "zero")
+
+# Bump whenever the layout or the meaning of a stored array changes; part of every cache key
+FORMAT_VERSION = 3
+
+
+class CompiledNetwork:
+    """
+    Array form of a Circuit: bus tables, branch admittance stamps and sparse (CSR) Ybus
+    matrices for the power flow and the three sequence networks.
+
+    All per-unit quantities are on the system base. Branch stamps are stored as (m, 2, 2)
+    complex arrays per sequence, ordered [[y_ff, y_ft], [y_tf, y_tt]].
+    """
+
+    def __init__(self, name, base_power, frequency,
+                 bus_names, base_kv, bus_type, p_spec, q_spec, v_set,
+                 branch_names, branch_kind, branch_from, branch_to, branch_stamps,
+                 gen_names, gen_bus, gen_shunts, ybus=None, branch_rating=None):
+        self.name = name
+        self.base_power = base_power  # MVA
+        self.frequency = frequency  # Hz
+
+        # Bus table
+        self.bus_names = np.asarray(bus_names, dtype=str)
+        self.base_kv = np.asarray(base_kv, dtype=float)
+        self.bus_type = np.asarray(bus_type, dtype=np.int8)
+        self.p_spec = np.asarray(p_spec, dtype=float)  # net injection, MW
+        self.q_spec = np.asarray(q_spec, dtype=float)  # net injection, Mvar
+        self.v_set = np.asarray(v_set, dtype=float)  # voltage setpoint, p.u.
+
+        # Branch table
+        self.branch_names = np.asarray(branch_names, dtype=str)
+        self.branch_kind = np.asarray(branch_kind, dtype=np.int8)
+        self.branch_from = np.asarray(branch_from, dtype=np.int32)
+        self.branch_to = np.asarray(branch_to, dtype=np.int32)
+        self.branch_stamps = {seq: np.asarray(branch_stamps[seq], dtype=complex).reshape(-1, 2, 2)
+                              for seq in SEQUENCES}
+        # Three-phase rating in MVA (NaN where unknown)
+        self.branch_rating = (np.asarray(branch_rating, dtype=float) if branch_rating is not None
+                              else np.full(len(self.branch_names), np.nan))
+
+        # Generator shunts (subtransient admittances for the sequence networks)
+        self.gen_names = np.asarray(gen_names, dtype=str)
+        self.gen_bus = np.asarray(gen_bus, dtype=np.int32)
+        self.gen_shunts = {seq: np.asarray(gen_shunts[seq], dtype=complex) for seq in SEQUENCES}
+
+        self.ybus = ybus if ybus is not None else self.assemble()
+
+    @property
+    def num_buses(self):
+        return len(self.bus_names)
+
+    @property
+    def num_branches(self):
+        return len(self.branch_names)
+
+    def bus_index(self):
+        """Returns a dictionary mapping bus names to their row in the bus table."""
+        return {name: i for i, name in enumerate(self.bus_names)}
+
+    def assemble(self):
+        """Assembles the CSR Ybus of every sequence from the branch stamps and generator shunts."""
+        n = self.num_buses
+        f, t = self.branch_from, self.branch_to
+        rows = np.concatenate([f, f, t, t, self.gen_bus])
+        cols = np.concatenate([f, t, f, t, self.gen_bus])
+
+        ybus = {}
+        for seq in SEQUENCES:
+            stamps = self.branch_stamps[seq]
+            data = np.concatenate([stamps[:, 0, 0], stamps[:, 0, 1], stamps[:, 1, 0], stamps[:, 1, 1],
+                                   self.gen_shunts[seq]])
+            # Duplicate (row, col) entries are summed by the COO -> CSR conversion
+            ybus[seq] = sparse.coo_matrix((data, (rows, cols)), shape=(n, n)).tocsr()
+        return ybus
+
+    @classmethod
+    def from_circuit(cls, circuit):
+        """Compiles a Circuit into its array form."""
+        bus_order = circuit.bus_order()
+        index = {name: i for i, name in enumerate(bus_order)}
+        buses = [circuit.buses[b] for b in bus_order]
+
+        p = circuit.real_power_vector()
+        q = circuit.reactive_power_vector()
+
+        branch_names, branch_kind, branch_from, branch_to, branch_rating = [], [], [], [], []
+        branch_stamps = {seq: [] for seq in SEQUENCES}
+        for kind, components in ((TRANSFORMER, circuit.transformers), (LINE, circuit.transmission_lines)):
+            for component in components.values():
+                b1, b2 = component.bus1.name, component.bus2.name
+                branch_names.append(component.name)
+                branch_kind.append(kind)
+                branch_from.append(index[b1])
+                branch_to.append(index[b2])
+                branch_rating.append(component_rating(component))
+                for seq in SEQUENCES:
+                    branch_stamps[seq].append(component.stamps[seq])
+
+        gen_names, gen_bus = [], []
+        gen_shunts = {seq: [] for seq in SEQUENCES}
+        for gen in circuit.generators.values():
+            gen_names.append(gen.name)
+            gen_bus.append(index[gen.bus.name])
+            for seq in SEQUENCES:
+                gen_shunts[seq].append(gen.shunts[seq])
+
+        return cls(circuit.name, circuit.get_base_power(), circuit.get_frequency(),
+                   bus_order, [b.base_kv for b in buses], [BUS_TYPE_CODES[b.bus_type] for b in buses],
+                   [p[b] for b in bus_order], [q[b] for b in bus_order],
+                   [b.per_unit for b in buses],
+                   branch_names, branch_kind, branch_from, branch_to, branch_stamps,
+                   gen_names, gen_bus, gen_shunts, branch_rating=branch_rating)
+
+    def ybus_dense(self, sequence="pf"):
+        """Returns the Ybus of the given sequence as a dense complex array."""
+        return self.ybus[sequence].toarray()
+
+    def save(self, directory):
+        """
+        Writes the network to `directory` as one .npy file per array plus a meta.json file.
+        Plain .npy files (unlike .npz archives) can be memory-mapped by `load`.
+        """
+        os.makedirs(directory, exist_ok=True)
+        arrays = {
+            "bus_names": self.bus_names, "base_kv": self.base_kv, "bus_type": self.bus_type,
+            "p_spec": self.p_spec, "q_spec": self.q_spec, "v_set": self.v_set,
+            "branch_names": self.branch_names, "branch_kind": self.branch_kind,
+            "branch_from": self.branch_from, "branch_to": self.branch_to, "branch_rating": self.branch_rating,
+            "gen_names": self.gen_names, "gen_bus": self.gen_bus,
+        }
+        for seq in SEQUENCES:
+            arrays[f"branch_stamps_{seq}"] = self.branch_stamps[seq]
+            arrays[f"gen_shunts_{seq}"] = self.gen_shunts[seq]
+            ybus = self.ybus[seq].tocsr()
+            ybus.sort_indices()
+            arrays[f"ybus_{seq}_data"] = ybus.data
+            arrays[f"ybus_{seq}_indices"] = ybus.indices
+            arrays[f"ybus_{seq}_indptr"] = ybus.indptr
+
+        for key, value in arrays.items():
+            np.save(os.path.join(directory, f"{key}.npy"), np.ascontiguousarray(value))
+
+        meta = {"format_version": FORMAT_VERSION, "name": self.name,
+                "base_power": self.base_power, "frequency": self.frequency,
+                "num_buses": self.num_buses}
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """
+        Loads a network written by `save`. With `mmap=True` the arrays are memory-mapped
+        read-only, so loading is zero-copy and pages are shared between processes.
+        """
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        if meta["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled network format {meta['format_version']} in '{directory}'.")
+
+        mode = "r" if mmap else None
+
+        def arr(key):
+            return np.load(os.path.join(directory, f"{key}.npy"), mmap_mode=mode)
+
+        n = meta["num_buses"]
+        ybus = {seq: sparse.csr_matrix((arr(f"ybus_{seq}_data"), arr(f"ybus_{seq}_indices"),
+                                        arr(f"ybus_{seq}_indptr")), shape=(n, n), copy=False)
+                for seq in SEQUENCES}
+
+        return cls(meta["name"], meta["base_power"], meta["frequency"],
+                   arr("bus_names"), arr("base_kv"), arr("bus_type"), arr("p_spec"), arr("q_spec"), arr("v_set"),
+                   arr("branch_names"), arr("branch_kind"), arr("branch_from"), arr("branch_to"),
+                   {seq: arr(f"branch_stamps_{seq}") for seq in SEQUENCES},
+                   arr("gen_names"), arr("gen_bus"), {seq: arr(f"gen_shunts_{seq}") for seq in SEQUENCES},
+                   ybus=ybus, branch_rating=arr("branch_rating"))
+
+    def __repr__(self):
+        return (f"CompiledNetwork(name='{self.name}', buses={self.num_buses}, "
+                f"branches={self.num_branches}, generators={len(self.gen_names)})")
+
+
+def line_rating(base_kv, ampacity):
+    """Three-phase MVA rating of a line carrying `ampacity` amps per phase at `base_kv`."""
+    return np.sqrt(3) * base_kv * ampacity / 1e3
+
+
+def component_rating(component):
+    """
+    MVA rating of a Transformer or TransmissionLine: an explicit positive `rating_mva` wins,
+    otherwise the transformer nameplate or the ampacity of all subconductors of the line bundle;
+    NaN when the line has neither. Same rule as BulkNetworkLoader.branch_ratings.
+    """
+    rating = getattr(component, "rating_mva", None)
+    if rating is not None and rating > 0:
+        return float(rating)
+    if hasattr(component, "power_rating"):
+        return float(component.power_rating)
+    bundle = getattr(component, "bundle", None)
+    if bundle is None:
+        return np.nan
+    return float(line_rating(component.bus1.base_kv, bundle.conductor.ampacity * bundle.num_conductors))
+
+
+def fingerprint(*parts):
+    """
+    Returns a SHA-256 content hash of JSON-serializable parameter data (component tables,
+    case-file contents, ...). Used as the cache key, so it must be computable without
+    building the Circuit.
+    """
+    h = hashlib.sha256(f"compiled-network-v{FORMAT_VERSION}".encode())
+    for part in parts:
+        if isinstance(part, bytes):
+            h.update(part)
+        else:
+            h.update(json.dumps(part, sort_keys=True, default=repr).encode())
+    return h.hexdigest()
+
+
+def circuit_fingerprint(circuit):
+    """Content hash of every component parameter of an already built Circuit."""
+    buses = [(b.name, b.base_kv, b.bus_type, b.per_unit) for b in circuit.buses.values()]
+    transformers = [(t.name, t.bus1.name, t.bus2.name, t.power_rating, t.impedance_percent, t.x_over_r_ratio,
+                     t.s_base, t.primary_connection_type, t.secondary_connection_type, t.Zn1_ohm, t.Zn2_ohm,
+                     t.is_grounded_bus1, t.is_grounded_bus2, t.tap_ratio, component_rating(t))
+                    for t in circuit.transformers.values()]
+    lines = [(l.name, l.bus1.name, l.bus2.name, l.length, l.s_base, l.frequency, l.connection_type,
+              l.zero_seq_model, l.line_model, l.r_series, l.x_series, l.b_shunt, component_rating(l))
+             for l in circuit.transmission_lines.values()]
+    generators = [(g.name, g.bus.name, g.real_power, g.per_unit, g.x1, g.x2, g.x0, g.is_grounded,
+                   g.zn_pu, g.Yn, g.connection_type) for g in circuit.generators.values()]
+    loads = [(l.name, l.bus.name, l.real_power, l.reactive_power) for l in circuit.loads.values()]
+    settings = (circuit.get_base_power(), circuit.get_frequency())
+    return fingerprint(circuit.name, settings, buses, transformers, lines, generators, loads)
+
+
+class NetworkCache:
+    """
+    On-disk cache of compiled networks, one directory per content hash:
+
+        cache = NetworkCache("~/.cache/main_simulator")
+        network = cache.get_or_compile(fingerprint(case_parameters), build_circuit)
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = os.path.expanduser(cache_dir)
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def __contains__(self, key):
+        return os.path.isfile(os.path.join(self.path(key), "meta.json"))
+
+    def get(self, key, mmap=True):
+        """Returns the cached CompiledNetwork for `key`, or None if it is not cached."""
+        if key not in self:
+            return None
+        return CompiledNetwork.load(self.path(key), mmap=mmap)
+
+    def put(self, key, network):
+        """Stores a CompiledNetwork under `key`. The entry appears atomically."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=f".{key[:12]}-", dir=self.cache_dir)
+        try:
+            network.save(tmp)
+            os.replace(tmp, self.path(key))
+        except OSError:
+            # Another process stored the same key first; its entry is equivalent
+            shutil.rmtree(tmp, ignore_errors=True)
+            if key not in self:
+                raise
+
+    def get_or_compile(self, key, build, mmap=True):
+        """
+        Returns the cached network for `key`; on a miss calls `build()` (which returns a
+        Circuit or a CompiledNetwork), stores the result and returns it.
+        """
+        network = self.get(key, mmap=mmap)
+        if network is not None:
+            return network
+
+        network = build()
+        if not isinstance(network, CompiledNetwork):
+            network = CompiledNetwork.from_circuit(network)
+        self.put(key, network)
+        return self.get(key, mmap=mmap)
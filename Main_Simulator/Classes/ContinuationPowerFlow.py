@@ -0,0 +1,256 @@
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import splu
+
+from Classes.CompiledNetwork import CompiledNetwork, PQ, PV
+from Classes.Kernels import power_derivatives
+from Classes.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
+
+class PVCurve:
+    """
+    Result of a continuation power flow: loading parameter λ and complex bus voltages per step.
+
+    Attributes:
+        lam (ndarray, (k,)): loading parameter of each step (0 is the base case).
+        V (ndarray, (k, n)): complex bus voltages (p.u.) of each step.
+        nose_index (int or None): step with the largest λ when the nose was passed, else None.
+        status (str): "nose" when the nose was passed, "max_steps" when the step limit was hit
+            first, "step_failed" when the corrector failed at the minimum step; the curve then
+            holds the steps accepted up to that point.
+    """
+
+    def __init__(self, bus_names, lam, V, nose_index, direction_mw, status="nose"):
+        self.bus_names = np.asarray(bus_names, dtype=str)
+        self.lam = np.asarray(lam, dtype=float)
+        self.V = np.asarray(V, dtype=complex)
+        self.nose_index = nose_index
+        self.direction_mw = direction_mw  # total load increase per unit of λ (MW)
+        self.status = status
+
+    @property
+    def nose_reached(self):
+        return self.nose_index is not None
+
+    @property
+    def voltage(self):
+        """|V| per step, shape (k, n)."""
+        return np.abs(self.V)
+
+    @property
+    def max_lambda(self):
+        return float(self.lam.max())
+
+    @property
+    def margin_mw(self):
+        """Loadability margin: additional load (MW) at the largest λ reached."""
+        return self.max_lambda * self.direction_mw
+
+    def to_frame(self):
+        """One row per step: λ and |V| of every bus."""
+        frame = pd.DataFrame(self.voltage, columns=self.bus_names)
+        frame.insert(0, "lambda", self.lam)
+        return frame
+
+    def __repr__(self):
+        nose = "reached" if self.nose_reached else f"not reached ({self.status})"
+        return (f"PVCurve(steps={len(self.lam)}, max_lambda={self.max_lambda:.4f}, "
+                f"margin={self.margin_mw:.2f} MW, nose {nose})")
+
+
+class ContinuationPowerFlow:
+    """
+    Continuation power flow on a CompiledNetwork: traces the PV curve while the injections are
+    scaled as S(λ) = S_base + λ·S_direction, with a tangent predictor and a pseudo-arc-length
+    corrector, and stops once the nose (maximum loadability) has been passed.
+
+    State vector x = [δ of PV/PQ buses, |V| of PQ buses, λ]. Each corrector is warm-started at
+    the predicted point, and all Jacobians are assembled from sparse Ybus products, so every
+    step costs a few sparse factorizations regardless of the number of buses. The column
+    ordering of the augmented matrix is computed once; every factorization reuses it.
+
+    Near the nose the step is shrunk in proportion to the λ component of the unit tangent,
+    which goes to zero there, so the largest λ of the curve lands close to the true maximum.
+
+    By default the direction scales every injection of the base case (loads and generation)
+    proportionally; the slack bus supplies the remainder.
+    """
+
+    def __init__(self, network, p_direction=None, q_direction=None):
+        """
+        Parameters:
+            network (CompiledNetwork or Circuit): The network to study.
+            p_direction, q_direction (array-like, optional): Injection change (MW, Mvar) per unit
+                of λ for every bus in the network bus order. Default: the base-case injections.
+        """
+        if not isinstance(network, CompiledNetwork):
+            network = network.compile()
+        self.network = network
+        self.ybus = network.ybus["pf"].tocsr()
+
+        base = network.base_power
+        self.S0 = (network.p_spec + 1j * network.q_spec) / base
+        p_dir = network.p_spec if p_direction is None else np.asarray(p_direction, dtype=float)
+        q_dir = network.q_spec if q_direction is None else np.asarray(q_direction, dtype=float)
+        if p_dir.shape != (network.num_buses,) or q_dir.shape != (network.num_buses,):
+            raise ValueError(f"Direction vectors must have one entry per bus ({network.num_buses}).")
+        self.Sd = (p_dir + 1j * q_dir) / base
+        self.direction_mw = float(-p_dir[p_dir < 0].sum())
+
+        self.pv = np.flatnonzero(network.bus_type == PV)
+        self.pq = np.flatnonzero(network.bus_type == PQ)
+        self.pvpq = np.concatenate([self.pv, self.pq])
+        self.n_a = len(self.pvpq)
+
+        # dF/dλ is constant
+        self.F_lam = -np.concatenate([self.Sd.real[self.pvpq], self.Sd.imag[self.pq]])
+        self._ordering = None
+
+    # --- Building blocks ----------------------------------------------------------------
+
+    def voltages(self, x, V):
+        """Complex voltages for state x (angles/magnitudes of the non-fixed buses taken from x)."""
+        Va = np.angle(V)
+        Vm = np.abs(V)
+        Va[self.pvpq] = x[:self.n_a]
+        Vm[self.pq] = x[self.n_a:-1]
+        return Vm * np.exp(1j * Va)
+
+    def mismatch(self, V, lam):
+        """F(x, λ): real mismatch at PV/PQ buses and reactive mismatch at PQ buses (p.u.)."""
+        mis = V * np.conj(self.ybus @ V) - (self.S0 + lam * self.Sd)
+        return np.concatenate([mis.real[self.pvpq], mis.imag[self.pq]])
+
+    def jacobian(self, V):
+        """Sparse power-flow Jacobian dF/d[δ, |V|] of the trimmed equations."""
+        dS_dVa, dS_dVm = power_derivatives(self.ybus, V)
+        pvpq, pq = self.pvpq, self.pq
+        return sparse.bmat([
+            [dS_dVa[pvpq][:, pvpq].real, dS_dVm[pvpq][:, pq].real],
+            [dS_dVa[pq][:, pvpq].imag, dS_dVm[pq][:, pq].imag],
+        ], format="csc")
+
+    def augmented_ordering(self, J):
+        """
+        Fill-reducing column ordering of the augmented matrix, computed once from its structure
+        (a full border row, since the tangent row becomes dense after the first step).
+        """
+        if self._ordering is None:
+            border = np.ones(J.shape[1] + 1)
+            pattern = sparse.bmat([[J, self.F_lam[:, None]], [border[None, :-1], border[-1:, None]]], format="csc")
+            self._ordering = np.argsort(splu(pattern, permc_spec="COLAMD").perm_c)
+        return self._ordering
+
+    def augmented(self, V, z):
+        """
+        Factorization of [[J, dF/dλ], [zᵀ]], used by both predictor and corrector, under the
+        stored column ordering. Returns the solve function.
+        """
+        J = self.jacobian(V)
+        order = self.augmented_ordering(J)
+        matrix = sparse.bmat([[J, self.F_lam[:, None]], [z[None, :-1], z[-1:, None]]], format="csc")
+        lu = splu(matrix[:, order], permc_spec="NATURAL")
+
+        def solve(rhs):
+            x = np.empty_like(rhs)
+            x[order] = lu.solve(rhs)
+            return x
+        return solve
+
+    def state(self, V, lam):
+        return np.concatenate([np.angle(V)[self.pvpq], np.abs(V)[self.pq], [lam]])
+
+    def solve_base(self, tol=1e-8, max_iter=20):
+        """Base-case (λ = 0) power flow by Newton-Raphson from a flat start at the setpoints."""
+        V = self.network.v_set.astype(complex)
+        x = self.state(V, 0.0)
+        for _ in range(max_iter):
+            F = self.mismatch(V, 0.0)
+            if np.max(np.abs(F)) < tol:
+                return V
+            x[:-1] -= splu(self.jacobian(V)).solve(F)
+            V = self.voltages(x, V)
+        raise ValueError("Base-case power flow did not converge; the continuation needs a solvable start point.")
+
+    # --- Continuation -------------------------------------------------------------------
+
+    def run(self, step=0.1, min_step=1e-4, max_step=0.5, max_steps=500, tol=1e-8, max_corrector=10,
+            nose_step=0.3):
+        """
+        Traces the PV curve from the base case to just past the nose.
+
+        Parameters:
+            step: initial arc-length step; halved when a corrector fails, grown after easy steps.
+            min_step, max_step: bounds of the step size.
+            max_steps: maximum number of continuation steps.
+            tol: mismatch tolerance of the corrector (p.u.).
+            max_corrector: corrector iterations before the step is rejected.
+            nose_step: the step is at most nose_step · dλ, dλ being the λ component of the unit
+                tangent; it shrinks towards min_step as the nose is approached.
+
+        Returns:
+            PVCurve with λ and the complex voltages of every accepted step. When the nose is not
+            reached (step limit, or the corrector fails at the minimum step) the curve holds the
+            steps accepted so far, with nose_index None and the reason in `status`.
+        """
+        V = self.solve_base(tol)
+        lam = 0.0
+        x = self.state(V, lam)
+        lams, Vs = [lam], [V]
+
+        # Initial tangent points towards increasing λ
+        z = np.zeros(len(x))
+        z[-1] = 1.0
+        nose_index = None
+        status = "max_steps"
+
+        for _ in range(max_steps):
+            # Predictor: tangent of the solution curve, oriented like the previous one
+            rhs = np.zeros(len(x))
+            rhs[-1] = 1.0
+            tangent = self.augmented(V, z)(rhs)
+            tangent /= np.linalg.norm(tangent)
+
+            if tangent[-1] < 0 and len(lams) > 1:
+                nose_index = int(np.argmax(lams))
+                status = "nose"
+                break
+            z = tangent
+            step = min(step, max(min_step, nose_step * z[-1]))
+
+            # Corrector on the hyperplane through the predicted point, orthogonal to the tangent
+            while True:
+                x_pred = x + step * z
+                x_new = x_pred.copy()
+                V_new = self.voltages(x_new, V)
+                for iteration in range(max_corrector):
+                    F = self.mismatch(V_new, x_new[-1])
+                    if np.max(np.abs(F)) < tol:
+                        break
+                    residual = np.concatenate([F, [z @ (x_new - x_pred)]])
+                    x_new -= self.augmented(V_new, z)(residual)
+                    V_new = self.voltages(x_new, V_new)
+                else:
+                    iteration = None
+
+                if iteration is not None or step / 2 < min_step:
+                    break
+                step /= 2
+
+            if iteration is None:
+                status = "step_failed"
+                break
+            x, V = x_new, V_new
+            lams.append(x[-1])
+            Vs.append(V)
+            if iteration <= 3:
+                step = min(step * 1.5, max_step)
+
+        return PVCurve(self.network.bus_names, lams, Vs, nose_index, self.direction_mw, status)
+
+
+def continuation_power_flow(network, p_direction=None, q_direction=None, **kwargs):
+    """Runs a continuation power flow on a Circuit or CompiledNetwork and returns the PVCurve."""
+    return ContinuationPowerFlow(network, p_direction, q_direction).run(**kwargs)
@@ -1,98 +1,254 @@
 import numpy as np
 
 from Classes.Circuit import Circuit
-from Classes.generator import Generator
+from Classes.Kernels import sequence_voltages
+from Classes.Results import FaultResult, FaultSweepResult, PowerFlowResult
+
+# Symmetrical-component transformation: V_abc = A · V_012
+_a = np.exp(1j * 2 * np.pi / 3)
+A = np.array([[1, 1, 1],
+              [1, _a ** 2, _a],
+              [1, _a, _a ** 2]], dtype=complex)
+
+FAULT_TYPES = ("3ph", "slg", "ll", "dlg")
+SEQUENCES = ("zero", "positive", "negative")  # rows of V012 / I012
+
+
+def polar(values):
+    """(magnitude, angle in degrees) of a complex scalar or array."""
+    return np.abs(values), np.degrees(np.angle(values))
+
+
+def bus_phase_shifts(circuit, bus_order):
+    """
+    Per-bus multiplier e^{jθ} carrying the transformer phase shifts across the network: θ is
+    the sum of the shifts (phase_shift_deg, applied towards bus2) on a path from the slack bus, or from the first bus of an island without one. Lines keep the
+    angle; where loops disagree the first path found wins.
+    """
+    index = {bus: k for k, bus in enumerate(bus_order)}
+    neighbours = [[] for _ in bus_order]
+    for transformer in circuit.transformers.values():
+        b1, b2 = index.get(transformer.bus1.name), index.get(transformer.bus2.name)
+        if b1 is not None and b2 is not None:
+            neighbours[b1].append((b2, transformer.phase_shift_deg))
+            neighbours[b2].append((b1, -transformer.phase_shift_deg))
+    for line in circuit.transmission_lines.values():
+        b1, b2 = index.get(line.bus1.name), index.get(line.bus2.name)
+        if b1 is not None and b2 is not None:
+            neighbours[b1].append((b2, 0.0))
+            neighbours[b2].append((b1, 0.0))
+
+    slack = [index[name] for name, bus in circuit.buses.items() if bus.bus_type == "Slack Bus" and name in index]
+    angle = np.full(len(bus_order), np.nan)
+    for start in [*slack, *range(len(bus_order))]:
+        if not np.isnan(angle[start]):
+            continue
+        angle[start] = 0.0
+        stack = [start]
+        while stack:
+            k = stack.pop()
+            for j, shift in neighbours[k]:
+                if np.isnan(angle[j]):
+                    angle[j] = angle[k] + shift
+                    stack.append(j)
+    return np.exp(1j * np.radians(angle))
+
 
 class FaultStudySolver:
-    def __init__(self, circuit:Circuit, faulted_bus:str, fault_type='3ph', fault_impedance:float=0.0):
+    def __init__(self, circuit:Circuit, faulted_bus:str, fault_type='3ph', fault_impedance:float=0.0,
+                 verbose=True, networks=None):
+        """
+        `networks` (SequenceNetworks, optional) are the prebuilt sequence networks of the circuit;
+        pass the same object to every solver of a fault sweep so that the networks are built
+        and their Zbus inverted only once. Default: built from the circuit on solve.
+        """
         self.circuit = circuit
+        self.networks = networks
         self.faulted_bus = faulted_bus
         self.fault_type = fault_type.lower()
         self.fault_impedance = fault_impedance
+        self.verbose = verbose
         self.fault_current = None
-        self.voltages = {}
-        self.phase_voltages = {}
+
+        # Post-fault results as contiguous arrays ordered like bus_order:
+        # V012 rows are (V0, V1, V2), Vabc rows are (Va, Vb, Vc). The dict views
+        # (voltages, seq_voltages, phase_voltages) are built from them on access, and
+        # assigning a view writes it back into the arrays.
+        self.bus_order = []
+        self.V012 = None
+        self.Vabc = None
+        self.Va = None
 
     def run(self):
+        self.solve()
+        return self.fault_current, self.voltages
+
+    def solve(self):
+        """Computes the fault without building the per-bus dict views (for fault sweeps)."""
         if self.fault_type == '3ph':
-            return self.run_3ph_fault()
+            self._solve_3ph()
         elif self.fault_type == 'slg':
-            return self.run_slg_fault()
+            self._solve_slg()
         elif self.fault_type == 'll':
-            return self.run_ll_fault()
+            self._solve_ll()
         elif self.fault_type == 'dlg':
-            return self.run_dlg_fault()
+            self._solve_dlg()
         else:
             raise ValueError(f"Unsupported fault type: {self.fault_type}")
+        return self
 
     def run_3ph_fault(self):
-        '''
-        system base in the setting: Q of Generator1 = 100 Mvar, Q of Generator2 is 200 Mvar
-        pu S = sqrt(Q**2 + P**2)
-        '''
+        self._solve_3ph()
+        return self.fault_current, self.voltages
 
-        # For fault study, we use the augmented positive-sequence Ybus.
-        Ybus_positive_df = self.circuit.calc_ybus_positive()
-        Ybus_positive = Ybus_positive_df.values
+    def run_slg_fault(self):
+        self._solve_slg()
+        return self.fault_current, self.voltages
 
-        Zbus = np.linalg.inv(Ybus_positive)
+    def run_ll_fault(self):
+        """Line-to-Line (LL) fault"""
+        self._solve_ll()
+        return self.fault_current, self.voltages
 
-        # Determine the index corresponding to the faulted bus.
-        bus_order = list(Ybus_positive_df.index)
+    def run_dlg_fault(self):
+        """Double Line-to-Ground fault"""
+        self._solve_dlg()
+        return self.fault_current, self.voltages
+
+    def results(self):
+        """Array-backed FaultResult of the solved fault (for bulk export)."""
+        return FaultResult.from_solver(self)
+
+    # --- Result views -----------------------------------------------------------------
+
+    @property
+    def voltages(self):
+        """{bus: (|Va|, angle°)} with the angles referred to the slack bus."""
+        if self.Va is None:
+            return {}
+        mag, ang = polar(self.Va)
+        ang = ang - ang[self._slack_index()]
+        return dict(zip(self.bus_order, zip(mag.tolist(), ang.tolist())))
+
+    @voltages.setter
+    def voltages(self, values):
+        mag, ang = np.array(self._bus_values(values), dtype=float).T
+        self.Va = mag * np.exp(1j * np.radians(ang))
+
+    @property
+    def seq_voltages(self):
+        """{bus: (V0, V1, V2)} complex sequence voltages."""
+        if self.V012 is None:
+            return {}
+        return dict(zip(self.bus_order, zip(*self.V012.tolist())))
+
+    @seq_voltages.setter
+    def seq_voltages(self, values):
+        self.V012 = np.array(self._bus_values(values), dtype=complex).T.copy()
+
+    @property
+    def phase_voltages(self):
+        """{bus: ((|Va|, ∠Va), (|Vb|, ∠Vb), (|Vc|, ∠Vc))} with angles in degrees."""
+        if self.Vabc is None:
+            return {}
+        mag, ang = polar(self.Vabc)
+        return dict(zip(self.bus_order, zip(*(zip(m, g) for m, g in zip(mag.tolist(), ang.tolist())))))
+
+    @phase_voltages.setter
+    def phase_voltages(self, values):
+        polar_values = np.array(self._bus_values(values), dtype=float)  # (n, 3 phases, 2)
+        self.Vabc = (polar_values[:, :, 0] * np.exp(1j * np.radians(polar_values[:, :, 1]))).T.copy()
+        self.Va = self.Vabc[0]
+
+    def _bus_values(self, values):
+        """
+        Values of a {bus: value} view in bus_order, for the setters that write an assigned view
+        back into the arrays; bus_order is taken from the dict when not set yet.
+        """
+        if not self.bus_order:
+            self.bus_order = list(values)
+        missing = [bus for bus in self.bus_order if bus not in values]
+        if missing:
+            raise ValueError(f"No values for buses {missing}.")
+        return [values[bus] for bus in self.bus_order]
+
+    # --- Helpers ------------------------------------------------------------------------
+
+    def _zbus(self, sequence=None):
+        """
+        Zbus of one sequence network, or of all three (zero, positive, negative) when
+        `sequence` is None; sets bus_order.
+        """
+        if self.networks is None:
+            self.networks = self.circuit.calc_sequence_networks()
+        self.bus_order = list(self.networks.bus_names)
+        return self.networks.zbus(sequence)
+
+    def _fault_index(self):
         try:
-            n = bus_order.index(self.faulted_bus)
+            return self.bus_order.index(self.faulted_bus)
         except ValueError:
             raise ValueError(f"Faulted bus '{self.faulted_bus}' not found in the augmented Ybus.")
 
+    def _slack_index(self):
+        for name, bus in self.circuit.buses.items():
+            if bus.bus_type == "Slack Bus":
+                return self.bus_order.index(name)
+        raise ValueError("No Slack Bus defined in the circuit.")
+
+    def sequence_shifts(self):
+        """
+        Multipliers (3, n) taking the sequence voltages from the frame of the sequence networks
+        to that of each bus, relative to the faulted bus (the convention of FaultSweep): 1 for
+        the zero sequence, the phase shift of `bus_phase_shifts` for the positive and its
+        conjugate for the negative.
+        """
+        shift = bus_phase_shifts(self.circuit, self.bus_order)
+        shift = shift / shift[self._fault_index()]
+        return np.stack([np.ones_like(shift), shift, shift.conj()])
+
+    def _set_phase_results(self, I012):
+        self.Vabc = A @ self.V012
+        self.Va = self.Vabc[0]
+        I_abc = A @ np.asarray(I012, dtype=complex)
+        self.phase_fault_current = {
+            phase: (float(m), float(g)) for phase, m, g in zip(('Ia', 'Ib', 'Ic'), *polar(I_abc))
+        }
+
+    # --- Fault models -------------------------------------------------------------------
+
+    def _solve_3ph(self):
+        '''
+        system base in the setting: Q of Generator1 = 100 Mvar, Q of Generator2 is 200 Mvar
+        pu S = sqrt(Q**2 + P**2)
+        '''
+
+        # For fault study, we use the augmented positive-sequence Zbus.
+        Zbus = self._zbus("positive")
+
+        # Determine the index corresponding to the faulted bus.
+        n = self._fault_index()
 
         # Calculate fault current (V_F is 1.0 p.u. pre-fault voltage)
         V_F = 1.0
         Z_nn = Zbus[n, n] + self.fault_impedance # add fault impedance in series with the bus driving point
         I_complex = V_F / Z_nn
-        I_mag = np.abs(I_complex)
-        I_ang = np.degrees(np.angle(I_complex))
+        I_mag, I_ang = polar(I_complex)
         if I_ang > 180:
             I_ang -= 360
         self.fault_current = (I_mag, I_ang)  # ⬅️ store tuple, fully formatted
 
-        # Calculate post-fault bus voltages; at the faulted bus, E_n becomes 0.
-        raw_voltages = {}
-        for k, node in enumerate(bus_order):
-            E_k_complex = (1 - (Zbus[k, n] / Z_nn)) * V_F
-            magnitude = np.abs(E_k_complex)
-            angle_deg = np.degrees(np.angle(E_k_complex))
-            raw_voltages[node] = (magnitude, angle_deg)
-
-        # Dynamically find the slack bus
-        slack_bus = None
-        for name, bus in self.circuit.buses.items():
-            if bus.bus_type == "Slack Bus":
-                slack_bus = name
-                break
-
-        if slack_bus is None:
-            raise ValueError("No Slack Bus defined in the circuit.")
-
-        # Normalize all angles so that Slack Bus has angle 0°
-        ref_angle = raw_voltages[slack_bus][1]
-        # for node, (mag, ang) in raw_voltages.items():
-        #     self.voltages[node] = (mag, ang - ref_angle)
-        self.voltages = {node: (mag, ang - ref_angle) for node, (mag, ang) in raw_voltages.items()}
+        # Post-fault bus voltages; at the faulted bus, E_n becomes 0. The fault is balanced,
+        # so only the positive sequence is present and no phase quantities are reported.
+        Z = np.zeros((3, len(self.bus_order)), dtype=complex)
+        Z[1] = Zbus[:, n]
+        self.V012 = sequence_voltages(Z, (0, I_complex, 0), V_F) * self.sequence_shifts()
+        self.Vabc = None
+        self.Va = self.V012[1]
 
-        # updates: result should use voltage magnitude and degree
-        return self.fault_current, self.voltages  # where fault_current = (magnitude, angle)
-
-    def run_slg_fault(self):
-        Y1 = self.circuit.calc_ybus_positive()
-        Y2 = self.circuit.calc_ybus_negative()
-        Y0 = self.circuit.calc_ybus_zero()
-
-        Z1 = np.linalg.inv(Y1.values)
-        Z2 = np.linalg.inv(Y2.values)
-        Z0 = np.linalg.inv(Y0.values)
-
-        bus_order = list(Y1.index)
-        n = bus_order.index(self.faulted_bus)
+    def _solve_slg(self):
+        Z0, Z1, Z2 = self._zbus()
+        n = self._fault_index()
 
         Vf = 1.0
         Z_eq = Z1[n, n] + Z2[n, n] + Z0[n, n] + 3 * self.fault_impedance
@@ -106,116 +262,38 @@ class FaultStudySolver:
         self.seq_fault_current = (I0, I1, I2)
 
         # Store fault current in polar form
-        self.fault_current = (np.abs(If), np.degrees(np.angle(If)))
-
-        # Sequence voltages at all buses
-        slack_bus = next(name for name, bus in self.circuit.buses.items() if bus.bus_type == "Slack Bus")
-        slack_idx = bus_order.index(slack_bus)
-        V1_slack = 1 + 0j  # Prefault positive-sequence voltage at slack
-
-        V1 = np.array([V1_slack - Z1[k, n] * I1 for k in range(len(bus_order))])
-        V2 = np.array([-Z2[k, n] * I2 for k in range(len(bus_order))])
-        V0 = np.array([-Z0[k, n] * I0 for k in range(len(bus_order))])
+        self.fault_current = polar(If)
 
-        self.seq_voltages = {
-            bus_order[k]: (V0[k], V1[k], V2[k]) for k in range(len(bus_order))
-        }
+        # Sequence voltages at all buses (prefault positive-sequence voltage 1∠0°)
+        V012 = sequence_voltages([Z0[:, n], Z1[:, n], Z2[:, n]], (I0, I1, I2), Vf)
 
         # Enforce boundary condition: V0 + V1 + V2 = 0 at the faulted bus
-        V1[n] = V1_slack - Z1[n, n] * I1
-        V2[n] = - Z2[n, n] * I2
-        V0[n] = - (V1[n] + V2[n])
-
-        self.seq_voltages = {
-            bus_order[k]: (V0[k], V1[k], V2[k])
-            for k in range(len(bus_order))
-        }
-
-        # Track buses that have already been adjusted
-        adjusted_buses = set()
-
-        print("\n--- Adjusting Sequence Voltages Across Transformers ---")
-        for transformer in self.circuit.transformers.values():
-            b1 = transformer.bus1.name
-            b2 = transformer.bus2.name
-
-            if b1 in bus_order and b2 in bus_order:
-                i = bus_order.index(b1)
-                j = bus_order.index(b2)
-
-                if b2 not in adjusted_buses:
-                    old_V1, old_V2, old_V0 = V1[j], V2[j], V0[j]
-
-                    V1[j] = transformer.adjust_sequence_voltage(V1[j], direction="primary_to_secondary")
-                    V2[j] = transformer.adjust_sequence_voltage(V2[j], direction="primary_to_secondary")
-                    V0[j] = transformer.adjust_sequence_voltage(V0[j], direction="primary_to_secondary")
-
-                    adjusted_buses.add(b2)
-
-                    print(f"Adjusted {b2} via {transformer.name} (Δ→Y):")
-                    print(f"    V1: {old_V1:.4f} → {V1[j]:.4f}")
-                    print(f"    V2: {old_V2:.4f} → {V2[j]:.4f}")
-                    print(f"    V0: {old_V0:.4f} → {V0[j]:.4f}")
-
-        # Convert sequence voltages to phase voltages
-        a = np.exp(1j * 2 * np.pi / 3)
-        A = np.array([
-            [1, 1, 1],
-            [1, a ** 2, a],
-            [1, a, a ** 2]
-        ])
-        V_012 = np.vstack([V0, V1, V2])
-        V_abc = A @ V_012
-
-        # Enforce V_a = 0 at the faulted bus for bolted SLG
-        # V_abc[0, n] = 0.0
-
-        self.phase_voltages = {
-            bus_order[k]: (
-                (np.abs(V_abc[0, k]), np.degrees(np.angle(V_abc[0, k]))),  # Va
-                (np.abs(V_abc[1, k]), np.degrees(np.angle(V_abc[1, k]))),  # Vb
-                (np.abs(V_abc[2, k]), np.degrees(np.angle(V_abc[2, k]))),  # Vc
-            )
-            for k in range(len(bus_order))
-        }
-
-        print(
-            f"{transformer.name}: V_base_ratio = {transformer.V_base_ratio:.4f}, phase_shift = {transformer.phase_shift_deg}°")
-
-        # --- Phase Fault Currents ---
-        I_012 = np.array([I0, I1, I2])
-        I_abc = A @ I_012
-        self.phase_fault_current = {
-            'Ia': (np.abs(I_abc[0]), np.degrees(np.angle(I_abc[0]))),
-            'Ib': (np.abs(I_abc[1]), np.degrees(np.angle(I_abc[1]))),
-            'Ic': (np.abs(I_abc[2]), np.degrees(np.angle(I_abc[2]))),
-        }
-
-        # --- Per-unit Voltage Magnitude and Angle for Reporting ---
-        Va = V0 + V1 + V2
-        raw_voltages = {
-            bus_order[k]: (np.abs(Va[k]), np.degrees(np.angle(Va[k])))
-            for k in range(len(bus_order))
-        }
-
-        ref_angle = raw_voltages[slack_bus][1]
-        self.voltages = {
-            bus: (mag, ang - ref_angle) for bus, (mag, ang) in raw_voltages.items()
-        }
-
-        return self.fault_current, self.voltages
-
-    def run_ll_fault(self):
-        """Line-to-Line (LL) fault"""
-        # Build sequence Ybus and invert to get Zbus for pos & neg
-        Y1 = self.circuit.calc_ybus_positive()
-        Y2 = self.circuit.calc_ybus_negative()
-        Z1 = np.linalg.inv(Y1.values)
-        Z2 = np.linalg.inv(Y2.values)
+        V012[0, n] = -(V012[1, n] + V012[2, n])
+
+        # Transformer phase shifts of every bus relative to the faulted bus
+        shifts = self.sequence_shifts()
+        self.V012 = V012 * shifts
+
+        if self.verbose:
+            print("\n--- Adjusting Sequence Voltages Across Transformers ---")
+            for j in np.flatnonzero(~np.isclose(shifts[1], 1)):
+                print(f"Adjusted {self.bus_order[j]} by {np.degrees(np.angle(shifts[1, j])):+.1f}°:")
+                print(f"    V1: {V012[1, j]:.4f} → {self.V012[1, j]:.4f}")
+                print(f"    V2: {V012[2, j]:.4f} → {self.V012[2, j]:.4f}")
+                print(f"    V0: {V012[0, j]:.4f} → {self.V012[0, j]:.4f}")
+            if self.circuit.transformers:
+                transformer = list(self.circuit.transformers.values())[-1]
+                print(f"{transformer.name}: V_base_ratio = {transformer.V_base_ratio:.4f}, "
+                      f"phase_shift = {transformer.phase_shift_deg}°")
+
+        self._set_phase_results((I0, I1, I2))
+
+    def _solve_ll(self):
+        # Zbus of the sequence networks (only pos & neg carry current)
+        _, Z1, Z2 = self._zbus()
 
         # Find faulted‐bus index
-        bus_order = list(Y1.index)
-        n = bus_order.index(self.faulted_bus)
+        n = self._fault_index()
 
         # Pre-fault voltage
         Vf = 1.0
@@ -231,154 +309,223 @@ class FaultStudySolver:
         # Store sequence fault currents
         self.seq_fault_current = (I0, I1, I2)
 
-        # Also store total phase‐fault current (magnitude & angle) for reporting
-        I_mag = np.abs(I1)
-        I_ang = np.degrees(np.angle(I1))
-        if I_ang > 180:
-            I_ang -= 360
-        self.fault_current = (I_mag, I_ang)
-
         # Compute sequence voltages at every bus
-        V1 = np.array([1 - Z1[k, n] * I1 for k in range(len(bus_order))], dtype=complex)
-        V2 = np.array([-Z2[k, n] * I2 for k in range(len(bus_order))], dtype=complex)
-        V0 = np.zeros(len(bus_order), dtype=complex)
-
-        V2[n] = 0 + 0j
-        V0[n] = 0 + 0j
-        V1[n] = Vf - Z1[n, n] * I1
-
-        self.seq_voltages = {
-            bus_order[k]: (V0[k], V1[k], V2[k])
-            for k in range(len(bus_order))
-        }
+        V012 = sequence_voltages([np.zeros(len(self.bus_order)), Z1[:, n], Z2[:, n]], (I0, I1, I2), Vf)
+        V012[2, n] = 0 + 0j
+        self.V012 = V012 * self.sequence_shifts()
 
         # Transform to phase voltages & phase currents
-        a = np.exp(1j * 2 * np.pi / 3)
-        A = np.array([[1, 1, 1],
-                      [1, a ** 2, a],
-                      [1, a, a ** 2]], dtype=complex)
-
-        V012 = np.vstack([V0, V1, V2])  # shape (3, N)
-        Vabc = A @ V012  # shape (3, N)
-        I012 = np.array([I0, I1, I2])  # shape (3,)
-        Iabc = A @ I012  # shape (3,)
-
-        self.phase_voltages = {
-            bus_order[k]: (
-                (abs(Vabc[0, k]), np.degrees(np.angle(Vabc[0, k]))),
-                (abs(Vabc[1, k]), np.degrees(np.angle(Vabc[1, k]))),
-                (abs(Vabc[2, k]), np.degrees(np.angle(Vabc[2, k]))),
-            )
-            for k in range(len(bus_order))
-        }
+        self._set_phase_results((I0, I1, I2))
 
-        self.phase_fault_current = {
-            'Ia': (abs(Iabc[0]), np.degrees(np.angle(Iabc[0]))),
-            'Ib': (abs(Iabc[1]), np.degrees(np.angle(Iabc[1]))),
-            'Ic': (abs(Iabc[2]), np.degrees(np.angle(Iabc[2]))),
-        }
-
-        Ib_cplx = Iabc[1]
-        mag_B = np.abs(Ib_cplx)
-        ang_B = np.degrees(np.angle(Ib_cplx))
+        # The reported fault current is the phase-b current
+        mag_B, ang_B = self.phase_fault_current['Ib']
         if ang_B > 180:
             ang_B -= 360
         self.fault_current = (mag_B, ang_B)
 
-        # Normalize phase‐voltages so slack bus angle = 0°
-        slack_bus = next(name for name, b in self.circuit.buses.items() if b.bus_type == "Slack Bus")
-        ref_ang = self.phase_voltages[slack_bus][0][1]  # Va angle at slack
-        self.voltages = {
-            bus: (Va_mag, Va_ang - ref_ang)
-            for bus, ((Va_mag, Va_ang), _, _) in self.phase_voltages.items()
-        }
-
-        return self.fault_current, self.voltages
-
-    def run_dlg_fault(self):
-        """Double Line-to-Ground fault"""
-        # Build sequence Ybus and invert to get Zbus for pos/neg/zero
-        Y1 = self.circuit.calc_ybus_positive()
-        Y2 = self.circuit.calc_ybus_negative()
-        Y0 = self.circuit.calc_ybus_zero()
-        Z1 = np.linalg.inv(Y1.values)
-        Z2 = np.linalg.inv(Y2.values)
-        Z0 = np.linalg.inv(Y0.values)
+    def _solve_dlg(self):
+        # Zbus of the pos/neg/zero sequence networks
+        Z0, Z1, Z2 = self._zbus()
 
         # Find faulted‐bus index
-        bus_order = list(Y1.index)
-        n = bus_order.index(self.faulted_bus)
+        n = self._fault_index()
 
         # Pre-fault voltage
         Vf = 1.0
 
-        # Equivalent driving‐point impedance: all three seq nets in series, plus 3·Zf for the ground connection
-        Z_eq = Z1[n, n] + Z2[n, n] + Z0[n, n] + 3 * self.fault_impedance
-
-        # All three sequence currents equal I_f = 3·Vf / Z_eq
-        I_f = 3 * Vf / Z_eq
-        I0 = I1 = I2 = I_f
+        # Negative-sequence network in parallel with the zero-sequence network (plus 3·Zf to
+        # ground), the pair in series with the positive-sequence network
+        Z0g = Z0[n, n] + 3 * self.fault_impedance
+        I1 = Vf / (Z1[n, n] + Z2[n, n] * Z0g / (Z2[n, n] + Z0g))
+        I2 = -I1 * Z0g / (Z2[n, n] + Z0g)
+        I0 = -I1 * Z2[n, n] / (Z2[n, n] + Z0g)
 
         # Store sequence fault currents
         self.seq_fault_current = (I0, I1, I2)
 
-        # Also store total phase‐fault current (magnitude & angle) for reporting
-        I_mag = np.abs(I_f)
-        I_ang = np.degrees(np.angle(I_f))
-        if I_ang > 180:
-            I_ang -= 360
-        self.fault_current = (I_mag, I_ang)
-
         # Compute sequence voltages at every bus
-        N = len(bus_order)
-        V1 = np.array([1.0 - Z1[k, n] * I1 for k in range(N)])
-        V2 = np.array([-Z2[k, n] * I2 for k in range(N)])
-        V0 = np.array([-Z0[k, n] * I0 for k in range(N)])
-
-        self.seq_voltages = {
-            bus_order[k]: (V0[k], V1[k], V2[k])
-            for k in range(N)
-        }
+        self.V012 = sequence_voltages([Z0[:, n], Z1[:, n], Z2[:, n]], (I0, I1, I2), Vf) * self.sequence_shifts()
 
         # Transform to phase quantities
-        a = np.exp(1j * 2 * np.pi / 3)
-        A = np.array([[1, 1, 1],
-                      [1, a ** 2, a],
-                      [1, a, a ** 2]])
-
-        V012 = np.vstack([V0, V1, V2])
-        Vabc = A @ V012
-        self.phase_voltages = {
-            bus_order[k]: (
-                (abs(Vabc[0, k]), np.degrees(np.angle(Vabc[0, k]))),
-                (abs(Vabc[1, k]), np.degrees(np.angle(Vabc[1, k]))),
-                (abs(Vabc[2, k]), np.degrees(np.angle(Vabc[2, k]))),
-            )
-            for k in range(N)
-        }
+        self._set_phase_results((I0, I1, I2))
 
-        I012 = np.array([I0, I1, I2])
-        Iabc = A @ I012
-        self.phase_fault_current = {
-            'Ia': (abs(Iabc[0]), np.degrees(np.angle(Iabc[0]))),
-            'Ib': (abs(Iabc[1]), np.degrees(np.angle(Iabc[1]))),
-            'Ic': (abs(Iabc[2]), np.degrees(np.angle(Iabc[2]))),
-        }
+        # The reported fault current is the larger of the two faulted phase currents (b, c)
+        phase = max(('Ib', 'Ic'), key=lambda p: self.phase_fault_current[p][0])
+        self.fault_current = self.phase_fault_current[phase]
 
-        # Normalize phase‐voltages to slack reference
-        slack = next(b for b, obj in self.circuit.buses.items() if obj.bus_type == "Slack Bus")
-        ref_ang = self.phase_voltages[slack][0][1]
-        self.voltages = {
-            bus: (mag, ang - ref_ang)
-            for bus, (Va, Vb, Vc) in self.phase_voltages.items()
-            for mag, ang in [Va]
-        }
+    def __repr__(self):
+        return f"FaultStudySolver(faulted_bus='{self.faulted_bus}', fault_type='{self.fault_type}')"
 
-        return self.fault_current, self.voltages
 
+class FaultSweep:
+    """
+    Faults at many buses solved together by superposition.
+
+    The post-fault state of a fault at bus k is the prefault state minus the response of the
+    sequence networks to the fault currents injected at k:
+        V012 = V012_prefault - Z[:, :, k] · I012(k)
+    With the Zbus columns of all faulted buses taken at once, every fault current and every
+    post-fault voltage of the sweep is one array expression; no per-fault solve is needed.
+
+    prefault=None is the classical study of FaultStudySolver: 1.0 p.u. everywhere and the
+    networks without loads. Otherwise `prefault` holds the converged power-flow voltages (a
+    PowerFlowResult, a {bus: complex} dict or an array in bus order), and the loads are added
+    to the positive- and negative-sequence networks as constant admittances y = conj(S) / |V|²
+    at those voltages, so that every fault starts from the actual operating point.
+
+    With branches=True (or a list of branch names) `solve` also returns the contribution of
+    every line and transformer: the sequence currents entering each branch at both ends follow
+    from the post-fault voltages and the branch stamps of the sequence networks,
+        I_from = y11·V_from + y12·V_to,    I_to = y21·V_from + y22·V_to
+    evaluated for all faults and branches as one array expression (phase currents by A·I012).
+
+    The post-fault voltages and branch currents are returned with the transformer phase shifts
+    of their buses (`bus_phase_shifts`) applied, taken relative to the faulted bus so that the
+    fault conditions hold there: the positive sequence is rotated by the shift, the negative
+    sequence by its conjugate and the zero sequence is left as is. The phase quantities
+    (A·V012, A·I012) are then those seen on each side of the transformers.
+    """
+
+    def __init__(self, circuit: Circuit, fault_type="3ph", fault_impedance=0.0, prefault=None, networks=None):
+        self.fault_type = fault_type.lower()
+        if self.fault_type not in FAULT_TYPES:
+            raise ValueError(f"Unsupported fault type: {fault_type}")
+        self.circuit = circuit
+        self.fault_impedance = fault_impedance
+        networks = circuit.calc_sequence_networks() if networks is None else networks
+        self.bus_names = list(networks.bus_names)
+        self.shift = bus_phase_shifts(circuit, self.bus_names)
+
+        if prefault is None:
+            self.prefault_source = "flat"
+            self.prefault = np.ones(len(self.bus_names), dtype=complex)
+            self.networks = networks
+        else:
+            self.prefault_source = "power flow"
+            self.prefault = self._prefault_vector(prefault)
+            self.networks = networks.with_shunts(self.load_admittances())
+
+    def _prefault_vector(self, prefault):
+        if isinstance(prefault, PowerFlowResult):
+            prefault = dict(zip(prefault.names.tolist(), prefault.complex_voltage.tolist()))
+        if isinstance(prefault, dict):
+            missing = [bus for bus in self.bus_names if bus not in prefault]
+            if missing:
+                raise ValueError(f"No prefault voltage for buses {missing}.")
+            return np.array([prefault[bus] for bus in self.bus_names], dtype=complex)
+        V = np.asarray(prefault, dtype=complex)
+        if V.shape != (len(self.bus_names),):
+            raise ValueError(f"Expected {len(self.bus_names)} prefault voltages, got shape {V.shape}.")
+        return V
+
+    def load_admittances(self):
+        """Load shunts (3, n) in SEQUENCE_ORDER at the prefault voltages; no zero-sequence path."""
+        index = {bus: k for k, bus in enumerate(self.bus_names)}
+        base = self.circuit.get_base_power()
+        shunts = np.zeros((3, len(self.bus_names)), dtype=complex)
+        for load in self.circuit.loads.values():
+            k = index[load.bus.name]
+            shunts[1:, k] += complex(load.real_power, -load.reactive_power) / base / abs(self.prefault[k]) ** 2
+        return shunts
+
+    def solve(self, buses=None, branches=False):
+        """
+        Faults at `buses` (default: every bus), returned as a FaultSweepResult with the fault
+        currents and the post-fault voltages of all buses for each fault, and the branch
+        contributions when `branches` is True or a list of branch names.
+        """
+        index = {bus: k for k, bus in enumerate(self.bus_names)}
+        buses = self.bus_names if buses is None else list(buses)
+        unknown = [bus for bus in buses if bus not in index]
+        if unknown:
+            raise ValueError(f"Faulted buses {unknown} not found in the sequence networks.")
+        faults = np.array([index[bus] for bus in buses], dtype=np.intp)
+        n, F = len(self.bus_names), len(faults)
+
+        # Zbus columns of the faulted buses, as (F, n) per sequence; None where the fault does not
+        # excite the sequence
+        used = {"3ph": (1,), "ll": (1, 2)}.get(self.fault_type, (0, 1, 2))
+        Z = [self.networks.zbus(SEQUENCES[s])[:, faults].T if s in used else None for s in range(3)]
+        Z0, Z1, Z2 = (np.zeros(F, dtype=complex) if z is None else z[np.arange(F), faults] for z in Z)
+        Vf = self.prefault[faults]
+        Zf = self.fault_impedance
+
+        I012 = np.zeros((3, F), dtype=complex)
+        if self.fault_type == "3ph":
+            I012[1] = Vf / (Z1 + Zf)
+        elif self.fault_type == "slg":
+            I012[:] = Vf / (Z0 + Z1 + Z2 + 3 * Zf)
+        elif self.fault_type == "ll":
+            I012[1] = Vf / (Z1 + Z2 + Zf)
+            I012[2] = -I012[1]
+        else:
+            # Negative sequence in parallel with the zero sequence (plus 3·Zf to ground)
+            Z0g = Z0 + 3 * Zf
+            I012[1] = Vf / (Z1 + Z2 * Z0g / (Z2 + Z0g))
+            I012[2] = -I012[1] * Z0g / (Z2 + Z0g)
+            I012[0] = -I012[1] * Z2 / (Z2 + Z0g)
+
+        # Superposition for all faults at once, (F, 3, n)
+        V012 = np.zeros((F, 3, n), dtype=complex)
+        for s in used:
+            np.multiply(Z[s], -I012[s][:, None], out=V012[:, s])
+        V012[:, 1] += self.prefault
+
+        if branches is False or branches is None:
+            V012 *= self.sequence_shifts(faults)
+            return FaultSweepResult(buses, I012, Vf, self.bus_names, V012, self.fault_type, Zf, self.prefault_source)
+        names, f, t, I_from, I_to = self.branch_currents(V012, None if branches is True else branches, faults)
+        V012 *= self.sequence_shifts(faults)
+        bus_names = np.asarray(self.bus_names, dtype=str)
+        return FaultSweepResult(buses, I012, Vf, self.bus_names, V012, self.fault_type, Zf, self.prefault_source,
+                                names, bus_names[f], bus_names[t], I_from, I_to)
+
+    def sequence_shifts(self, faults):
+        """
+        Multipliers (faults, 3, n) taking sequence quantities from the frame of the sequence
+        networks to that of each bus, relative to the faulted bus (indices `faults`): 1 for the
+        zero sequence, the phase shift for the positive and its conjugate for the negative.
+        """
+        shift = self.shift[None, :] / self.shift[np.asarray(faults, dtype=np.intp)][:, None]
+        return np.stack([np.ones_like(shift), shift, shift.conj()], axis=1)
+
+    def branch_currents(self, V012, branches=None, faults=None):
+        """
+        Sequence currents (faults, 3, m) entering the branches (default: all lines and
+        transformers) at their from and to ends for post-fault voltages V012 (faults, 3, n) in
+        the frame of the sequence networks. With the indices of the faulted buses (`faults`)
+        the currents are returned with the phase shifts of their end buses applied
+        (`sequence_shifts`), as FaultSweep.solve reports them.
+
+        Returns:
+            (branch names, from-bus indices, to-bus indices, I012_from, I012_to)
+        """
+        networks = self.networks
+        if branches is None:
+            index = np.arange(len(networks.branch_names))
+        else:
+            position = {name: k for k, name in enumerate(networks.branch_names)}
+            unknown = [name for name in branches if name not in position]
+            if unknown:
+                raise ValueError(f"Branches {unknown} not found in the sequence networks.")
+            index = np.array([position[name] for name in branches], dtype=np.intp)
+        f, t = networks.branch_from[index], networks.branch_to[index]
+        y = networks.branch_stamps[:, index]  # (3, m, 2, 2)
+
+        V_from, V_to = V012[:, :, f], V012[:, :, t]
+        I_from = y[:, :, 0, 0] * V_from + y[:, :, 0, 1] * V_to
+        I_to = y[:, :, 1, 0] * V_from + y[:, :, 1, 1] * V_to
+        if faults is not None:
+            shifts = self.sequence_shifts(faults)
+            I_from *= shifts[:, :, f]
+            I_to *= shifts[:, :, t]
+        return [networks.branch_names[k] for k in index], f, t, I_from, I_to
 
     def __repr__(self):
-        return f"FaultStudySolver(faulted_bus='{self.faulted_bus}', fault_type='{self.fault_type}')"
-
+        return (f"FaultSweep(fault_type='{self.fault_type}', buses={len(self.bus_names)}, "
+                f"prefault='{self.prefault_source}')")
 
 
+def fault_sweep(circuit, fault_type="3ph", buses=None, prefault=None, branches=False, **kwargs):
+    """One-off fault sweep of a Circuit (see FaultSweep)."""
+    return FaultSweep(circuit, fault_type, prefault=prefault, **kwargs).solve(buses, branches=branches)
@@ -0,0 +1,317 @@
+import numpy as np
+
+from Classes.lazy_import import lazy_import
+from Classes.transmission_line import equivalent_pi
+
+pd = lazy_import("pandas")
+sparse = lazy_import("scipy.sparse")
+sparse_linalg = lazy_import("scipy.sparse.linalg")
+
+SCAN_SEQUENCES = ("positive", "negative", "zero")
+
+
+def _series_admittance(z, h):
+    """
+    Admittances (F, k) of series impedances z (k,) given at the nominal frequency, at the
+    harmonic orders h (F,): R stays, X scales with h. Zero impedances have no path (0).
+    """
+    z = np.asarray(z, dtype=complex)
+    z_h = z.real + 1j * np.outer(h, z.imag)
+    y = np.zeros_like(z_h)
+    path = z != 0
+    y[:, path] = 1 / z_h[:, path]
+    return y
+
+
+class ImpedanceScan:
+    """
+    Result of a frequency scan: bus impedances (p.u.) among the selected buses per frequency.
+
+    Attributes:
+        frequency (ndarray, (F,)): scan frequencies (Hz).
+        harmonic (ndarray, (F,)): frequencies as multiples of the nominal frequency.
+        bus_names (ndarray, (k,)): selected buses.
+        Z (ndarray, (F, k, k)): Z[f, i, j] is the voltage at bus i per unit current injected
+            at bus j; the diagonal holds the driving-point impedances, the rest the transfer
+            impedances.
+    """
+
+    def __init__(self, frequency, nominal_frequency, bus_names, Z, sequence):
+        self.frequency = np.asarray(frequency, dtype=float)
+        self.harmonic = self.frequency / nominal_frequency
+        self.bus_names = np.asarray(bus_names, dtype=str)
+        self.Z = np.asarray(Z, dtype=complex)
+        self.sequence = sequence
+        self._index = {name: i for i, name in enumerate(self.bus_names.tolist())}
+
+    def index(self, bus):
+        try:
+            return self._index[bus]
+        except KeyError:
+            raise ValueError(f"Bus '{bus}' was not selected in the scan.")
+
+    def driving_point(self, bus=None):
+        """Driving-point impedance of one bus (F,), or of all selected buses (F, k)."""
+        if bus is None:
+            return np.diagonal(self.Z, axis1=1, axis2=2)
+        i = self.index(bus)
+        return self.Z[:, i, i]
+
+    def transfer(self, bus_from, bus_to):
+        """Transfer impedance (F,): voltage at `bus_to` per unit current injected at `bus_from`."""
+        return self.Z[:, self.index(bus_to), self.index(bus_from)]
+
+    def resonances(self, bus, kind="parallel"):
+        """
+        Frequencies (Hz) of the local maxima ("parallel" resonances) or minima ("series")
+        of the driving-point impedance magnitude of `bus` on the scan grid.
+        """
+        if kind not in ("parallel", "series"):
+            raise ValueError(f"Invalid resonance kind '{kind}'. Must be 'parallel' or 'series'.")
+        z = np.abs(self.driving_point(bus))
+        z = z if kind == "parallel" else -z
+        peak = np.flatnonzero((z[1:-1] > z[:-2]) & (z[1:-1] > z[2:])) + 1
+        return self.frequency[peak]
+
+    def to_frame(self):
+        """One row per frequency: harmonic order and |Z| (p.u.) at every selected bus."""
+        frame = pd.DataFrame(np.abs(self.driving_point()), columns=self.bus_names,
+                             index=pd.Index(self.frequency, name="frequency"))
+        frame.insert(0, "harmonic", self.harmonic)
+        return frame
+
+    def __repr__(self):
+        return (f"ImpedanceScan(sequence='{self.sequence}', frequencies={len(self.frequency)}, "
+                f"buses={len(self.bus_names)})")
+
+
+class FrequencyScan:
+    """
+    Sequence-network admittance matrices of a circuit over a grid of frequencies.
+
+    Every element keeps its nominal-frequency resistance and scales its inductive reactance
+    with the harmonic order h = f / f_nominal (line series impedances, transformer X/R,
+    generator x1/x2/x0); line charging scales with h as a capacitance. Grounding impedances and
+    resistances are frequency independent. The positive and negative networks include the line
+    charging (charging=True) and optionally the loads as constant impedances at 1 p.u. voltage
+    (loads=True: conductance P, inductive or capacitive susceptance Q). With charging=False and
+    loads=False the matrices at h = 1 are those of Circuit.calc_sequence_networks. Lines with
+    line_model="long" are exact equivalent π at every frequency (the hyperbolic corrections
+    use the line charging whether or not it is stamped).
+
+    The element data are gathered once. All frequencies share one sparsity pattern: the
+    per-element stamps are evaluated for the whole grid at once, shape (F, entries), and summed
+    onto the pattern with one sparse product. For the impedances (`scan`) the fill-reducing
+    ordering and the permuted CSC pattern are computed once; each frequency then only refactors
+    numerically. Small networks (up to `dense_limit` buses) are solved as dense batches instead.
+    """
+
+    def __init__(self, circuit, sequence="positive", charging=True, loads=False):
+        if sequence not in SCAN_SEQUENCES:
+            raise ValueError(f"Invalid sequence '{sequence}'. Must be 'positive', 'negative', or 'zero'.")
+        self.sequence = sequence
+        self.nominal_frequency = circuit.get_frequency()
+        self.bus_names = circuit.bus_order()
+        n = len(self.bus_names)
+        index = circuit.bus_index()
+
+        lines = list(circuit.transmission_lines.values())
+        transformers = list(circuit.transformers.values())
+        generators = list(circuit.generators.values())
+
+        def bus(components, end):
+            return np.array([index[getattr(c, end).name] for c in components], dtype=np.intp)
+
+        # Lines: series impedance and total charging susceptance (p.u.)
+        self.line_from, self.line_to = bus(lines, "bus1"), bus(lines, "bus2")
+        self.charging = charging and sequence != "zero"
+        if sequence == "zero":
+            self.line_z = np.array([l.z0_pu if l.zero_seq_model == "enabled" else 0 for l in lines], dtype=complex)
+            self.line_b = np.zeros(len(lines))  # zero-sequence charging is not modelled
+        else:
+            self.line_z = np.array([l.z_pu_sys for l in lines], dtype=complex)
+            self.line_b = np.array([l.b_shunt_pu for l in lines], dtype=float)
+        self.line_long = (np.array([l.line_model == "long" for l in lines], dtype=bool)
+                          & (self.line_b != 0) & (self.line_z != 0))
+
+        # Transformers: series impedance, tap, and the zero-sequence grounding paths
+        self.xfmr_from, self.xfmr_to = bus(transformers, "bus1"), bus(transformers, "bus2")
+        self.xfmr_z = np.array([x.z_pu_sys if x.y_pu_sys != 0 else 0 for x in transformers], dtype=complex)
+        self.xfmr_tap = np.array([x.tap_ratio for x in transformers], dtype=float)
+        grounded1 = [x.primary_connection_type == "wye" and x.is_grounded_bus1 for x in transformers]
+        grounded2 = [x.secondary_connection_type == "wye" and x.is_grounded_bus2 for x in transformers]
+        # Same rules as Transformer.calc_stamps: a winding leg needs a grounding impedance
+        self.xfmr_zn1 = np.array([1 / x.Yn1 if g and x.Yn1 else np.inf for x, g in zip(transformers, grounded1)])
+        self.xfmr_zn2 = np.array([1 / x.Yn2 if g and x.Yn2 else np.inf for x, g in zip(transformers, grounded2)])
+        self.xfmr_mutual = np.array([a and b for a, b in zip(grounded1, grounded2)], dtype=bool)
+
+        # Generators: sequence impedance to ground (the paths of Generator.shunts)
+        self.gen_bus = np.array([index[g.bus.name] for g in generators], dtype=np.intp)
+        self.gen_z = np.array([self._generator_impedance(g) for g in generators], dtype=complex)
+
+        # Loads: admittance at 1 p.u. voltage on the system base
+        self.load_bus = np.zeros(0, dtype=np.intp)
+        self.load_g = self.load_b = np.zeros(0)
+        if loads and sequence != "zero":
+            base = circuit.get_base_power()
+            circuit_loads = list(circuit.loads.values())
+            self.load_bus = np.array([index[l.bus.name] for l in circuit_loads], dtype=np.intp)
+            self.load_g = np.array([l.real_power / base for l in circuit_loads], dtype=float)
+            self.load_b = np.array([-l.reactive_power / base for l in circuit_loads], dtype=float)
+
+        # Entry list (2×2 stamp of every branch, then the shunts) and the shared pattern
+        rows = np.concatenate([np.stack([f, f, t, t], axis=1).ravel()
+                               for f, t in ((self.line_from, self.line_to), (self.xfmr_from, self.xfmr_to))]
+                              + [self.gen_bus, self.load_bus])
+        cols = np.concatenate([np.stack([f, t, f, t], axis=1).ravel()
+                               for f, t in ((self.line_from, self.line_to), (self.xfmr_from, self.xfmr_to))]
+                              + [self.gen_bus, self.load_bus])
+        keys, position = np.unique(rows * n + cols, return_inverse=True)
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(keys // n, minlength=n))])
+        self.indices = keys % n
+        self._sum = sparse.csr_matrix((np.ones(len(position)), (np.arange(len(position)), position)),
+                                      shape=(len(position), len(keys)))
+        self._ordering = None
+
+    def _generator_impedance(self, generator):
+        if self.sequence == "positive":
+            return 1j * generator.x1 if generator.x1 else 0
+        if self.sequence == "negative":
+            return 1j * generator.x2 if generator.x2 else 0
+        if generator.x0 is None or not generator.is_grounded or generator.Yn is None:
+            return 0
+        neutral = 3 * generator.zn_pu if generator.Yn != float("inf") else 0
+        return neutral + 1j * generator.x0
+
+    @property
+    def num_buses(self):
+        return len(self.bus_names)
+
+    def harmonics(self, frequencies):
+        return np.atleast_1d(np.asarray(frequencies, dtype=float)) / self.nominal_frequency
+
+    def entries(self, frequencies):
+        """Values (F, entries) of every stamp entry, in the order of the entry list."""
+        h = self.harmonics(frequencies)
+        if np.any(h <= 0):
+            raise ValueError("Scan frequencies must be positive.")
+
+        y = _series_admittance(self.line_z, h)
+        shunt = 1j * np.outer(h, self.line_b)
+        if np.any(self.line_long):
+            # Exact equivalent π of the long lines over the whole grid, (F, long lines) at once
+            z = self.line_z[self.line_long]
+            z_pi, shunt[:, self.line_long] = equivalent_pi(z.real + 1j * np.outer(h, z.imag),
+                                                           shunt[:, self.line_long])
+            y[:, self.line_long] = 1 / z_pi
+        shunt = shunt / 2 if self.charging else np.zeros_like(shunt)
+        line = np.stack([y + shunt, -y, -y, y + shunt], axis=2)
+
+        t = self.xfmr_tap
+        if self.sequence == "zero":
+            # Wye legs in series with their grounding impedance, mutual term for grounded wye-wye
+            z = self.xfmr_z.real + 1j * np.outer(h, self.xfmr_z.imag)
+            path = self.xfmr_z != 0
+            y11, y22, mutual = (np.zeros_like(z) for _ in range(3))
+            for y_leg, zn in ((y11, self.xfmr_zn1), (y22, self.xfmr_zn2)):
+                leg = path & np.isfinite(zn)
+                y_leg[:, leg] = 1 / (z[:, leg] + zn[leg])
+            both = path & self.xfmr_mutual
+            mutual[:, both] = -1 / z[:, both]
+            # The off-nominal tap scales the bus1 side, as in Transformer.calc_stamps
+            xfmr = np.stack([y11 / t ** 2, mutual / t, mutual / t, y22], axis=2)
+        else:
+            y = _series_admittance(self.xfmr_z, h)
+            xfmr = np.stack([y / t ** 2, -y / t, -y / t, y], axis=2)
+
+        gen = _series_admittance(self.gen_z, h)
+        # Inductive load susceptance (b < 0) falls with h, capacitive (b > 0) rises
+        load_b = np.where(self.load_b < 0, self.load_b / h[:, None], self.load_b * h[:, None])
+        load = self.load_g + 1j * load_b
+
+        return np.concatenate([line.reshape(len(h), -1), xfmr.reshape(len(h), -1), gen, load], axis=1)
+
+    def ybus_data(self, frequencies):
+        """Ybus values (F, nnz) of every frequency on the shared CSR pattern (`indptr`, `indices`)."""
+        values = self.entries(frequencies)
+        # (S^T · values^T)^T: sums the entries of each pattern position for all frequencies at once
+        return np.asarray((self._sum.T @ values.T).T)
+
+    def ybus(self, frequency):
+        """CSR Ybus (p.u.) at one frequency (Hz)."""
+        n = self.num_buses
+        return sparse.csr_matrix((self.ybus_data(frequency)[0], self.indices, self.indptr), shape=(n, n))
+
+    def _sparse_ordering(self):
+        """
+        Fill-reducing symmetric permutation (from the nominal-frequency Ybus) and the permuted
+        CSC pattern with the position of each of its entries in the CSR data, computed once.
+        """
+        if self._ordering is None:
+            n = self.num_buses
+            ybus = self.ybus(self.nominal_frequency).tocsc()
+            order = np.argsort(sparse_linalg.splu(ybus, permc_spec="COLAMD").perm_c)
+            position = sparse.csr_matrix((np.arange(len(self.indices), dtype=float), self.indices, self.indptr),
+                                         shape=(n, n))
+            permuted = position[order][:, order].tocsc()
+            permuted.sort_indices()
+            self._ordering = order, permuted.indptr, permuted.indices, permuted.data.astype(np.intp)
+        return self._ordering
+
+    def scan(self, frequencies, buses=None, dense_limit=300, chunk_bytes=64 * 2 ** 20):
+        """
+        Driving-point and transfer impedances among `buses` (default: all) over `frequencies`
+        (Hz). Returns an ImpedanceScan. The Ybus values are built for `chunk_bytes` worth of
+        frequencies at a time.
+        """
+        frequencies = np.atleast_1d(np.asarray(frequencies, dtype=float))
+        buses = list(self.bus_names) if buses is None else list(buses)
+        index = {name: i for i, name in enumerate(self.bus_names)}
+        missing = [b for b in buses if b not in index]
+        if missing:
+            raise ValueError(f"Buses not found in the circuit: {missing}")
+        selected = np.array([index[b] for b in buses], dtype=np.intp)
+
+        n, k, F = self.num_buses, len(selected), len(frequencies)
+        Z = np.empty((F, k, k), dtype=complex)
+        rhs = np.zeros((n, k), dtype=complex)
+        rhs[selected, np.arange(k)] = 1
+
+        if n <= dense_limit:
+            rows = np.repeat(np.arange(n), np.diff(self.indptr))
+            step = max(1, chunk_bytes // (16 * n * n))
+            for start in range(0, F, step):
+                data = self.ybus_data(frequencies[start:start + step])
+                ybus = np.zeros((len(data), n, n), dtype=complex)
+                ybus[:, rows, self.indices] = data
+                try:
+                    columns = np.linalg.solve(ybus, np.broadcast_to(rhs, (len(data), n, k)))
+                except np.linalg.LinAlgError:
+                    raise ValueError(f"The {self.sequence}-sequence network is singular in the scan range.")
+                Z[start:start + step] = columns[:, selected, :]
+        else:
+            order, indptr, indices, position = self._sparse_ordering()
+            rhs_permuted = rhs[order]
+            step = max(1, chunk_bytes // (16 * self._sum.shape[0]))
+            for start in range(0, F, step):
+                for f, data in enumerate(self.ybus_data(frequencies[start:start + step]), start):
+                    ybus = sparse.csc_matrix((data[position], indices, indptr), shape=(n, n))
+                    try:
+                        lu = sparse_linalg.splu(ybus, permc_spec="NATURAL", diag_pivot_thresh=0.1,
+                                                options={"SymmetricMode": True})
+                    except RuntimeError:
+                        raise ValueError(f"The {self.sequence}-sequence network is singular at {frequencies[f]} Hz.")
+                    columns = np.empty((n, k), dtype=complex)
+                    columns[order] = lu.solve(rhs_permuted)
+                    Z[f] = columns[selected]
+
+        return ImpedanceScan(frequencies, self.nominal_frequency, buses, Z, self.sequence)
+
+    def __repr__(self):
+        return (f"FrequencyScan(sequence='{self.sequence}', buses={self.num_buses}, nnz={len(self.indices)}, "
+                f"nominal_frequency={self.nominal_frequency})")
+
+
+def frequency_scan(circuit, frequencies, buses=None, sequence="positive", **kwargs):
+    """Bus impedances of a circuit over a frequency grid (see FrequencyScan)."""
+    return FrequencyScan(circuit, sequence=sequence, **kwargs).scan(frequencies, buses)
@@ -1,5 +1,10 @@
 import numpy as np
-import pandas as pd
+
+from Classes.Kernels import ybus_csr, jacobian_values
+from Classes.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+sparse = lazy_import("scipy.sparse")
 
 class Jacobian:
     def __init__(self, circuit, delta, voltage):
@@ -10,124 +15,49 @@ class Jacobian:
         self.circuit = circuit
         self.delta = delta
         self.voltage = voltage
+        self._blocks = None
 
-    def calculate_J1(self):
-        """Calculates J1: ∂P/∂δ for all buses."""
+    def blocks(self):
+        """
+        J1..J4 as dense arrays, evaluated once by the compiled kernel on the Ybus sparsity
+        pattern (see Kernels.jacobian_values) and cached for this state.
+        """
+        if self._blocks is None:
+            bus_order = self.circuit.bus_order()
+            ybus = ybus_csr(self.circuit.ybus)
+            Vm = np.array([self.voltage[bus] for bus in bus_order], dtype=float)
+            Va = np.array([self.delta[bus] for bus in bus_order], dtype=float)
+            values = jacobian_values(ybus.indptr, ybus.indices, ybus.data, Vm, Va)
+            self._blocks = [sparse.csr_matrix((v, ybus.indices, ybus.indptr), shape=ybus.shape).toarray()
+                            for v in values]
+        return self._blocks
+
+    def _report(self, J, title):
         bus_order = self.circuit.bus_order()
-        n = len(bus_order)
-        J1 = np.zeros((n, n))
-        for k, bus_k in enumerate(bus_order):
-            V_k = self.voltage[bus_k]
-            δ_k = self.delta[bus_k]
-            for j, bus_j in enumerate(bus_order):
-                V_j = self.voltage[bus_j]
-                δ_j = self.delta[bus_j]
-                Y_kj = self.circuit.ybus.at[bus_k, bus_j]
-                θ_kj = np.angle(Y_kj)
-                if k != j:
-                    # Off-diagonal: J1[k, j] = V_k * V_j * |Y_kj| * sin(δ_k - δ_j - θ_kj)
-                    J1[k, j] = V_k * V_j * abs(Y_kj) * np.sin(δ_k - δ_j - θ_kj)
-                else:
-                    # Diagonal: J1[k, k] = -V_k * Σ (over n ≠ k) [V_n * |Y_kn| * sin(δ_k - δ_n - θ_kn)]
-                    J1[k, j] = -V_k * sum(
-                        self.voltage[bus_m] * abs(self.circuit.ybus.at[bus_k, bus_m]) *
-                        np.sin(δ_k - self.delta[bus_m] - np.angle(self.circuit.ybus.at[bus_k, bus_m]))
-                        for m, bus_m in enumerate(bus_order) if m != k
-                    )
-        J1_df = pd.DataFrame(J1, index=bus_order, columns=bus_order)
-        print("\n[DEBUG] J1 (∂P/∂δ):")
-        print(J1_df)
-        return J1
+        J_df = pd.DataFrame(J, index=bus_order, columns=bus_order)
+        print(f"\n[DEBUG] {title}:")
+        print(J_df)
+        return J
+
+    def calculate_J1(self):
+        """Calculates J1: ∂P/∂δ for all buses.
+        Off-diagonal: V_k·V_j·|Y_kj|·sin(δ_k - δ_j - θ_kj); diagonal: -V_k·Σ(n≠k) V_n·|Y_kn|·sin(δ_k - δ_n - θ_kn)."""
+        return self._report(self.blocks()[0], "J1 (∂P/∂δ)")
 
     def calculate_J2(self):
-        """Calculates J2: ∂P/∂V for all buses."""
-        bus_order = self.circuit.bus_order()
-        n = len(bus_order)
-        J2 = np.zeros((n, n))
-        for k, bus_k in enumerate(bus_order):
-            V_k = self.voltage[bus_k]
-            δ_k = self.delta[bus_k]
-            for j, bus_j in enumerate(bus_order):
-                δ_j = self.delta[bus_j]
-                Y_kj = self.circuit.ybus.at[bus_k, bus_j]
-                θ_kj = np.angle(Y_kj)
-                if k != j:
-                    # Off-diagonal: J2[k, j] = V_k * |Y_kj| * cos(δ_k - δ_j - θ_kj)
-                    J2[k, j] = V_k * abs(Y_kj) * np.cos(δ_k - δ_j - θ_kj)
-                else:
-                    # Diagonal: includes self-admittance and contributions from all buses
-                    Y_kk = self.circuit.ybus.at[bus_k, bus_k]
-                    θ_kk = np.angle(Y_kk)
-                    diag_term = V_k * abs(Y_kk) * np.cos(θ_kk)
-                    sum_term = sum(
-                        abs(self.circuit.ybus.at[bus_k, bus_m]) * self.voltage[bus_m] *
-                        np.cos(δ_k - self.delta[bus_m] - np.angle(self.circuit.ybus.at[bus_k, bus_m]))
-                        for m, bus_m in enumerate(bus_order)
-                    )
-                    J2[k, j] = diag_term + sum_term
-        J2_df = pd.DataFrame(J2, index=bus_order, columns=bus_order)
-        print("\n[DEBUG] J2 (∂P/∂V):")
-        print(J2_df)
-        return J2
+        """Calculates J2: ∂P/∂V for all buses.
+        Off-diagonal: V_k·|Y_kj|·cos(δ_k - δ_j - θ_kj); diagonal: V_k·|Y_kk|·cos θ_kk + Σ(n) V_n·|Y_kn|·cos(δ_k - δ_n - θ_kn)."""
+        return self._report(self.blocks()[1], "J2 (∂P/∂V)")
 
     def calculate_J3(self):
-        """Calculates J3: ∂Q/∂δ for all buses."""
-        bus_order = self.circuit.bus_order()
-        n = len(bus_order)
-        J3 = np.zeros((n, n))
-        for k, bus_k in enumerate(bus_order):
-            V_k = self.voltage[bus_k]
-            δ_k = self.delta[bus_k]
-            for j, bus_j in enumerate(bus_order):
-                V_j = self.voltage[bus_j]
-                δ_j = self.delta[bus_j]
-                Y_kj = self.circuit.ybus.at[bus_k, bus_j]
-                θ_kj = np.angle(Y_kj)
-                if k != j:
-                    # Off-diagonal: J3[k, j] = -V_k * V_j * |Y_kj| * cos(δ_k - δ_j - θ_kj)
-                    J3[k, j] = -V_k * V_j * abs(Y_kj) * np.cos(δ_k - δ_j - θ_kj)
-                else:
-                    # Diagonal: sum contributions from all other buses
-                    sum_term = sum(
-                        abs(self.circuit.ybus.at[bus_k, bus_m]) * self.voltage[bus_m] *
-                        np.cos(δ_k - self.delta[bus_m] - np.angle(self.circuit.ybus.at[bus_k, bus_m]))
-                        for m, bus_m in enumerate(bus_order) if m != k
-                    )
-                    J3[k, j] = V_k * sum_term
-        J3_df = pd.DataFrame(J3, index=bus_order, columns=bus_order)
-        print("\n[DEBUG] J3 (∂Q/∂δ):")
-        print(J3_df)
-        return J3
+        """Calculates J3: ∂Q/∂δ for all buses.
+        Off-diagonal: -V_k·V_j·|Y_kj|·cos(δ_k - δ_j - θ_kj); diagonal: V_k·Σ(n≠k) V_n·|Y_kn|·cos(δ_k - δ_n - θ_kn)."""
+        return self._report(self.blocks()[2], "J3 (∂Q/∂δ)")
 
     def calculate_J4(self):
-        """Calculates J4: ∂Q/∂V for all buses."""
-        bus_order = self.circuit.bus_order()
-        n = len(bus_order)
-        J4 = np.zeros((n, n))
-        for k, bus_k in enumerate(bus_order):
-            V_k = self.voltage[bus_k]
-            δ_k = self.delta[bus_k]
-            for j, bus_j in enumerate(bus_order):
-                Y_kj = self.circuit.ybus.at[bus_k, bus_j]
-                θ_kj = np.angle(Y_kj)
-                if k != j:
-                    # Off-diagonal: J4[k, j] = V_k * |Y_kj| * sin(δ_k - δ_j - θ_kj)
-                    J4[k, j] = V_k * abs(Y_kj) * np.sin(δ_k - self.delta[bus_j] - θ_kj)
-                else:
-                    # Diagonal: includes self-admittance and contributions from all buses
-                    Y_kk = self.circuit.ybus.at[bus_k, bus_k]
-                    θ_kk = np.angle(Y_kk)
-                    diag_term = -V_k * abs(Y_kk) * np.sin(θ_kk)
-                    sum_term = sum(
-                        abs(self.circuit.ybus.at[bus_k, bus_m]) * self.voltage[bus_m] *
-                        np.sin(δ_k - self.delta[bus_m] - np.angle(self.circuit.ybus.at[bus_k, bus_m]))
-                        for m, bus_m in enumerate(bus_order)
-                    )
-                    J4[k, j] = diag_term + sum_term
-        J4_df = pd.DataFrame(J4, index=bus_order, columns=bus_order)
-        print("\n[DEBUG] J4 (∂Q/∂V):")
-        print(J4_df)
-        return J4
+        """Calculates J4: ∂Q/∂V for all buses.
+        Off-diagonal: V_k·|Y_kj|·sin(δ_k - δ_j - θ_kj); diagonal: -V_k·|Y_kk|·sin θ_kk + Σ(n) V_n·|Y_kn|·sin(δ_k - δ_n - θ_kn)."""
+        return self._report(self.blocks()[3], "J4 (∂Q/∂V)")
 
     def construct_jacobian(self, J1, J2, J3, J4):
         """Constructs the full Jacobian matrix by stacking the submatrices."""
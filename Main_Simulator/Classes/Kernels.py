@@ -0,0 +1,227 @@
+"""
+Hot numerical kernels of the power-flow and fault paths.
+
+Each kernel has a pure-NumPy implementation and a loop implementation that is compiled with
+Numba (CPU, nopython) when Numba is importable; the compiled versions work directly on the
+CSR arrays of Ybus without the temporaries of the vectorized code. Both give the same
+results up to floating-point rounding. Set the environment variable POWERSIM_BACKEND=numpy
+to force the NumPy versions.
+
+Numba itself is only imported, and the kernels compiled (or loaded from the on-disk cache),
+on the first kernel call, so importing this module stays cheap.
+"""
+import functools
+import importlib.util
+import os
+
+import numpy as np
+
+from Classes.lazy_import import lazy_import
+
+sparse = lazy_import("scipy.sparse")
+
+HAS_NUMBA = importlib.util.find_spec("numba") is not None
+BACKEND = "numba" if HAS_NUMBA and os.environ.get("POWERSIM_BACKEND", "").lower() != "numpy" else "numpy"
+
+
+def _jit(function):
+    """Wraps a loop kernel so that it is compiled with Numba on its first call."""
+    compiled = None
+
+    @functools.wraps(function)
+    def kernel(*args):
+        nonlocal compiled
+        if compiled is None:
+            import numba
+            compiled = numba.njit(cache=True)(function)
+        return compiled(*args)
+    return kernel
+
+
+def ybus_csr(ybus):
+    """
+    CSR form of a Ybus (DataFrame, dense array or sparse matrix) with every diagonal entry
+    stored, so that the Jacobian can be written on its sparsity pattern.
+    """
+    ybus = ybus.values if hasattr(ybus, "values") and not sparse.issparse(ybus) else ybus
+    ybus = sparse.coo_matrix(ybus)
+    n = ybus.shape[0]
+    rows = np.concatenate([ybus.row, np.arange(n)])
+    cols = np.concatenate([ybus.col, np.arange(n)])
+    data = np.concatenate([ybus.data, np.zeros(n, dtype=complex)]).astype(complex)
+    csr = sparse.csr_matrix((data, (rows, cols)), shape=(n, n))
+    csr.sort_indices()
+    return csr
+
+
+# --- NumPy implementations --------------------------------------------------------------
+
+def _csr_rows(indptr, n):
+    return np.repeat(np.arange(n), np.diff(indptr))
+
+
+def _injections_numpy(indptr, indices, data, Vm, Va):
+    """P_k = Σ V_k V_n |Y_kn| cos(δ_k - δ_n - θ_kn), Q_k likewise with sin."""
+    n = len(Vm)
+    rows = _csr_rows(indptr, n)
+    angle = Va[rows] - Va[indices] - np.angle(data)
+    term = Vm[rows] * Vm[indices] * np.abs(data)
+    P = np.bincount(rows, weights=term * np.cos(angle), minlength=n)
+    Q = np.bincount(rows, weights=term * np.sin(angle), minlength=n)
+    return P, Q
+
+
+def _jacobian_numpy(indptr, indices, data, Vm, Va):
+    """
+    Values of J1 = ∂P/∂δ, J2 = ∂P/∂V, J3 = ∂Q/∂δ and J4 = ∂Q/∂V on the CSR pattern of Ybus
+    (the same formulas as Jacobian.calculate_J1..J4).
+    """
+    n = len(Vm)
+    rows = _csr_rows(indptr, n)
+    diag = rows == indices
+    angle = Va[rows] - Va[indices] - np.angle(data)
+    mag = np.abs(data)
+    sin, cos = np.sin(angle), np.cos(angle)
+    Vk, Vj = Vm[rows], Vm[indices]
+
+    J1 = Vk * Vj * mag * sin
+    J2 = Vk * mag * cos
+    J3 = -Vk * Vj * mag * cos
+    J4 = Vk * mag * sin
+
+    # Row sums for the diagonal terms
+    sum_sin_off = np.bincount(rows, weights=np.where(diag, 0.0, Vj * mag * sin), minlength=n)
+    sum_cos_off = np.bincount(rows, weights=np.where(diag, 0.0, Vj * mag * cos), minlength=n)
+    sum_sin = np.bincount(rows, weights=Vj * mag * sin, minlength=n)
+    sum_cos = np.bincount(rows, weights=Vj * mag * cos, minlength=n)
+
+    k = rows[diag]
+    theta_kk = np.angle(data[diag])
+    J1[diag] = -Vm[k] * sum_sin_off[k]
+    J2[diag] = Vm[k] * mag[diag] * np.cos(theta_kk) + sum_cos[k]
+    J3[diag] = Vm[k] * sum_cos_off[k]
+    J4[diag] = -Vm[k] * mag[diag] * np.sin(theta_kk) + sum_sin[k]
+    return J1, J2, J3, J4
+
+
+def _sequence_voltages_numpy(Z, I012, prefault):
+    """V_s = V_prefault,s - Z_s[:, n] · I_s for the (3, n) driving-point columns Z of the faulted bus."""
+    base = np.array([0.0, prefault, 0.0], dtype=complex)
+    return base[:, None] - Z * I012[:, None]
+
+
+# --- Loop implementations (compiled with Numba) -----------------------------------------
+
+def _injections_loop(indptr, indices, data, Vm, Va):
+    n = len(Vm)
+    P = np.zeros(n)
+    Q = np.zeros(n)
+    for k in range(n):
+        for p in range(indptr[k], indptr[k + 1]):
+            j = indices[p]
+            y = data[p]
+            angle = Va[k] - Va[j] - np.arctan2(y.imag, y.real)
+            term = Vm[k] * Vm[j] * abs(y)
+            P[k] += term * np.cos(angle)
+            Q[k] += term * np.sin(angle)
+    return P, Q
+
+
+def _jacobian_loop(indptr, indices, data, Vm, Va):
+    n = len(Vm)
+    nnz = len(data)
+    J1 = np.empty(nnz)
+    J2 = np.empty(nnz)
+    J3 = np.empty(nnz)
+    J4 = np.empty(nnz)
+    for k in range(n):
+        Vk = Vm[k]
+        sum_sin_off = 0.0
+        sum_cos_off = 0.0
+        sum_sin = 0.0
+        sum_cos = 0.0
+        d = -1
+        for p in range(indptr[k], indptr[k + 1]):
+            j = indices[p]
+            y = data[p]
+            mag = abs(y)
+            angle = Va[k] - Va[j] - np.arctan2(y.imag, y.real)
+            s = np.sin(angle)
+            c = np.cos(angle)
+            Vj = Vm[j]
+            J1[p] = Vk * Vj * mag * s
+            J2[p] = Vk * mag * c
+            J3[p] = -Vk * Vj * mag * c
+            J4[p] = Vk * mag * s
+            sum_sin += Vj * mag * s
+            sum_cos += Vj * mag * c
+            if j == k:
+                d = p
+            else:
+                sum_sin_off += Vj * mag * s
+                sum_cos_off += Vj * mag * c
+        if d >= 0:
+            y = data[d]
+            mag = abs(y)
+            theta = np.arctan2(y.imag, y.real)
+            J1[d] = -Vk * sum_sin_off
+            J2[d] = Vk * mag * np.cos(theta) + sum_cos
+            J3[d] = Vk * sum_cos_off
+            J4[d] = -Vk * mag * np.sin(theta) + sum_sin
+    return J1, J2, J3, J4
+
+
+def _sequence_voltages_loop(Z, I012, prefault):
+    n = Z.shape[1]
+    V012 = np.empty((3, n), dtype=np.complex128)
+    for s in range(3):
+        base = prefault * (1.0 if s == 1 else 0.0)
+        for k in range(n):
+            V012[s, k] = base - Z[s, k] * I012[s]
+    return V012
+
+
+if BACKEND == "numba":
+    injections = _jit(_injections_loop)
+    jacobian_values = _jit(_jacobian_loop)
+    _sequence_voltages = _jit(_sequence_voltages_loop)
+else:
+    injections = _injections_numpy
+    jacobian_values = _jacobian_numpy
+    _sequence_voltages = _sequence_voltages_numpy
+
+
+def sequence_voltages(Z, I012, prefault=1.0):
+    """
+    Post-fault sequence voltages (3, n) of every bus from the faulted-bus columns Z (3, n)
+    of the zero-, positive- and negative-sequence Zbus and the sequence fault currents I012.
+    """
+    return _sequence_voltages(np.ascontiguousarray(Z, dtype=complex), np.asarray(I012, dtype=complex),
+                              complex(prefault))
+
+
+def csr_injections(ybus, Vm, Va):
+    """P and Q injections (pu) for a CSR Ybus (see ybus_csr)."""
+    return injections(ybus.indptr, ybus.indices, ybus.data, np.asarray(Vm, dtype=float), np.asarray(Va, dtype=float))
+
+
+def sparse_jacobian(ybus, Vm, Va):
+    """Full 2n × 2n Jacobian [[J1, J2], [J3, J4]] as a CSR matrix on the pattern of a CSR Ybus."""
+    blocks = jacobian_values(ybus.indptr, ybus.indices, ybus.data, np.asarray(Vm, dtype=float),
+                             np.asarray(Va, dtype=float))
+    J1, J2, J3, J4 = (sparse.csr_matrix((values, ybus.indices, ybus.indptr), shape=ybus.shape) for values in blocks)
+    return sparse.bmat([[J1, J2], [J3, J4]], format="csr")
+
+
+def power_derivatives(ybus, V):
+    """
+    Sparse derivatives of the complex bus injections S = V·conj(Ybus·V) with respect to the
+    voltage angles and magnitudes. Both matrices have the sparsity pattern of Ybus.
+    """
+    I = ybus @ V
+    diag_V = sparse.diags(V)
+    diag_I = sparse.diags(I)
+    diag_Vnorm = sparse.diags(V / np.abs(V))
+    dS_dVa = 1j * diag_V @ np.conj(diag_I - ybus @ diag_V)
+    dS_dVm = diag_V @ np.conj(ybus @ diag_Vnorm) + np.conj(diag_I) @ diag_Vnorm
+    return dS_dVa.tocsr(), dS_dVm.tocsr()
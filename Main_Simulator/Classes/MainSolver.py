@@ -1,16 +1,20 @@
 import numpy as np
-from Classes.Newton_Raphson import NewtonRaphson
-from FaultStudySolver import FaultStudySolver
 from pprint import pprint
 from numpy import angle, abs, degrees
 
 class Solver:
+    """
+    Runs a power flow or a fault study on a circuit and prints the results. The solver modules
+    are imported by the run methods, so importing this module does not load them.
+    """
+
     def __init__(self, circuit, analysis_mode='pf', faulted_bus=None, fault_type='3ph', fault_impedance=0.0):
         self.circuit = circuit
         self.analysis_mode = analysis_mode.lower()
         self.faulted_bus = faulted_bus
         self.fault_type = fault_type.lower()
         self.fault_impedance = fault_impedance
+        self.results = None  # PowerFlowResult / FaultResult of the last run
 
     def run(self):
         # Calculate Ybus and Display It
@@ -28,9 +32,11 @@ class Solver:
 
     def run_power_flow(self):
         from Classes.PowerFlowSolver import PowerFlowSolver
+        from Classes.Newton_Raphson import NewtonRaphson
         power_flow_solver = PowerFlowSolver(1, self.circuit)
         newton_solver = NewtonRaphson(power_flow_solver)
         converged = newton_solver.solve(tol=0.001, max_iter=50)
+        self.results = newton_solver.results()
 
         if converged:
             print("\nNewton-Raphson converged successfully.")
@@ -47,8 +53,10 @@ class Solver:
 
 
     def run_fault_study(self):
+        from Classes.FaultStudySolver import FaultStudySolver
         fault_module = FaultStudySolver(self.circuit, self.faulted_bus, self.fault_type, self.fault_impedance)
         fault_current, voltages = fault_module.run()
+        self.results = fault_module.results()
 
         I_mag, I_ang = fault_current
         print(f"\n--- Fault Study Results ({self.fault_type.upper()} Fault at {self.faulted_bus}) ---")
@@ -0,0 +1,191 @@
+import numpy as np
+
+from Classes.Circuit import Circuit
+from Classes.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+sparse = lazy_import("scipy.sparse")
+sparse_linalg = lazy_import("scipy.sparse.linalg")
+
+
+def kron_reduce(ybus, keep, eliminate):
+    """
+    Eliminates the `eliminate` rows/columns of an admittance matrix (Kron reduction).
+
+    Parameters:
+        ybus (numpy.ndarray or scipy.sparse matrix): Square admittance matrix.
+        keep (list[int]): Indices of the retained buses.
+        eliminate (list[int]): Indices of the buses to eliminate.
+
+    Returns:
+        (Y_eq, T): the reduced matrix Y_rr - Y_re · Y_ee⁻¹ · Y_er and the transfer matrix
+        T = Y_re · Y_ee⁻¹ that moves current injections of the eliminated buses onto the
+        retained ones (ΔI_r = -T · I_e), both dense.
+
+    Y_ee is factorized sparse (SuperLU), so large external areas can be eliminated; only the
+    retained-side results are dense.
+    """
+    Y = sparse.csr_matrix(ybus, dtype=complex)
+    keep = np.asarray(keep, dtype=np.intp)
+    eliminate = np.asarray(eliminate, dtype=np.intp)
+    T = np.zeros((len(keep), len(eliminate)), dtype=complex)
+
+    # Buses with an empty row (e.g. isolated in the zero-sequence network) carry no current
+    # and are simply dropped instead of being pivoted on.
+    nonzero_rows = np.asarray(abs(Y).sum(axis=1)).ravel() != 0
+    connected = np.flatnonzero(nonzero_rows[eliminate])
+    pivots = eliminate[connected]
+
+    Y_rr = Y[keep][:, keep].toarray()
+    if not len(pivots):
+        return Y_rr, T
+
+    Y_re = Y[keep][:, pivots]
+    Y_er = Y[pivots][:, keep]
+    Y_ee = Y[pivots][:, pivots].tocsc()
+
+    try:
+        lu = sparse_linalg.splu(Y_ee)
+    except RuntimeError:
+        raise ValueError("The eliminated part of the network is singular; it must be connected to the retained area.")
+    # T = Y_re · Y_ee⁻¹, obtained from one solve with Y_eeᵀ
+    T[:, connected] = lu.solve(Y_re.T.toarray(), trans="T").T
+
+    return Y_rr - np.asarray(Y_er.T @ T[:, connected].T).T, T
+
+
+class ReducedCircuit(Circuit):
+    """
+    Ward equivalent of a parent circuit: the retained buses are kept as they are while the
+    eliminated area is replaced by equivalent branches (Kron-reduced Ybus for the power flow
+    and for every sequence network) and boundary injections.
+
+    The object behaves like a Circuit for PowerFlowSolver and FaultStudySolver.
+
+    Only PQ buses can be eliminated: the slack and PV buses must be retained (a generator bus
+    on the boundary stays a PV bus), since folding a regulated bus into the boundary
+    injections would turn its generation into a fixed injection and lose its voltage control.
+    """
+
+    def __init__(self, parent: Circuit, eliminated, voltages=None):
+        """
+        Parameters:
+            parent (Circuit): The full network.
+            eliminated (list[str]): Names of the buses to eliminate (PQ buses only).
+            voltages (dict, optional): Complex per-unit voltages (e.g. from a solved power flow)
+                used to convert external injections to currents. Flat start (1∠0°) by default.
+        """
+        super().__init__(f"{parent.name} (reduced)", parent.settings)
+        self.parent = parent
+
+        bus_order = parent.bus_order()
+        eliminated = list(dict.fromkeys(eliminated))
+        for name in eliminated:
+            if name not in parent.buses:
+                raise ValueError(f"Bus '{name}' not found in circuit '{parent.name}'.")
+            if parent.buses[name].bus_type == "Slack Bus":
+                raise ValueError(f"Slack bus '{name}' cannot be eliminated.")
+            if parent.buses[name].bus_type == "PV Bus":
+                raise ValueError(f"PV bus '{name}' cannot be eliminated: its voltage control would be lost. "
+                                 f"Retain it as a boundary bus.")
+
+        retained = [b for b in bus_order if b not in eliminated]
+        if not retained:
+            raise ValueError("At least one bus must be retained.")
+
+        self.eliminated = eliminated
+        keep = [bus_order.index(b) for b in retained]
+        drop = [bus_order.index(b) for b in eliminated]
+
+        # Retained components (shared with the parent, not copied)
+        for name in retained:
+            self.add_bus(parent.buses[name])
+        self.bus_type = {name: parent.bus_type[name] for name in retained}
+        self.transformers = {n: t for n, t in parent.transformers.items()
+                             if t.bus1.name in self.buses and t.bus2.name in self.buses}
+        self.transmission_lines = {n: l for n, l in parent.transmission_lines.items()
+                                   if l.bus1.name in self.buses and l.bus2.name in self.buses}
+        self.generators = {n: g for n, g in parent.generators.items() if g.bus.name in self.buses}
+        self.loads = {n: l for n, l in parent.loads.items() if l.bus.name in self.buses}
+        self.first_generator_added = True
+
+        # Kron-reduced power-flow and sequence matrices, from the sparse matrices of the parent
+        # (its own ybus attribute is left untouched)
+        network = parent.compile()
+        ybus_pf, T = kron_reduce(network.ybus["pf"], keep, drop)
+        self._ybus_pf = pd.DataFrame(ybus_pf, index=retained, columns=retained)
+        self._ybus_seq = {}
+        for sequence in ("positive", "negative", "zero"):
+            Y_eq, _ = kron_reduce(network.ybus[sequence], keep, drop)
+            self._ybus_seq[sequence] = pd.DataFrame(Y_eq, index=retained, columns=retained)
+
+        # Ward boundary injections: I_e = conj(S_e / V_e), ΔI_r = -T · I_e, ΔS_r = V_r · conj(ΔI_r)
+        self.boundary_injections = {name: (0.0, 0.0) for name in retained}
+        if drop:
+            s_base = parent.get_base_power()
+            p_ext = parent.real_power_vector()
+            q_ext = parent.reactive_power_vector()
+            V = np.ones(len(bus_order), dtype=complex)
+            if voltages is not None:
+                V = np.array([voltages.get(b, 1.0) for b in bus_order], dtype=complex)
+
+            S_e = np.array([complex(p_ext[b], q_ext[b]) for b in eliminated]) / s_base
+            I_e = np.conj(S_e / V[drop])
+            dI_r = -T @ I_e
+            dS_r = V[keep] * np.conj(dI_r) * s_base
+
+            self.boundary_injections = {name: (dS_r[i].real, dS_r[i].imag) for i, name in enumerate(retained)}
+
+        self.ybus = None
+
+    def calc_ybus(self):
+        """Returns the equivalent power-flow Ybus of the retained area."""
+        self.ybus = self._ybus_pf.copy()
+        return self.ybus
+
+    def calc_ybus_positive(self):
+        """Returns the equivalent positive-sequence Ybus (generator admittances included)."""
+        return self._ybus_seq["positive"].copy()
+
+    def calc_ybus_negative(self):
+        """Returns the equivalent negative-sequence Ybus."""
+        return self._ybus_seq["negative"].copy()
+
+    def calc_ybus_zero(self):
+        """Returns the equivalent zero-sequence Ybus."""
+        return self._ybus_seq["zero"].copy()
+
+    def calc_sequence_networks(self):
+        """Sequence networks of the equivalent: the Kron-reduced matrices with the retained branches."""
+        networks = super().calc_sequence_networks()
+        return networks.with_matrices({sequence: ybus.values for sequence, ybus in self._ybus_seq.items()})
+
+    def compile(self):
+        """Compiled form of the equivalent; the Ybus matrices are the Kron-reduced ones."""
+        from scipy import sparse
+        from Classes.CompiledNetwork import CompiledNetwork
+
+        network = CompiledNetwork.from_circuit(self)
+        network.ybus = {"pf": sparse.csr_matrix(self._ybus_pf.values)}
+        for sequence, ybus in self._ybus_seq.items():
+            network.ybus[sequence] = sparse.csr_matrix(ybus.values)
+        return network
+
+    def real_power_vector(self):
+        """Net real power of the retained buses including the Ward boundary injections (MW)."""
+        real_power = super().real_power_vector()
+        for name, (p, _) in self.boundary_injections.items():
+            real_power[name] += p
+        return real_power
+
+    def reactive_power_vector(self):
+        """Net reactive power of the retained buses including the Ward boundary injections (Mvar)."""
+        reactive_power = super().reactive_power_vector()
+        for name, (_, q) in self.boundary_injections.items():
+            reactive_power[name] += q
+        return reactive_power
+
+
+def reduce_network(circuit: Circuit, eliminated, voltages=None):
+    """Builds the Ward equivalent of `circuit` with the `eliminated` buses removed."""
+    return ReducedCircuit(circuit, eliminated, voltages=voltages)
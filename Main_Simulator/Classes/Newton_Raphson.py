@@ -1,12 +1,50 @@
 import numpy as np
 from Classes.PowerFlowSolver import PowerFlowSolver
 from Jacobians import Jacobian
+from Classes.Kernels import sparse_jacobian
+from Classes.Results import PowerFlowResult
+from Classes.lazy_import import lazy_import
+
+sparse_linalg = lazy_import("scipy.sparse.linalg")
+
+METHODS = ("newton", "iwamoto", "dishonest")
+
+
+def optimal_multiplier(a, c):
+    """
+    Iwamoto's optimal multiplier for the mismatch model f(μ) = (1 - μ)·a + μ²·c, where a is the
+    mismatch at the current point and c the mismatch after a full Newton step: the real root of
+    d‖f(μ)‖²/dμ = 0 in (0, 2] with the smallest ‖f(μ)‖. Falls back to 1 (full step).
+    """
+    aa, ac, cc = a @ a, a @ c, c @ c
+    roots = np.roots([2 * cc, -3 * ac, aa + 2 * ac, -aa])
+    candidates = [r.real for r in roots if abs(r.imag) < 1e-9 and 0 < r.real <= 2]
+    if not candidates:
+        return 1.0
+
+    def cost(mu):
+        return np.sum(((1 - mu) * a + mu ** 2 * c) ** 2)
+
+    return float(min(candidates, key=cost))
+
 
 class NewtonRaphson:
     def __init__(self, power_flow_solver):
         self.pfs = power_flow_solver
+        self.converged = False
+        self.iterations = 0
+        self.factorizations = 0
+        self.step_sizes = []
+        self.q_limited = {}
+
+    def solve(self, tol = 0.001, max_iter = 50, enforce_q_limits = False, method = "newton", max_reuse = 3):
+        """
+        Runs the power flow. The plain full-Newton run keeps the original behaviour; reactive
+        limits and the other methods ("iwamoto", "dishonest") go through `solve_indexed`.
+        """
+        if enforce_q_limits or method != "newton":
+            return self.solve_indexed(tol, max_iter, enforce_q_limits, method, max_reuse)
 
-    def solve(self, tol = 0.001, max_iter = 50):
         iteration = 0
         converged = False
 
@@ -55,4 +93,183 @@ class NewtonRaphson:
 
         if not converged:
             print("Newton-Raphson did not converge within the maximum number of iterations.")
+        self.converged = converged
+        self.iterations = iteration
+        self.factorizations = iteration
+        self.step_sizes = [1.0] * iteration
+        return converged
+
+    def reactive_limits(self, bus_order):
+        """Per-bus reactive limits (Mvar) as the sum over the generators of each bus; ±inf where unlimited."""
+        index = {bus: i for i, bus in enumerate(bus_order)}
+        q_min = np.zeros(len(bus_order))
+        q_max = np.zeros(len(bus_order))
+        for gen in self.pfs.Circuit.generators.values():
+            i = index[gen.bus.name]
+            q_min[i] += -np.inf if gen.q_min is None else gen.q_min
+            q_max[i] += np.inf if gen.q_max is None else gen.q_max
+        return q_min, q_max
+
+    def solve_indexed(self, tol = 0.001, max_iter = 50, enforce_q_limits = False, method = "newton", max_reuse = 3):
+        """
+        Newton-Raphson on index sets instead of labelled matrices, with optional step control and
+        generator reactive limits. Generator buses start at their voltage setpoints.
+
+        method:
+            "newton"    full step and a fresh sparse Jacobian factorization every iteration.
+            "iwamoto"   optimal multiplier: the step is scaled by the μ minimizing the quadratic
+                        model ‖(1 - μ)·f + μ²·c‖² of the mismatch, where c is the mismatch after a
+                        full step; damps overshoot on stressed cases.
+            "dishonest" reuses the last LU factorization for up to `max_reuse` further iterations
+                        while the mismatch keeps decreasing.
+
+        With enforce_q_limits, whenever the mismatch converges PV buses whose required Q is outside
+        [Q min, Q max] become PQ buses with Q fixed at the limit, and limited buses whose voltage
+        has moved back to the regulating side of the setpoint return to PV. A type change only
+        moves one index in or out of the sorted PQ index set. Bus objects keep their types; the
+        buses held at a limit are reported in `q_limited`.
+
+        The iteration, factorization and step-size counts are kept in `iterations`,
+        `factorizations` and `step_sizes`.
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown Newton-Raphson method '{method}'. Choose one of {METHODS}.")
+
+        pfs = self.pfs
+        circuit = pfs.Circuit
+        bus_order = circuit.bus_order()
+        n = len(bus_order)
+        s_base = circuit.get_base_power()
+
+        real_power = circuit.real_power_vector()
+        reactive_power = circuit.reactive_power_vector()
+        p_spec = np.array([real_power[b] for b in bus_order]) / s_base
+        q_net_load = np.array([reactive_power[b] for b in bus_order])  # -Q_load, Mvar
+        q_min, q_max = self.reactive_limits(bus_order)
+        v_set = np.array([circuit.buses[b].per_unit for b in bus_order], dtype=float)
+
+        bus_type = [circuit.buses[b].bus_type for b in bus_order]
+        pv_buses = [i for i, t in enumerate(bus_type) if t == "PV Bus"]
+
+        # Generator buses start at their voltage setpoints
+        for i, t in enumerate(bus_type):
+            if t != "PQ Bus":
+                pfs.voltage[bus_order[i]] = v_set[i]
+
+        # Trimmed index sets: P rows / δ columns of non-slack buses, Q rows / V columns of PQ buses
+        p_idx = np.array([i for i, t in enumerate(bus_type) if t != "Slack Bus"], dtype=int)
+        q_idx = np.array([i for i, t in enumerate(bus_type) if t == "PQ Bus"], dtype=int)
+        y = np.concatenate((p_spec, q_net_load / s_base))
+        self.q_limited = {}
+
+        def mismatch():
+            Px = pfs.calc_Px()
+            Qx = pfs.calc_Qx()
+            Q = np.array([Qx[b] for b in bus_order])
+            return y - np.concatenate((np.array([Px[b] for b in bus_order]), Q)), Q
+
+        def step(dx, scale=1.0):
+            for k, i in enumerate(p_idx):
+                pfs.delta[bus_order[i]] += scale * dx[k]
+            for k, i in enumerate(q_idx):
+                pfs.voltage[bus_order[i]] += scale * dx[len(p_idx) + k]
+
+        self.iterations = 0
+        self.factorizations = 0
+        self.step_sizes = []
+        lu = None
+        reused = 0
+        last_norm = np.inf
+        converged = False
+        while self.iterations < max_iter:
+            pfs.del_y, Q = mismatch()
+            rows = np.concatenate((p_idx, q_idx + n))
+            del_y_trimmed = pfs.del_y[rows]
+            norm = np.max(np.abs(del_y_trimmed))
+
+            if norm < tol:
+                changed = False
+                if enforce_q_limits:
+                    q_gen = Q * s_base - q_net_load
+
+                    # Limited buses whose voltage is back on the regulating side return to PV
+                    for i, limit in list(self.q_limited.items()):
+                        V = pfs.voltage[bus_order[i]]
+                        if (limit == "Q max" and V > v_set[i]) or (limit == "Q min" and V < v_set[i]):
+                            del self.q_limited[i]
+                            q_idx = q_idx[q_idx != i]
+                            pfs.voltage[bus_order[i]] = v_set[i]
+                            print(f"{bus_order[i]}: V = {V:.4f} p.u. past setpoint, back to PV")
+                            changed = True
+
+                    # PV buses outside their reactive range are held at the violated limit
+                    for i in pv_buses:
+                        if i in self.q_limited:
+                            continue
+                        if q_gen[i] > q_max[i] + tol * s_base:
+                            limit, q_limit = "Q max", q_max[i]
+                        elif q_gen[i] < q_min[i] - tol * s_base:
+                            limit, q_limit = "Q min", q_min[i]
+                        else:
+                            continue
+                        self.q_limited[i] = limit
+                        y[n + i] = (q_limit + q_net_load[i]) / s_base
+                        q_idx = np.insert(q_idx, np.searchsorted(q_idx, i), i)
+                        print(f"{bus_order[i]}: Q = {q_gen[i]:.2f} Mvar beyond {limit} = {q_limit:.2f} Mvar, switched to PQ")
+                        changed = True
+
+                if not changed:
+                    print(f"Newton-Raphson converged in {self.iterations} iterations.")
+                    converged = True
+                    break
+                # A switching pass counts as an iteration so that oscillating buses cannot loop forever
+                self.iterations += 1
+                lu = None
+                last_norm = np.inf
+                continue
+
+            # --- Factorize the trimmed Jacobian (or keep the previous one in dishonest mode) ---
+            if method != "dishonest" or lu is None or reused >= max_reuse or norm >= last_norm:
+                J = sparse_jacobian(pfs.ybus_csr(), *pfs.state_arrays())
+                lu = sparse_linalg.splu(J[rows][:, rows].tocsc())
+                self.factorizations += 1
+                reused = 0
+            else:
+                reused += 1
+            delta_x = lu.solve(del_y_trimmed)
+
+            # --- Step length ---
+            mu = 1.0
+            if method == "iwamoto":
+                step(delta_x)
+                c = -mismatch()[0][rows]  # f(x + Δx), f = calculated - specified
+                step(delta_x, -1.0)
+                mu = optimal_multiplier(-del_y_trimmed, c)
+            step(delta_x, mu)
+            self.step_sizes.append(mu)
+
+            print(f"Iteration {self.iterations}: max trimmed mismatch = {norm:.6f}, step = {mu:.4f}")
+            last_norm = norm
+            self.iterations += 1
+
+        if not converged:
+            print("Newton-Raphson did not converge within the maximum number of iterations.")
+        print(f"[{method}] {self.iterations} iterations, {self.factorizations} Jacobian factorizations")
+
+        # Generator reactive output, shared equally by the generators of a bus
+        Qx = pfs.calc_Qx()
+        gens_on_bus = {}
+        for gen in circuit.generators.values():
+            gens_on_bus.setdefault(gen.bus.name, []).append(gen)
+        for bus, gens in gens_on_bus.items():
+            q_bus = Qx[bus] * s_base - reactive_power[bus]
+            for gen in gens:
+                gen.Q = float(q_bus / len(gens))
+
+        self.q_limited = {bus_order[i]: limit for i, limit in self.q_limited.items()}
+        self.converged = converged
         return converged
+
+    def results(self):
+        """Array-backed PowerFlowResult of the current state (for bulk export)."""
+        return PowerFlowResult.from_solver(self.pfs, self.converged, self.iterations)
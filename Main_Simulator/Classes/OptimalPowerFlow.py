@@ -0,0 +1,195 @@
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+from scipy.sparse.linalg import splu
+
+from Classes.CompiledNetwork import SLACK
+from Classes.Results import DispatchResult
+
+
+class DCOptimalPowerFlow:
+    """
+    Economic dispatch and DC optimal power flow of the generators of a Circuit.
+
+    DC network model (lossless, flat voltage magnitudes): the flow of branch k is
+    F_k = S_base · (δ_f - δ_t) / x_k, where x_k is the series reactance of the branch stamp
+    (including the tap), and the bus balance is S_base · B·δ = P_gen - P_load. Phase shifts of
+    transformers are not modelled.
+
+    Each generator dispatches between p_min (default 0) and p_max (default unlimited) with the
+    polynomial cost c2·P² + c1·P + c0. Quadratic costs are replaced by `segments` secant
+    segments between p_min and p_max, so the problem is a sparse LP solved by HiGHS through
+    scipy.optimize.linprog; generators without a cost curve are free.
+
+    The reduced B matrix is factorized once. The LP starts with the power balance only; after
+    each solve the flows of all branches follow from one sparse solve, and the overloaded
+    branches are added as constraints (their PTDF rows, from one transposed solve per batch)
+    until no rating is exceeded. Only the few binding branches ever enter the LP, and the set
+    found for one load scenario is carried over to the next (`solve_scenarios`).
+
+    With network=False the model is a plain economic dispatch (one system balance, no flows);
+    with branch_limits=True the branch ratings of the compiled network (MVA, see
+    component_rating), or the `branch_rating` array given instead, bound |F_k|.
+    """
+
+    def __init__(self, circuit, network=True, branch_limits=True, segments=10, branch_rating=None):
+        self.circuit = circuit
+        self.compiled = circuit.compile()
+        self.network = network
+        net = self.compiled
+        n = net.num_buses
+        bus_index = net.bus_index()
+
+        # Base-case loads per bus (MW)
+        self.load = np.zeros(n)
+        for load in circuit.loads.values():
+            self.load[bus_index[load.bus.name]] += load.real_power
+
+        # Generator data
+        gens = [circuit.generators[name] for name in net.gen_names]
+        self.gen_bus = np.asarray(net.gen_bus, dtype=np.intp)
+        self.p_min = np.array([g.p_min if g.p_min is not None else 0.0 for g in gens], dtype=float)
+        self.p_max = np.array([g.p_max if g.p_max is not None else np.inf for g in gens], dtype=float)
+        self.cost = np.array([g.cost if g.cost is not None else (0.0, 0.0, 0.0) for g in gens],
+                             dtype=float).reshape(-1, 3)
+        if np.any(self.p_min > self.p_max):
+            raise ValueError("Generator p_min exceeds p_max.")
+        quadratic = self.cost[:, 0] != 0
+        if np.any(quadratic & ~np.isfinite(self.p_max)):
+            raise ValueError("Generators with a quadratic cost need a finite p_max.")
+
+        # Cost segments: P_i = p_min_i + Σ s_ij with 0 ≤ s_ij ≤ width_ij at increasing slopes
+        count = np.where(quadratic, segments, 1)
+        self.seg_gen = np.repeat(np.arange(len(gens)), count)
+        k = np.arange(len(self.seg_gen)) - np.repeat(np.cumsum(count) - count, count)
+        width = (self.p_max - self.p_min)[self.seg_gen] / count[self.seg_gen]
+        finite_width = np.where(np.isfinite(width), width, 0.0)
+        lower = self.p_min[self.seg_gen] + k * finite_width
+        self.seg_bounds = np.column_stack([np.zeros(len(width)), width])
+        self.seg_slope = self.cost[self.seg_gen, 1] + self.cost[self.seg_gen, 0] * (2 * lower + finite_width)
+        self.seg_bus = self.gen_bus[self.seg_gen]
+
+        # Branch limits
+        self.rating = net.branch_rating if branch_rating is None else np.asarray(branch_rating, dtype=float)
+        if self.rating.shape != (net.num_branches,):
+            raise ValueError(f"Expected {net.num_branches} branch ratings, got shape {self.rating.shape}.")
+        if branch_limits and network:
+            self.limited = np.isfinite(self.rating) & (self.rating > 0)
+        else:
+            self.limited = np.zeros(net.num_branches, dtype=bool)
+        self.active = np.empty(0, dtype=np.intp)  # branches whose limits are in the LP
+
+        if network:
+            # DC branch susceptances from the series admittance of every branch
+            m = net.num_branches
+            f = np.asarray(net.branch_from, dtype=np.intp)
+            t = np.asarray(net.branch_to, dtype=np.intp)
+            # (branches out of service, e.g. in a CircuitFork, have zero stamps and carry no flow)
+            y_ft = net.branch_stamps["pf"][:, 0, 1]
+            b = np.zeros(m)
+            b[y_ft != 0] = 1 / np.imag(1 / -y_ft[y_ft != 0])
+            incidence = sparse.csr_matrix((np.r_[np.ones(m), -np.ones(m)],
+                                           (np.r_[np.arange(m), np.arange(m)], np.r_[f, t])), shape=(m, n))
+            flow_matrix = (net.base_power * sparse.diags(b) @ incidence).tocsr()  # MW per rad
+
+            slack = np.flatnonzero(net.bus_type == SLACK)
+            if len(slack) == 0:
+                raise ValueError("No Slack Bus in the network; the DC model needs an angle reference.")
+            self.non_ref = np.delete(np.arange(n), slack[0])
+            bbus = (incidence.T @ flow_matrix).tocsc()
+            try:
+                self.B = splu(bbus[self.non_ref][:, self.non_ref].tocsc())
+            except RuntimeError:
+                raise ValueError("The DC network is singular (islanded buses or zero-reactance loops).")
+            self.flow_matrix = flow_matrix[:, self.non_ref].tocsr()
+
+    # --- DC network ---------------------------------------------------------------------
+
+    def flows(self, injection):
+        """Branch flows (MW) for net bus injections (MW)."""
+        return self.flow_matrix @ self.B.solve(injection[self.non_ref])
+
+    def ptdf(self, branches):
+        """PTDF rows (MW per MW injected at each bus and withdrawn at the reference) of `branches`."""
+        H = np.zeros((len(branches), self.compiled.num_buses))
+        if len(branches):
+            rows = self.flow_matrix[branches].toarray()
+            H[:, self.non_ref] = self.B.solve(np.ascontiguousarray(rows.T), trans="T").T
+        return H
+
+    # --- Dispatch -----------------------------------------------------------------------
+
+    def _lp(self, load, H):
+        """LP over the cost segments with the balance and the limits of the branches in H's rows."""
+        injection = np.bincount(self.gen_bus, weights=self.p_min, minlength=len(load)) - load
+        A_ub = b_ub = None
+        if len(H):
+            H_seg = H[:, self.seg_bus]
+            base_flow = H @ injection
+            rating = self.rating[self.active]
+            A_ub = np.vstack([H_seg, -H_seg])
+            b_ub = np.r_[rating - base_flow, rating + base_flow]
+        res = linprog(self.seg_slope, A_ub=A_ub, b_ub=b_ub, A_eq=np.ones((1, len(self.seg_slope))),
+                      b_eq=[-injection.sum()], bounds=self.seg_bounds, method="highs")
+        if res.status != 0:
+            raise ValueError(f"Dispatch failed: {res.message}")
+        return res
+
+    def solve(self, load=None, max_rounds=50):
+        """
+        Dispatches the generators for the bus loads `load` (MW per bus in the network bus
+        order; default: the loads of the circuit).
+
+        Returns:
+            DispatchResult with P and cost per generator, bus LMPs ($/MWh) and branch flows (MW).
+        """
+        net = self.compiled
+        load = self.load if load is None else np.asarray(load, dtype=float)
+        if load.shape != (net.num_buses,):
+            raise ValueError(f"Expected {net.num_buses} bus loads, got shape {load.shape}.")
+
+        H = self.ptdf(self.active) if self.network else np.empty((0, net.num_buses))
+        for _ in range(max_rounds):
+            res = self._lp(load, H)
+            p = self.p_min + np.bincount(self.seg_gen, weights=res.x, minlength=len(self.p_min))
+            if not self.network:
+                flow = np.full(net.num_branches, np.nan)
+                break
+            flow = self.flows(np.bincount(self.gen_bus, weights=p, minlength=net.num_buses) - load)
+            overloaded = np.flatnonzero(self.limited & (np.abs(flow) > self.rating * (1 + 1e-6)))
+            if len(overloaded) == 0:
+                break
+            self.active = np.r_[self.active, overloaded]
+            H = np.vstack([H, self.ptdf(overloaded)])
+        else:
+            raise ValueError(f"Dispatch did not settle the branch limits in {max_rounds} rounds.")
+
+        # An extra MW of load at a bus raises the balance and shifts the limits by its PTDF
+        lmp = np.full(net.num_buses, res.eqlin.marginals[0])
+        if len(H):
+            mu = res.ineqlin.marginals
+            lmp += H.T @ (mu[:len(H)] - mu[len(H):])
+
+        cost = self.cost[:, 0] * p ** 2 + self.cost[:, 1] * p + self.cost[:, 2]
+        return DispatchResult(net.gen_names, net.bus_names[self.gen_bus], p, cost, cost.sum(), res.message,
+                              net.bus_names, lmp, net.branch_names, flow)
+
+    def solve_scenarios(self, loads):
+        """Dispatches every row of `loads` (scenarios × buses, MW) on the same model."""
+        loads = np.atleast_2d(np.asarray(loads, dtype=float))
+        return [self.solve(load) for load in loads]
+
+    def apply(self, result: DispatchResult):
+        """Writes a dispatch into the circuit generators (and their bus injections)."""
+        for name, p in result.dispatch().items():
+            self.circuit.set_generation(name, p)
+
+
+def economic_dispatch(circuit, load=None, **kwargs):
+    """Lossless economic dispatch of the circuit generators, ignoring the network."""
+    return DCOptimalPowerFlow(circuit, network=False, **kwargs).solve(load)
+
+
+def dc_opf(circuit, load=None, **kwargs):
+    """DC optimal power flow of the circuit generators."""
+    return DCOptimalPowerFlow(circuit, **kwargs).solve(load)
@@ -1,9 +1,12 @@
 import numpy as np
-import pandas as pd
 
 from Classes.Circuit import Circuit
 from system_setting import SystemSettings
 from Jacobians import Jacobian
+from Classes.Kernels import ybus_csr, csr_injections
+from Classes.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
 
 
 class PowerFlowSolver:
@@ -141,50 +144,33 @@ class PowerFlowSolver:
 
         return del_y_trimmed
 
-    def calc_Px(self):
-        """Computes real power (P) injections using polar form."""
-        Px = {}
+    def state_arrays(self):
+        """Voltage magnitudes and angles as arrays in bus order."""
         bus_order = self.Circuit.bus_order()
+        Vm = np.array([self.voltage[bus] for bus in bus_order], dtype=float)
+        Va = np.array([self.delta[bus] for bus in bus_order], dtype=float)
+        return Vm, Va
 
-        for bus_k in bus_order:
-            V_k = self.voltage[bus_k]
-            δ_k = self.delta[bus_k]
-            P_k = 0.0
-
-            for bus_n in bus_order:
-                V_n = self.voltage[bus_n]
-                δ_n = self.delta[bus_n]
-                Y_kn = self.Circuit.ybus.at[bus_k, bus_n]
-                θ_kn = np.angle(Y_kn)
+    def ybus_csr(self):
+        """CSR Ybus for the kernels, rebuilt only when the circuit's Ybus is replaced."""
+        if getattr(self, "_ybus_source", None) is not self.Circuit.ybus:
+            self._ybus_source = self.Circuit.ybus
+            self._ybus_csr = ybus_csr(self.Circuit.ybus)
+        return self._ybus_csr
 
-                P_k += V_k * V_n * abs(Y_kn) * np.cos(δ_k - δ_n - θ_kn)
+    def calc_injections(self):
+        """P and Q injections (pu) in bus order, from the compiled kernel (see Kernels.py)."""
+        return csr_injections(self.ybus_csr(), *self.state_arrays())
 
-            Px[bus_k] = P_k
-
-        return Px
+    def calc_Px(self):
+        """Computes real power (P) injections using polar form."""
+        P, _ = self.calc_injections()
+        return dict(zip(self.Circuit.bus_order(), P))
 
     def calc_Qx(self):
         """Computes reactive power (Q) injections using polar form."""
-        Qx = {}
-        bus_order = self.Circuit.bus_order()
-
-        for bus_k in bus_order:
-            V_k = self.voltage[bus_k]
-            δ_k = self.delta[bus_k]
-            Q_k = 0.0
-
-            for bus_n in bus_order:
-                V_n = self.voltage[bus_n]
-                δ_n = self.delta[bus_n]
-                Y_kn = self.Circuit.ybus.at[bus_k, bus_n]
-                θ_kn = np.angle(Y_kn)
-
-                Q_k += V_k * V_n * abs(Y_kn) * np.sin(δ_k - δ_n - θ_kn)
-
-            Qx[bus_k] = Q_k
-
-        return Qx
-
+        _, Q = self.calc_injections()
+        return dict(zip(self.Circuit.bus_order(), Q))
 
     def calculate_delta_x(self):
         if not hasattr(self, 'del_y'):
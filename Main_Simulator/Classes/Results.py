@@ -0,0 +1,407 @@
+import json
+
+import numpy as np
+from Classes.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
+# Symmetrical-component transformation: V_abc = A · V_012
+_a = np.exp(2j * np.pi / 3)
+_SEQUENCE_MATRIX = np.array([[1, 1, 1], [1, _a ** 2, _a], [1, _a, _a ** 2]])
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Arrow/Parquet export requires the 'pyarrow' package (pip install pyarrow).")
+    return pyarrow
+
+
+class ResultTable:
+    """
+    Column-oriented result set: equally long NumPy arrays sharing one name index.
+
+    Columns are kept as the arrays the solvers produce (no per-row objects); complex columns
+    are split into `<column>_re` / `<column>_im` on export since Arrow has no complex type.
+    Scalar study information (fault location, convergence, ...) is kept in `meta` and written
+    as schema metadata.
+    """
+
+    index_name = "name"
+
+    def __init__(self, names, columns: dict, meta: dict = None):
+        self.names = np.asarray(names, dtype=str)
+        self.columns = {}
+        for column, values in columns.items():
+            values = np.asarray(values)
+            if values.shape != self.names.shape:
+                raise ValueError(f"Column '{column}' has {len(values)} rows, expected {len(self.names)}.")
+            self.columns[column] = values
+        self.meta = dict(meta or {})
+        self._index = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    def index(self, name):
+        """Row position of `name`."""
+        if self._index is None:
+            self._index = {n: i for i, n in enumerate(self.names.tolist())}
+        try:
+            return self._index[name]
+        except KeyError:
+            raise ValueError(f"'{name}' not found in {type(self).__name__}.")
+
+    def row(self, name):
+        """Values of one row as a dict (for inspection; use the columns for bulk work)."""
+        i = self.index(name)
+        return {column: values[i].item() for column, values in self.columns.items()}
+
+    def _flat_columns(self):
+        flat = {self.index_name: self.names}
+        for column, values in self.columns.items():
+            if np.iscomplexobj(values):
+                flat[f"{column}_re"] = values.real
+                flat[f"{column}_im"] = values.imag
+            else:
+                flat[column] = values
+        return flat
+
+    def to_frame(self):
+        """pandas DataFrame indexed by name (complex columns kept as complex)."""
+        return pd.DataFrame(self.columns, index=pd.Index(self.names, name=self.index_name))
+
+    def to_arrow(self, **labels):
+        """
+        pyarrow Table of the results. Contiguous real columns are handed to Arrow without
+        copying; the real and imaginary parts of complex columns are strided views and are copied
+        once into contiguous buffers. `labels` are added as constant columns (e.g. case=..., contingency=...) so that many
+        result sets can be stacked in one file.
+        """
+        pa = _pyarrow()
+        flat = self._flat_columns()
+        arrays = [pa.array(flat[self.index_name].tolist(), type=pa.string())]
+        arrays += [pa.array(np.ascontiguousarray(values)) for column, values in flat.items() if column != self.index_name]
+        names = list(flat)
+        for label, value in labels.items():
+            arrays.append(pa.repeat(value, len(self)))
+            names.append(label)
+        table = pa.Table.from_arrays(arrays, names=names)
+        meta = {"kind": type(self).__name__, **self.meta}
+        return table.replace_schema_metadata({"results": json.dumps(meta, default=str)})
+
+    def to_parquet(self, path, **kwargs):
+        """Writes the results to a Parquet file (keyword arguments go to pyarrow.parquet.write_table)."""
+        pa = _pyarrow()
+        pa.parquet.write_table(self.to_arrow(), path, **kwargs)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({len(self)} rows, columns={list(self.columns)})"
+
+
+class PowerFlowResult(ResultTable):
+    """Bus results of a power flow: |V| (pu), δ (rad) and net injections P, Q (pu)."""
+
+    index_name = "bus"
+
+    def __init__(self, buses, voltage, delta, p, q, converged=None, iterations=None):
+        super().__init__(buses, {"voltage": voltage, "delta": delta, "p": p, "q": q},
+                         {"converged": converged, "iterations": iterations})
+
+    @property
+    def converged(self):
+        return self.meta["converged"]
+
+    @property
+    def iterations(self):
+        return self.meta["iterations"]
+
+    @property
+    def complex_voltage(self):
+        """V∠δ as a complex array."""
+        return self["voltage"] * np.exp(1j * self["delta"])
+
+    @classmethod
+    def from_solver(cls, power_flow_solver, converged=None, iterations=None):
+        """Collects the state of a PowerFlowSolver; injections are S = V · conj(Ybus · V)."""
+        circuit = power_flow_solver.Circuit
+        buses = circuit.bus_order()
+        voltage = np.array([power_flow_solver.voltage[b] for b in buses], dtype=float)
+        delta = np.array([power_flow_solver.delta[b] for b in buses], dtype=float)
+        V = voltage * np.exp(1j * delta)
+        S = V * np.conj(circuit.ybus.loc[buses, buses].values @ V)
+        return cls(buses, voltage, delta, S.real, S.imag, converged, iterations)
+
+
+class PhasePowerFlowResult(ResultTable):
+    """
+    Bus results of a three-phase power flow: complex phase voltages (va, vb, vc, pu) and net
+    complex power injected into the network by each phase (sa, sb, sc, pu).
+    """
+
+    index_name = "bus"
+
+    def __init__(self, buses, Vabc, Sabc, converged=None, iterations=None):
+        Vabc = np.asarray(Vabc, dtype=complex)
+        Sabc = np.asarray(Sabc, dtype=complex)
+        super().__init__(buses, {"va": Vabc[0], "vb": Vabc[1], "vc": Vabc[2],
+                                 "sa": Sabc[0], "sb": Sabc[1], "sc": Sabc[2]},
+                         {"converged": converged, "iterations": iterations})
+
+    @property
+    def converged(self):
+        return self.meta["converged"]
+
+    @property
+    def iterations(self):
+        return self.meta["iterations"]
+
+    @property
+    def Vabc(self):
+        return np.vstack([self["va"], self["vb"], self["vc"]])
+
+    @property
+    def V012(self):
+        """Sequence voltages (V0, V1, V2) of every bus."""
+        a = np.exp(2j * np.pi / 3)
+        inverse = np.array([[1, 1, 1], [1, a, a ** 2], [1, a ** 2, a]]) / 3
+        return inverse @ self.Vabc
+
+    @property
+    def unbalance(self):
+        """Voltage unbalance factor |V2| / |V1| of every bus."""
+        V012 = self.V012
+        return np.abs(V012[2]) / np.abs(V012[1])
+
+
+class BranchFlowResult(ResultTable):
+    """
+    Branch results: complex power entering the branch at each end (pu), current magnitudes at
+    each end (A) and loading in percent of the branch rating.
+    """
+
+    index_name = "branch"
+
+    def __init__(self, branches, from_bus, to_bus, s_from, s_to, i_from, i_to, loading=None):
+        if loading is None:
+            loading = np.full(len(branches), np.nan)
+        super().__init__(branches, {"from_bus": from_bus, "to_bus": to_bus, "s_from": s_from, "s_to": s_to,
+                                    "i_from": i_from, "i_to": i_to, "loading": loading})
+
+    @property
+    def losses(self):
+        """Complex losses of each branch (pu): S_from + S_to."""
+        return self["s_from"] + self["s_to"]
+
+    @property
+    def total_losses(self):
+        return complex(self.losses.sum())
+
+
+class FaultResult(ResultTable):
+    """Bus results of a fault study: complex sequence (V0, V1, V2) and phase (Va, Vb, Vc) voltages in pu."""
+
+    index_name = "bus"
+
+    def __init__(self, buses, V012, Vabc, faulted_bus, fault_type, fault_current, fault_impedance=0.0):
+        V012 = np.asarray(V012, dtype=complex)
+        Vabc = np.asarray(Vabc, dtype=complex) if Vabc is not None else np.full_like(V012, np.nan)
+        super().__init__(buses, {"v0": V012[0], "v1": V012[1], "v2": V012[2],
+                                 "va": Vabc[0], "vb": Vabc[1], "vc": Vabc[2]},
+                         {"faulted_bus": faulted_bus, "fault_type": fault_type,
+                          "fault_current": [float(x) for x in fault_current],
+                          "fault_impedance": float(fault_impedance)})
+
+    @property
+    def V012(self):
+        return np.vstack([self["v0"], self["v1"], self["v2"]])
+
+    @property
+    def Vabc(self):
+        return np.vstack([self["va"], self["vb"], self["vc"]])
+
+    @classmethod
+    def from_solver(cls, fault_solver):
+        """Collects the arrays of a solved FaultStudySolver."""
+        if fault_solver.V012 is None:
+            raise ValueError("The fault study has not been solved.")
+        return cls(fault_solver.bus_order, fault_solver.V012, fault_solver.Vabc, fault_solver.faulted_bus,
+                   fault_solver.fault_type, fault_solver.fault_current, fault_solver.fault_impedance)
+
+
+class FaultSweepResult(ResultTable):
+    """
+    Results of a fault sweep (one row per faulted bus): sequence (I0, I1, I2) and phase
+    (Ia, Ib, Ic) fault currents in pu, the largest phase current |I| and the prefault voltage
+    of the faulted bus. The post-fault voltages of every bus are kept as arrays next to the
+    table: V012 and Vabc, shape (faults, 3, buses), buses in `bus_names` order.
+
+    When branch contributions were computed, the sequence currents entering each branch at its
+    from and to ends are kept as I012_from and I012_to, shape (faults, 3, branches), branches
+    in `branch_names` order (None otherwise).
+
+    Bus voltages and branch currents carry the transformer phase shifts of their buses (see
+    FaultSweep), so the phase quantities are those on each side of the transformers.
+    """
+
+    index_name = "fault_bus"
+
+    def __init__(self, fault_buses, I012, prefault, bus_names, V012, fault_type, fault_impedance=0.0,
+                 prefault_source="flat", branch_names=(), branch_from=(), branch_to=(), I012_from=None,
+                 I012_to=None):
+        I012 = np.asarray(I012, dtype=complex)
+        Iabc = _SEQUENCE_MATRIX @ I012
+        super().__init__(fault_buses, {"i0": I012[0], "i1": I012[1], "i2": I012[2],
+                                       "ia": Iabc[0], "ib": Iabc[1], "ic": Iabc[2],
+                                       "fault_current": np.abs(Iabc).max(axis=0), "prefault": prefault},
+                         {"fault_type": fault_type, "fault_impedance": float(fault_impedance),
+                          "prefault": prefault_source})
+        self.bus_names = np.asarray(bus_names, dtype=str)
+        self.V012 = np.asarray(V012, dtype=complex)
+        self.branch_names = np.asarray(branch_names, dtype=str)
+        self.branch_from = np.asarray(branch_from, dtype=str)
+        self.branch_to = np.asarray(branch_to, dtype=str)
+        self.I012_from = I012_from
+        self.I012_to = I012_to
+
+    @property
+    def I012(self):
+        return np.vstack([self["i0"], self["i1"], self["i2"]])
+
+    @property
+    def Iabc(self):
+        return np.vstack([self["ia"], self["ib"], self["ic"]])
+
+    @property
+    def Vabc(self):
+        """Post-fault phase voltages (faults, 3, buses)."""
+        return _SEQUENCE_MATRIX @ self.V012
+
+    @property
+    def Iabc_from(self):
+        """Phase currents entering each branch at its from end (faults, 3, branches)."""
+        return None if self.I012_from is None else _SEQUENCE_MATRIX @ self.I012_from
+
+    @property
+    def Iabc_to(self):
+        """Phase currents entering each branch at its to end (faults, 3, branches)."""
+        return None if self.I012_to is None else _SEQUENCE_MATRIX @ self.I012_to
+
+    def branch_currents(self, bus=None):
+        """
+        BranchFaultResult (branch contributions) of the fault at `bus`, or of every fault when
+        `bus` is None: one table of faults × branches rows, fault by fault, for a single bulk
+        export (the branch names repeat; select rows by the faulted_bus column).
+        """
+        if self.I012_from is None:
+            raise ValueError("The sweep was solved without branch contributions.")
+        if bus is not None:
+            k = self.index(bus)
+            return BranchFaultResult(self.branch_names, self.branch_from, self.branch_to, self.I012_from[k],
+                                     self.I012_to[k], bus, self.meta["fault_type"])
+        faults, branches = len(self), len(self.branch_names)
+
+        def stacked(I012):
+            # (faults, 3, branches) -> (3, faults · branches)
+            return I012.transpose(1, 0, 2).reshape(3, faults * branches)
+
+        return BranchFaultResult(np.tile(self.branch_names, faults), np.tile(self.branch_from, faults),
+                                 np.tile(self.branch_to, faults), stacked(self.I012_from), stacked(self.I012_to),
+                                 np.repeat(self.names, branches), self.meta["fault_type"])
+
+    def fault(self, bus):
+        """FaultResult (bus voltages) of the fault at `bus`."""
+        k = self.index(bus)
+        Iabc = self.Iabc[:, k]
+        phase = int(np.argmax(np.abs(Iabc)))
+        fault_current = (abs(Iabc[phase]), float(np.degrees(np.angle(Iabc[phase]))))
+        return FaultResult(self.bus_names, self.V012[k], _SEQUENCE_MATRIX @ self.V012[k], bus,
+                           self.meta["fault_type"], fault_current, self.meta["fault_impedance"])
+
+
+class BranchFaultResult(ResultTable):
+    """
+    Branch contributions to faults: sequence (i0, i1, i2) and phase (ia, ib, ic) currents in
+    pu entering each line/transformer at its from (`_from`) and to (`_to`) ends. The faulted
+    bus is a column (one bus for all rows, or one per row for the rows of a whole sweep).
+    """
+
+    index_name = "branch"
+
+    def __init__(self, branches, from_bus, to_bus, I012_from, I012_to, faulted_bus, fault_type):
+        faulted_bus = np.broadcast_to(np.asarray(faulted_bus, dtype=str), np.shape(branches))
+        columns = {"faulted_bus": faulted_bus, "from_bus": from_bus, "to_bus": to_bus}
+        for end, I012 in (("from", np.asarray(I012_from, dtype=complex)), ("to", np.asarray(I012_to, dtype=complex))):
+            Iabc = _SEQUENCE_MATRIX @ I012
+            for name, values in zip(("i0", "i1", "i2", "ia", "ib", "ic"), (*I012, *Iabc)):
+                columns[f"{name}_{end}"] = values
+        super().__init__(branches, columns, {"fault_type": fault_type})
+
+
+class DispatchResult(ResultTable):
+    """
+    Generator results of an economic dispatch or DC-OPF: bus, dispatch P (MW) and cost ($/h).
+    The bus prices (LMP, $/MWh, in `bus_names` order) and branch flows (MW, in `branch_names`
+    order) are kept as arrays next to the generator table.
+    """
+
+    index_name = "generator"
+
+    def __init__(self, generators, bus, p, cost, objective, status, bus_names=(), lmp=(), branch_names=(),
+                 flow=()):
+        super().__init__(generators, {"bus": bus, "p": p, "cost": cost},
+                         {"objective": float(objective), "status": status})
+        self.bus_names = np.asarray(bus_names, dtype=str)
+        self.lmp = np.asarray(lmp, dtype=float)
+        self.branch_names = np.asarray(branch_names, dtype=str)
+        self.flow = np.asarray(flow, dtype=float)
+
+    @property
+    def objective(self):
+        """Total generation cost ($/h)."""
+        return self.meta["objective"]
+
+    def dispatch(self):
+        """{generator: P (MW)}"""
+        return dict(zip(self.names.tolist(), self["p"].tolist()))
+
+
+class ResultWriter:
+    """
+    Appends result sets to one Parquet file, one row group per `write`, for batch studies:
+
+        with ResultWriter("sweep.parquet") as writer:
+            for bus in buses:
+                writer.write(FaultStudySolver(circuit, bus, "slg", verbose=False).solve().results(), fault=bus)
+    """
+
+    def __init__(self, path, **kwargs):
+        self.path = path
+        self.kwargs = kwargs
+        self._writer = None
+
+    def write(self, result: ResultTable, **labels):
+        table = result.to_arrow(**labels)
+        if self._writer is None:
+            pa = _pyarrow()
+            self._writer = pa.parquet.ParquetWriter(self.path, table.schema, **self.kwargs)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
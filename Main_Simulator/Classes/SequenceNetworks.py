@@ -0,0 +1,178 @@
+import numpy as np
+
+from Classes.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+sparse = lazy_import("scipy.sparse")
+
+# Stacking order of the sequence axis, the same as the rows of V012 / I012
+SEQUENCE_ORDER = ("zero", "positive", "negative")
+
+
+class SequenceNetworks:
+    """
+    Zero-, positive- and negative-sequence admittance matrices of a circuit, stacked.
+
+    The three networks share one CSR sparsity pattern (`indptr`, `indices`) and hold their
+    values in `data` (3, nnz), rows in SEQUENCE_ORDER. They are built in a single pass over the
+    branch stamps and generator shunts (`from_circuit`), and the branch data the fault studies
+    need afterwards (end buses and per-sequence stamps) is kept alongside.
+
+    The bus impedance matrices (`zbus`) are inverted once per object and sequence and cached,
+    so one SequenceNetworks can serve a whole fault sweep.
+    """
+
+    def __init__(self, bus_names, indptr, indices, data, branch_names, branch_from, branch_to, branch_stamps,
+                 gen_names, gen_bus, gen_shunts):
+        self.bus_names = list(bus_names)
+        self.indptr = np.asarray(indptr, dtype=np.intp)
+        self.indices = np.asarray(indices, dtype=np.intp)
+        self.data = np.asarray(data, dtype=complex).reshape(len(SEQUENCE_ORDER), -1)
+
+        self.branch_names = list(branch_names)
+        self.branch_from = np.asarray(branch_from, dtype=np.intp)
+        self.branch_to = np.asarray(branch_to, dtype=np.intp)
+        self.branch_stamps = np.asarray(branch_stamps, dtype=complex).reshape(len(SEQUENCE_ORDER), -1, 2, 2)
+
+        self.gen_names = list(gen_names)
+        self.gen_bus = np.asarray(gen_bus, dtype=np.intp)
+        self.gen_shunts = np.asarray(gen_shunts, dtype=complex).reshape(len(SEQUENCE_ORDER), -1)
+
+        self._zbus = [None] * len(SEQUENCE_ORDER)
+
+    @classmethod
+    def from_circuit(cls, circuit):
+        """Builds the three sequence networks of a Circuit in one pass over its components."""
+        bus_names = circuit.bus_order()
+        n = len(bus_names)
+        index = circuit.bus_index()
+
+        branches = [*circuit.transformers.values(), *circuit.transmission_lines.values()]
+        generators = list(circuit.generators.values())
+        f = np.array([index[branch.bus1.name] for branch in branches], dtype=np.intp)
+        t = np.array([index[branch.bus2.name] for branch in branches], dtype=np.intp)
+        g = np.array([index[gen.bus.name] for gen in generators], dtype=np.intp)
+
+        stamps = np.empty((len(SEQUENCE_ORDER), len(branches), 2, 2), dtype=complex)
+        shunts = np.empty((len(SEQUENCE_ORDER), len(generators)), dtype=complex)
+        for k, branch in enumerate(branches):
+            branch_stamps = branch.stamps
+            for s, seq in enumerate(SEQUENCE_ORDER):
+                stamps[s, k] = branch_stamps[seq]
+        for k, gen in enumerate(generators):
+            gen_shunts = gen.shunts
+            for s, seq in enumerate(SEQUENCE_ORDER):
+                shunts[s, k] = gen_shunts[seq]
+
+        # Entry list in component order (y11, y12, y21, y22 of each branch, then the shunts),
+        # so that every Ybus entry is summed in the same order as Circuit.assemble_ybus
+        rows = np.concatenate([np.stack([f, f, t, t], axis=1).ravel(), g])
+        cols = np.concatenate([np.stack([f, t, f, t], axis=1).ravel(), g])
+        values = np.concatenate([stamps.reshape(len(SEQUENCE_ORDER), -1), shunts], axis=1)
+
+        # One pattern for all sequences: duplicates are summed by bincount in entry order
+        keys, position = np.unique(rows * n + cols, return_inverse=True)
+        data = np.empty((len(SEQUENCE_ORDER), len(keys)), dtype=complex)
+        for s in range(len(SEQUENCE_ORDER)):
+            data[s].real = np.bincount(position, weights=values[s].real, minlength=len(keys))
+            data[s].imag = np.bincount(position, weights=values[s].imag, minlength=len(keys))
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(keys // n, minlength=n))])
+
+        return cls(bus_names, indptr, keys % n, data,
+                   [branch.name for branch in branches], f, t, stamps,
+                   [gen.name for gen in generators], g, shunts)
+
+    def with_matrices(self, matrices):
+        """
+        Copy of these networks with the Ybus of every sequence replaced by a dense matrix
+        (`matrices`: {sequence: (n, n) array}, e.g. Kron-reduced equivalents); the branch and
+        generator data are kept.
+        """
+        ybus = np.stack([np.asarray(matrices[seq], dtype=complex) for seq in SEQUENCE_ORDER])
+        n = self.num_buses
+        if ybus.shape[1:] != (n, n):
+            raise ValueError(f"Expected ({n}, {n}) matrices, got {ybus.shape[1:]}.")
+        rows, cols = np.nonzero(np.any(ybus != 0, axis=0))
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=n))])
+        return type(self)(self.bus_names, indptr, cols, ybus[:, rows, cols], self.branch_names, self.branch_from,
+                          self.branch_to, self.branch_stamps, self.gen_names, self.gen_bus, self.gen_shunts)
+
+    def with_shunts(self, shunts):
+        """
+        Copy of these networks with bus shunt admittances added to the diagonals (`shunts`:
+        (3, n) in SEQUENCE_ORDER, p.u.), e.g. the loads as constant admittances; the branch and
+        generator data are kept.
+        """
+        shunts = np.asarray(shunts, dtype=complex)
+        n = self.num_buses
+        if shunts.shape != (len(SEQUENCE_ORDER), n):
+            raise ValueError(f"Expected ({len(SEQUENCE_ORDER)}, {n}) shunts, got {shunts.shape}.")
+        rows = np.repeat(np.arange(n), np.diff(self.indptr))
+        diagonal = np.flatnonzero(rows == self.indices)
+        if len(diagonal) < n:
+            # Isolated buses have no diagonal entry on the pattern
+            return self.with_matrices(dict(zip(SEQUENCE_ORDER, self.dense() + shunts[:, None] * np.eye(n))))
+        data = self.data.copy()
+        data[:, diagonal] += shunts[:, rows[diagonal]]
+        return type(self)(self.bus_names, self.indptr, self.indices, data, self.branch_names, self.branch_from,
+                          self.branch_to, self.branch_stamps, self.gen_names, self.gen_bus, self.gen_shunts)
+
+    @property
+    def num_buses(self):
+        return len(self.bus_names)
+
+    def bus_index(self):
+        """Returns a dictionary mapping bus names to their row in the matrices."""
+        return {name: i for i, name in enumerate(self.bus_names)}
+
+    def _sequence(self, sequence):
+        try:
+            return SEQUENCE_ORDER.index(sequence)
+        except ValueError:
+            raise ValueError(f"Invalid sequence '{sequence}'. Must be 'positive', 'negative', or 'zero'.")
+
+    def ybus(self, sequence):
+        """CSR Ybus of one sequence (shares the index arrays with the other two)."""
+        n = self.num_buses
+        return sparse.csr_matrix((self.data[self._sequence(sequence)], self.indices, self.indptr), shape=(n, n))
+
+    def dense(self, sequence=None):
+        """
+        Dense Ybus of one sequence (n, n), or of all three as one (3, n, n) array in
+        SEQUENCE_ORDER when `sequence` is None.
+        """
+        n = self.num_buses
+        rows = np.repeat(np.arange(n), np.diff(self.indptr))
+        if sequence is not None:
+            ybus = np.zeros((n, n), dtype=complex)
+            ybus[rows, self.indices] = self.data[self._sequence(sequence)]
+            return ybus
+        ybus = np.zeros((len(SEQUENCE_ORDER), n, n), dtype=complex)
+        ybus[:, rows, self.indices] = self.data
+        return ybus
+
+    def frame(self, sequence):
+        """Labelled DataFrame of one sequence Ybus (the layout of Circuit.calc_ybus_positive & co.)."""
+        return pd.DataFrame(self.dense(sequence), index=self.bus_names, columns=self.bus_names)
+
+    def zbus(self, sequence=None):
+        """
+        Bus impedance matrix of one sequence (n, n), or of all three (3, n, n) in SEQUENCE_ORDER.
+        Each sequence is inverted on first use and cached.
+        """
+        if sequence is None:
+            missing = [s for s in range(len(SEQUENCE_ORDER)) if self._zbus[s] is None]
+            if len(missing) == len(SEQUENCE_ORDER):
+                self._zbus = list(np.linalg.inv(self.dense()))
+            for s in missing:
+                if self._zbus[s] is None:
+                    self._zbus[s] = np.linalg.inv(self.dense(SEQUENCE_ORDER[s]))
+            return np.stack(self._zbus)
+        s = self._sequence(sequence)
+        if self._zbus[s] is None:
+            self._zbus[s] = np.linalg.inv(self.dense(sequence))
+        return self._zbus[s]
+
+    def __repr__(self):
+        return (f"SequenceNetworks(buses={self.num_buses}, branches={len(self.branch_names)}, "
+                f"generators={len(self.gen_names)}, nnz={self.data.shape[1]})")
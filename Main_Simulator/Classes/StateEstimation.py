@@ -0,0 +1,278 @@
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import splu
+
+from Classes.CompiledNetwork import CompiledNetwork, SLACK
+from Classes.Kernels import power_derivatives
+from Classes.Results import PowerFlowResult
+from Classes.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
+# Measurement kinds: bus voltage magnitude / angle, bus injections, branch flows at the from/to end
+BUS_KINDS = ("v", "va", "p", "q")
+BRANCH_KINDS = ("pf", "qf", "pt", "qt")
+KINDS = BUS_KINDS + BRANCH_KINDS
+
+
+class MeasurementSet:
+    """
+    A fixed measurement configuration: kind, location (bus or branch name), value and standard
+    deviation of every measurement. Values are per-unit on the system base (angles in radians).
+
+    Kinds:
+        v, va   voltage magnitude / angle at a bus
+        p, q    net injection at a bus
+        pf, qf  flow entering a branch at its from end
+        pt, qt  flow entering a branch at its to end
+    """
+
+    def __init__(self, kinds, locations, values, sigmas):
+        self.kinds = np.asarray(kinds, dtype=str)
+        self.locations = np.asarray(locations, dtype=str)
+        self.values = np.asarray(values, dtype=float)
+        self.sigmas = np.broadcast_to(np.asarray(sigmas, dtype=float), self.values.shape).copy()
+        if not (self.kinds.shape == self.locations.shape == self.values.shape):
+            raise ValueError("kinds, locations and values must have the same length.")
+        unknown = sorted(set(self.kinds.tolist()) - set(KINDS))
+        if unknown:
+            raise ValueError(f"Unknown measurement kinds {unknown}; expected one of {KINDS}.")
+        if np.any(self.sigmas <= 0):
+            raise ValueError("Measurement standard deviations must be positive.")
+
+    def __len__(self):
+        return len(self.values)
+
+    @classmethod
+    def from_records(cls, records):
+        """From (kind, location, value, sigma) tuples."""
+        kinds, locations, values, sigmas = zip(*records)
+        return cls(kinds, locations, values, sigmas)
+
+    @classmethod
+    def from_frame(cls, frame: "pd.DataFrame"):
+        """From a DataFrame with columns kind, location, value and sigma."""
+        return cls(frame["kind"], frame["location"], frame["value"], frame["sigma"])
+
+    def to_frame(self):
+        return pd.DataFrame({"kind": self.kinds, "location": self.locations,
+                             "value": self.values, "sigma": self.sigmas})
+
+    def __repr__(self):
+        kinds, counts = np.unique(self.kinds, return_counts=True)
+        return f"MeasurementSet({len(self)} measurements, {dict(zip(kinds.tolist(), counts.tolist()))})"
+
+
+def branch_power_derivatives(Yf, Cf, V):
+    """
+    Flow S = V_end · conj(Yf·V) entering every branch at one end, and its sparse derivatives
+    with respect to the voltage angles and magnitudes.
+
+    Yf (m × n) holds the branch admittances seen from that end, Cf (m × n) is its incidence.
+    """
+    I = Yf @ V
+    V_end = Cf @ V
+    diag_V = sparse.diags(V)
+    diag_Vnorm = sparse.diags(V / np.abs(V))
+    diag_Vend = sparse.diags(V_end)
+    diag_I = sparse.diags(np.conj(I))
+    dS_dVa = 1j * (diag_I @ Cf @ diag_V - diag_Vend @ np.conj(Yf @ diag_V))
+    dS_dVm = diag_Vend @ np.conj(Yf @ diag_Vnorm) + diag_I @ Cf @ diag_Vnorm
+    return V_end * np.conj(I), dS_dVa.tocsr(), dS_dVm.tocsr()
+
+
+class StateEstimator:
+    """
+    Weighted-least-squares state estimation on a CompiledNetwork.
+
+    Minimizes J(x) = Σ w_i (z_i - h_i(x))² with w_i = 1/σ_i² over x = [δ of every bus except the
+    reference, |V| of every bus] by Gauss-Newton on the normal equations
+
+        G Δx = Hᵀ W (z - h(x)),   G = Hᵀ W H.
+
+    The measurement Jacobian H is assembled from the same sparse injection derivatives as the
+    power-flow path. The gain matrix keeps its sparsity pattern for a fixed measurement set, so its
+    fill-reducing ordering is computed once and reused for every factorization.
+
+    For a measurement stream, call `estimate(values)` repeatedly: each solve warm-starts from the
+    previous estimate and usually converges in one or two iterations.
+    """
+
+    def __init__(self, network, measurements: MeasurementSet):
+        if not isinstance(network, CompiledNetwork):
+            network = network.compile()
+        self.network = network
+        self.measurements = measurements
+        self.ybus = network.ybus["pf"].tocsr()
+
+        n, m = network.num_buses, network.num_branches
+        f, t = network.branch_from, network.branch_to
+        stamps = network.branch_stamps["pf"]
+        rows = np.arange(m)
+        self.Cf = sparse.csr_matrix((np.ones(m), (rows, f)), shape=(m, n))
+        self.Ct = sparse.csr_matrix((np.ones(m), (rows, t)), shape=(m, n))
+        self.Yf = sparse.csr_matrix((np.concatenate([stamps[:, 0, 0], stamps[:, 0, 1]]),
+                                     (np.tile(rows, 2), np.concatenate([f, t]))), shape=(m, n))
+        self.Yt = sparse.csr_matrix((np.concatenate([stamps[:, 1, 0], stamps[:, 1, 1]]),
+                                     (np.tile(rows, 2), np.concatenate([f, t]))), shape=(m, n))
+
+        slack = np.flatnonzero(network.bus_type == SLACK)
+        if len(slack) == 0:
+            raise ValueError("No Slack Bus in the network; the estimator needs an angle reference.")
+        self.ref = int(slack[0])
+        # State columns: angles of all buses but the reference, then all magnitudes
+        self.state_columns = np.concatenate([np.delete(np.arange(n), self.ref), n + np.arange(n)])
+
+        # Group the measurements by kind once; internally everything is in this order
+        bus_index = network.bus_index()
+        branch_index = {name: i for i, name in enumerate(network.branch_names)}
+        self.order = []
+        self.locations = {}
+        for kind in KINDS:
+            positions = np.flatnonzero(measurements.kinds == kind)
+            index = bus_index if kind in BUS_KINDS else branch_index
+            try:
+                self.locations[kind] = np.array([index[name] for name in measurements.locations[positions]],
+                                                dtype=np.intp)
+            except KeyError as e:
+                raise ValueError(f"'{e.args[0]}' in the '{kind}' measurements is not in the network.")
+            self.order.append(positions)
+        self.order = np.concatenate(self.order)
+        self.weights = 1 / measurements.sigmas[self.order] ** 2
+
+        if len(self.order) < len(self.state_columns):
+            raise ValueError(f"{len(self.order)} measurements cannot observe {len(self.state_columns)} state variables.")
+
+        self._ordering = None
+        self.V = None
+        self.objective = None
+        self.residuals = None
+        self.iterations = 0
+
+    # --- Measurement model --------------------------------------------------------------
+
+    def measurement_model(self, V):
+        """h(V) and the sparse Jacobian H = dh/dx, rows in the internal (grouped-by-kind) order."""
+        n = self.network.num_buses
+        S = V * np.conj(self.ybus @ V)
+        dS_dVa, dS_dVm = power_derivatives(self.ybus, V)
+        Sf, dSf_dVa, dSf_dVm = branch_power_derivatives(self.Yf, self.Cf, V)
+        St, dSt_dVa, dSt_dVm = branch_power_derivatives(self.Yt, self.Ct, V)
+        dS = sparse.hstack([dS_dVa, dS_dVm], format="csr")
+        dSf = sparse.hstack([dSf_dVa, dSf_dVm], format="csr")
+        dSt = sparse.hstack([dSt_dVa, dSt_dVm], format="csr")
+        eye = sparse.identity(2 * n, format="csr")
+
+        loc = self.locations
+        h = np.concatenate([
+            np.abs(V)[loc["v"]], np.angle(V)[loc["va"]],
+            S.real[loc["p"]], S.imag[loc["q"]],
+            Sf.real[loc["pf"]], Sf.imag[loc["qf"]],
+            St.real[loc["pt"]], St.imag[loc["qt"]],
+        ])
+        H = sparse.vstack([
+            eye[n + loc["v"]], eye[loc["va"]],
+            dS[loc["p"]].real, dS[loc["q"]].imag,
+            dSf[loc["pf"]].real, dSf[loc["qf"]].imag,
+            dSt[loc["pt"]].real, dSt[loc["qt"]].imag,
+        ], format="csc")[:, self.state_columns]
+        return h, H
+
+    def gain_ordering(self, H):
+        """
+        Minimum-degree ordering of the structural gain pattern |H|ᵀ|H|. It is taken from the
+        structure rather than the values because entries that vanish at a flat start (e.g. the
+        P-|V| coupling) become nonzero later, and an ordering of the sparser pattern would fill in.
+        """
+        pattern = H.copy()
+        pattern.data = np.ones_like(pattern.data, dtype=float)
+        G = (pattern.T @ pattern + sparse.identity(H.shape[1])).tocsc()
+        lu = splu(G, permc_spec="MMD_AT_PLUS_A", diag_pivot_thresh=0.0, options={"SymmetricMode": True})
+        return np.argsort(lu.perm_c)
+
+    def _factorize(self, G):
+        """Sparse factorization of the gain matrix under the stored ordering (no pivoting: G is SPD)."""
+        p = self._ordering
+        try:
+            lu = splu(G[p][:, p].tocsc(), permc_spec="NATURAL", diag_pivot_thresh=0.0,
+                      options={"SymmetricMode": True})
+        except RuntimeError:
+            raise ValueError("The gain matrix is singular: the network is not observable from these measurements.")
+
+        def solve(rhs):
+            x = np.empty_like(rhs)
+            x[p] = lu.solve(rhs[p])
+            return x
+        return solve
+
+    # --- Estimation ---------------------------------------------------------------------
+
+    def estimate(self, values=None, V0=None, tol=1e-6, max_iter=20):
+        """
+        Estimates the bus voltages.
+
+        Parameters:
+            values (array-like, optional): New measurement values in the MeasurementSet order
+                (for a measurement stream); default: the values of the MeasurementSet.
+            V0 (array-like, optional): Complex start voltages; default: the previous estimate,
+                or a flat start (1∠0) for the first solve.
+            tol: convergence tolerance on the largest state update.
+            max_iter: maximum number of Gauss-Newton iterations.
+
+        Returns:
+            PowerFlowResult with the estimated |V|, δ and the injections they imply.
+        """
+        values = self.measurements.values if values is None else np.asarray(values, dtype=float)
+        if values.shape != (len(self.measurements),):
+            raise ValueError(f"Expected {len(self.measurements)} measurement values, got shape {values.shape}.")
+        z = values[self.order]
+
+        n = self.network.num_buses
+        if V0 is not None:
+            V = np.asarray(V0, dtype=complex).copy()
+        elif self.V is not None:
+            V = self.V.copy()
+        else:
+            V = np.ones(n, dtype=complex)
+        Va, Vm = np.angle(V), np.abs(V)
+        W = sparse.diags(self.weights)
+
+        converged = False
+        for iteration in range(1, max_iter + 1):
+            h, H = self.measurement_model(V)
+            if self._ordering is None:
+                self._ordering = self.gain_ordering(H)
+            HtW = (W @ H).T.tocsr()
+            dx = self._factorize((HtW @ H).tocsc())(HtW @ (z - h))
+
+            Va[self.state_columns[:n - 1]] += dx[:n - 1]
+            Vm += dx[n - 1:]
+            V = Vm * np.exp(1j * Va)
+            if np.max(np.abs(dx)) < tol:
+                converged = True
+                break
+
+        h, _ = self.measurement_model(V)
+        residuals = np.empty_like(z)
+        residuals[self.order] = z - h
+        self.residuals = residuals
+        self.objective = float(np.sum(self.weights * (z - h) ** 2))
+        self.iterations = iteration
+        self.V = V
+
+        S = V * np.conj(self.ybus @ V)
+        return PowerFlowResult(self.network.bus_names, Vm, Va, S.real, S.imag, converged, iteration)
+
+    @property
+    def degrees_of_freedom(self):
+        """Redundancy of the measurement set (measurements minus state variables)."""
+        return len(self.order) - len(self.state_columns)
+
+    def __repr__(self):
+        return (f"StateEstimator(buses={self.network.num_buses}, measurements={len(self.order)}, "
+                f"dof={self.degrees_of_freedom})")
+
+
+def estimate_state(network, measurements, **kwargs):
+    """One-off WLS state estimate of a Circuit or CompiledNetwork."""
+    return StateEstimator(network, measurements).estimate(**kwargs)
@@ -0,0 +1,324 @@
+import numpy as np
+
+from Classes.Results import PhasePowerFlowResult
+from Classes.lazy_import import lazy_import
+from Classes.transmission_line import EARTH_RESISTIVITY, SEQUENCE_MATRIX, phase_from_sequence
+
+sparse = lazy_import("scipy.sparse")
+sparse_linalg = lazy_import("scipy.sparse.linalg")
+
+PHASES = ("a", "b", "c")
+POSITIVE = SEQUENCE_MATRIX[:, 1]  # Balanced positive-sequence set (1, a², a)
+
+
+def _phase_nodes(buses):
+    """Node numbers (k, 3) of the phases a, b, c of buses k (node 3k + p)."""
+    return 3 * np.asarray(buses, dtype=np.intp)[:, None] + np.arange(3)
+
+
+class PhaseNetwork:
+    """
+    Three-phase (abc) admittance matrix of a circuit: a sparse 3N × 3N Ybus in which node
+    3k + p is phase p of bus k, assembled from the 6×6 phase-domain stamps of the lines
+    (TransmissionLine.phase_admittances, π model) and transformers (Transformer.phase_stamp).
+
+    `branch_shift` is the positive-sequence phase shift (rad) from bus1 to bus2 of every
+    branch (the transformer winding shifts), used for the starting angles of the power flow.
+    """
+
+    def __init__(self, bus_names, ybus, branch_names, branch_from, branch_to, branch_stamps):
+        self.bus_names = list(bus_names)
+        self.ybus = ybus
+        self.branch_names = list(branch_names)
+        self.branch_from = np.asarray(branch_from, dtype=np.intp)
+        self.branch_to = np.asarray(branch_to, dtype=np.intp)
+        self.branch_stamps = np.asarray(branch_stamps, dtype=complex).reshape(-1, 6, 6)
+
+        # Open-circuit bus2 voltage for a positive-sequence bus1 voltage: -(Y22 u)⁻¹ (Y21 u)
+        u = POSITIVE
+        y21 = np.conj(u) @ self.branch_stamps[:, 3:, :3] @ u / 3
+        y22 = np.conj(u) @ self.branch_stamps[:, 3:, 3:] @ u / 3
+        self.branch_shift = np.angle(-y21 / y22)
+
+    @classmethod
+    def from_circuit(cls, circuit, earth_resistivity=EARTH_RESISTIVITY):
+        bus_names = circuit.bus_order()
+        index = circuit.bus_index()
+        n = len(bus_names)
+
+        branches = [*circuit.transformers.values(), *circuit.transmission_lines.values()]
+        stamps = np.empty((len(branches), 6, 6), dtype=complex)
+        for k, transformer in enumerate(circuit.transformers.values()):
+            stamps[k] = transformer.phase_stamp()
+        for k, line in enumerate(circuit.transmission_lines.values(), len(circuit.transformers)):
+            series, shunt = line.phase_admittances(earth_resistivity)
+            stamps[k] = np.block([[series + shunt / 2, -series],
+                                  [-series, series + shunt / 2]])
+
+        f = np.array([index[branch.bus1.name] for branch in branches], dtype=np.intp)
+        t = np.array([index[branch.bus2.name] for branch in branches], dtype=np.intp)
+        nodes = np.concatenate([_phase_nodes(f), _phase_nodes(t)], axis=1)  # (m, 6)
+        rows = np.repeat(nodes, 6, axis=1).ravel()
+        cols = np.tile(nodes, (1, 6)).ravel()
+        ybus = sparse.csr_matrix((stamps.ravel(), (rows, cols)), shape=(3 * n, 3 * n))
+        ybus.sum_duplicates()
+        return cls(bus_names, ybus, [branch.name for branch in branches], f, t, stamps)
+
+    @property
+    def num_buses(self):
+        return len(self.bus_names)
+
+    def bus_shifts(self, reference):
+        """Positive-sequence angle (rad) of every bus relative to bus `reference`, through the branch shifts."""
+        n = self.num_buses
+        adjacency = [[] for _ in range(n)]
+        for f, t, shift in zip(self.branch_from.tolist(), self.branch_to.tolist(), self.branch_shift.tolist()):
+            adjacency[f].append((t, -shift))
+            adjacency[t].append((f, shift))
+        angle = np.zeros(n)
+        seen = np.zeros(n, dtype=bool)
+        seen[reference] = True
+        stack = [reference]
+        while stack:
+            k = stack.pop()
+            for j, shift in adjacency[k]:
+                if not seen[j]:
+                    seen[j] = True
+                    angle[j] = angle[k] + shift
+                    stack.append(j)
+        return angle
+
+    def __repr__(self):
+        return f"PhaseNetwork(buses={self.num_buses}, branches={len(self.branch_names)}, nnz={self.ybus.nnz})"
+
+
+class ThreePhasePowerFlow:
+    """
+    Unbalanced power flow in phase coordinates, solved with the current-injection Newton method
+    in rectangular voltages on the sparse 3N × 3N Ybus (PhaseNetwork).
+
+    Unknowns are the real and imaginary voltages of every phase node except those of the slack
+    bus, whose phases are held at a balanced set of magnitude `per_unit`. The mismatches are
+    the nodal currents I_spec(V) - Ybus·V, so the network part of the Jacobian is the constant
+    (negated) Ybus and only the load and generator terms change between iterations.
+
+    Loads are constant power per phase (Load.phase_powers), wye-connected to ground or
+    delta-connected between phases. The generators of a PV bus are one balanced internal
+    voltage E behind their sequence admittances (x1, x2 and x0 with the grounding; generators
+    without x1/x2 get `source_reactance`): E is solved so that the bus delivers the scheduled
+    P and its positive-sequence voltage magnitude is `per_unit`. Reactive limits are not
+    enforced.
+    """
+
+    def __init__(self, circuit, earth_resistivity=EARTH_RESISTIVITY, source_reactance=0.01):
+        self.circuit = circuit
+        self.network = PhaseNetwork.from_circuit(circuit, earth_resistivity)
+        net = self.network
+        n = net.num_buses
+        index = circuit.bus_index()
+        base_power = circuit.get_base_power()
+        buses = list(circuit.buses.values())
+
+        slack = [k for k, bus in enumerate(buses) if bus.bus_type == "Slack Bus"]
+        if not slack:
+            raise ValueError("No Slack Bus in the circuit; the three-phase power flow needs a voltage reference.")
+        self.slack = slack[0]
+
+        # Generators: one balanced source per PV bus, stamped into the network admittances
+        pv = sorted({index[g.bus.name] for g in circuit.generators.values()
+                     if g.bus.bus_type == "PV Bus" and index[g.bus.name] != self.slack})
+        self.pv_bus = np.array(pv, dtype=np.intp)
+        self.gen_admittance = np.zeros((len(pv), 3, 3), dtype=complex)
+        self.gen_y1 = np.zeros(len(pv), dtype=complex)
+        self.gen_p = np.zeros(len(pv))
+        self.gen_v = np.array([buses[k].per_unit for k in pv], dtype=float)
+        position = {k: g for g, k in enumerate(pv)}
+        source = 1 / (1j * source_reactance)
+        for generator in circuit.generators.values():
+            g = position.get(index[generator.bus.name])
+            if g is None:
+                continue
+            shunts = generator.shunts
+            y1 = shunts["positive"] or source
+            y2 = shunts["negative"] or source
+            self.gen_admittance[g] += phase_from_sequence(shunts["zero"], y1, y2)
+            self.gen_y1[g] += y1
+            self.gen_p[g] += 3 * generator.real_power / base_power
+
+        nodes = _phase_nodes(self.pv_bus)
+        self.ybus = (net.ybus + sparse.csr_matrix(
+            (self.gen_admittance.ravel(), (np.repeat(nodes, 3, axis=1).ravel(), np.tile(nodes, (1, 3)).ravel())),
+            shape=net.ybus.shape)).tocsr()
+
+        # Loads: constant-power elements between node i and node j (-1 = ground), S consumed
+        # (per-phase quantities are in pu of the per-phase base, S_base / 3)
+        load_i, load_j, load_s = [], [], []
+        for load in circuit.loads.values():
+            k = index[load.bus.name]
+            for p, (real, reactive) in enumerate(zip(*load.phase_powers())):
+                load_i.append(3 * k + p)
+                load_j.append(3 * k + (p + 1) % 3 if load.connection == "delta" else -1)
+                load_s.append(3 * complex(real, reactive) / base_power)
+        self.load_i = np.array(load_i, dtype=np.intp)
+        self.load_j = np.array(load_j, dtype=np.intp)
+        self.load_s = np.array(load_s, dtype=complex)
+
+        # Free nodes (all phases of the non-slack buses) and their position in the unknowns
+        self.slack_nodes = _phase_nodes([self.slack]).ravel()
+        self.free = np.setdiff1d(np.arange(3 * n), self.slack_nodes)
+        self.position = np.full(3 * n, -1, dtype=np.intp)
+        self.position[self.free] = np.arange(len(self.free))
+
+        # Constant network part of the Jacobian: -Ybus of the free nodes as 2×2 real blocks
+        y_ff = self.ybus[self.free][:, self.free].tocoo()
+        self._y_fs = self.ybus[self.free][:, self.slack_nodes].tocsr()
+        self._y_ff = y_ff.tocsr()
+        r, c, g, b = y_ff.row, y_ff.col, y_ff.data.real, y_ff.data.imag
+        self._net_rows = np.concatenate([2 * r, 2 * r, 2 * r + 1, 2 * r + 1])
+        self._net_cols = np.concatenate([2 * c, 2 * c + 1, 2 * c, 2 * c + 1])
+        self._net_data = np.concatenate([-g, b, -b, -g])
+
+        # Starting point: bus magnitudes and the winding shifts seen from the slack bus
+        magnitude = np.ones(n)
+        magnitude[self.slack] = buses[self.slack].per_unit
+        magnitude[self.pv_bus] = self.gen_v
+        angle = net.bus_shifts(self.slack)
+        self.V = (magnitude * np.exp(1j * angle))[:, None] * POSITIVE[None, :]
+        self.V = self.V.ravel()
+        self.E = self.V[3 * self.pv_bus]  # phase-a voltage = positive-sequence voltage at the start
+        self.converged = False
+        self.iterations = 0
+
+    # --- Mismatch and Jacobian -------------------------------------------------------------
+
+    def _load_terms(self, V):
+        """Injected load currents at node i (3 per element) and dI_i/dU blocks (a, b), U = V_i - V_j."""
+        U = V[self.load_i] - np.where(self.load_j >= 0, V[np.maximum(self.load_j, 0)], 0)
+        S = -self.load_s  # injected
+        current = np.conj(S / U)
+        e, f, P, Q = U.real, U.imag, S.real, S.imag
+        m2 = (e * e + f * f) ** 2
+        a = (P * (f * f - e * e) - 2 * Q * e * f) / m2
+        b = (Q * (e * e - f * f) - 2 * P * e * f) / m2
+        return current, a, b
+
+    def _generator_terms(self, V):
+        """Source currents, terminal currents I_g and powers P_g and positive-sequence voltages of the PV buses."""
+        nodes = _phase_nodes(self.pv_bus)
+        Vg = V[nodes]  # (g, 3)
+        source = (self.gen_y1 * self.E)[:, None] * POSITIVE[None, :]
+        Ig = source - np.einsum("gij,gj->gi", self.gen_admittance, Vg)
+        P = np.sum(Vg * np.conj(Ig), axis=1).real
+        V1 = Vg @ np.conj(POSITIVE) / 3
+        return nodes, Vg, source, Ig, P, V1
+
+    def mismatch(self, V=None):
+        """Current mismatches (2 per free node, real/imag) followed by the P and |V1|² mismatches of the PV buses."""
+        V = self.V if V is None else V
+        n_free = len(self.free)
+        injection = np.zeros(3 * self.network.num_buses, dtype=complex)
+        current, _, _ = self._load_terms(V)
+        np.add.at(injection, self.load_i, current)
+        ground = self.load_j >= 0
+        np.add.at(injection, self.load_j[ground], -current[ground])
+        nodes, _, source, _, P, V1 = self._generator_terms(V)
+        np.add.at(injection, nodes.ravel(), source.ravel())
+
+        dI = injection[self.free] - (self._y_ff @ V[self.free] + self._y_fs @ V[self.slack_nodes])
+        F = np.empty(2 * n_free + 2 * len(self.pv_bus))
+        F[0:2 * n_free:2] = dI.real
+        F[1:2 * n_free:2] = dI.imag
+        F[2 * n_free::2] = self.gen_p - P
+        F[2 * n_free + 1::2] = self.gen_v ** 2 - np.abs(V1) ** 2
+        return F
+
+    def jacobian(self, V=None):
+        V = self.V if V is None else V
+        n_free = len(self.free)
+        size = 2 * n_free + 2 * len(self.pv_bus)
+        rows, cols, data = [self._net_rows], [self._net_cols], [self._net_data]
+
+        def block(node_rows, node_cols, a, b, sign):
+            # 2×2 blocks [[a, b], [b, -a]] between free nodes
+            keep = (node_rows >= 0) & (node_cols >= 0)
+            r, c, a, b = 2 * node_rows[keep], 2 * node_cols[keep], sign * a[keep], sign * b[keep]
+            rows.extend([r, r, r + 1, r + 1])
+            cols.extend([c, c + 1, c, c + 1])
+            data.extend([a, b, b, -a])
+
+        # Loads: I_i(U) with dI_i/dV_i = K, dI_i/dV_j = -K, and the opposite current at j
+        _, a, b = self._load_terms(V)
+        pi = self.position[self.load_i]
+        pj = np.where(self.load_j >= 0, self.position[np.maximum(self.load_j, 0)], -1)
+        block(pi, pi, a, b, 1)
+        block(pi, pj, a, b, -1)
+        block(pj, pi, a, b, -1)
+        block(pj, pj, a, b, 1)
+
+        # Generators: source current y1·E·u_p, and the P and |V1|² rows
+        nodes, Vg, source, Ig, P, V1 = self._generator_terms(V)
+        g = np.arange(len(self.pv_bus))
+        e_col = 2 * n_free + 2 * g
+        p_row, v_row = e_col, e_col + 1
+        c = self.gen_y1[:, None] * POSITIVE[None, :]  # dI/dE (g, 3)
+        node_pos = self.position[nodes]  # (g, 3)
+        r = 2 * node_pos.ravel()
+        ec = np.repeat(e_col, 3)
+        rows.extend([r, r, r + 1, r + 1])
+        cols.extend([ec, ec + 1, ec, ec + 1])
+        data.extend([c.real.ravel(), -c.imag.ravel(), c.imag.ravel(), c.real.ravel()])
+
+        h = np.conj(Ig) - np.einsum("gji,gj->gi", self.gen_admittance, np.conj(Vg))  # dP = Re(h·dV)
+        w = np.sum(Vg * np.conj(c), axis=1)  # dP = Re(w·conj(dE))
+        q = 2 * np.conj(V1)[:, None] * np.conj(POSITIVE)[None, :] / 3  # d|V1|² = Re(q·dV)
+        pr, vr = np.repeat(p_row, 3), np.repeat(v_row, 3)
+        rows.extend([pr, pr, vr, vr, p_row, p_row])
+        cols.extend([2 * node_pos.ravel(), 2 * node_pos.ravel() + 1, 2 * node_pos.ravel(), 2 * node_pos.ravel() + 1,
+                     e_col, e_col + 1])
+        data.extend([-h.real.ravel(), h.imag.ravel(), -q.real.ravel(), q.imag.ravel(), -w.real, -w.imag])
+
+        rows, cols, data = np.concatenate(rows), np.concatenate(cols), np.concatenate(data)
+        return sparse.csc_matrix((data, (rows, cols)), shape=(size, size))
+
+    # --- Solution --------------------------------------------------------------------------
+
+    def solve(self, tol=1e-8, max_iter=30):
+        """Newton iterations until the largest mismatch is below `tol` (pu). Returns True if converged."""
+        n_free = len(self.free)
+        self.converged = False
+        for iteration in range(max_iter + 1):
+            F = self.mismatch()
+            self.iterations = iteration
+            if np.max(np.abs(F), initial=0.0) < tol:
+                self.converged = True
+                break
+            if iteration == max_iter:
+                break
+            try:
+                dx = sparse_linalg.splu(self.jacobian()).solve(-F)
+            except RuntimeError:
+                raise ValueError("Singular three-phase Jacobian (floating nodes or islanded buses).")
+            self.V[self.free] += dx[0:2 * n_free:2] + 1j * dx[1:2 * n_free:2]
+            self.E = self.E + dx[2 * n_free::2] + 1j * dx[2 * n_free + 1::2]
+        return self.converged
+
+    def results(self):
+        """
+        PhasePowerFlowResult of the current state: phase voltages and the net power each phase
+        injects into the network, in pu of the (three-phase) system base.
+        """
+        S = self.V * np.conj(self.network.ybus @ self.V) / 3
+        n = self.network.num_buses
+        return PhasePowerFlowResult(self.network.bus_names, self.V.reshape(n, 3).T, S.reshape(n, 3).T,
+                                    self.converged, self.iterations)
+
+    def __repr__(self):
+        return (f"ThreePhasePowerFlow(buses={self.network.num_buses}, pv_buses={len(self.pv_bus)}, "
+                f"loads={len(self.load_i)}, converged={self.converged})")
+
+
+def three_phase_power_flow(circuit, tol=1e-8, max_iter=30, **kwargs):
+    """Solves the unbalanced power flow of a circuit and returns its PhasePowerFlowResult."""
+    solver = ThreePhasePowerFlow(circuit, **kwargs)
+    solver.solve(tol=tol, max_iter=max_iter)
+    return solver.results()
@@ -2,6 +2,7 @@ import math
 from Classes.conductor import Conductor
 
 class Bundle:
+    __slots__ = ("name", "num_conductors", "spacing", "conductor", "DSL", "DSC")
 
     def __init__(self, name: str, num_conductors: int, spacing: float, conductor: Conductor):
         """
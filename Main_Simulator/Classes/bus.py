@@ -1,21 +1,24 @@
 class Bus:
-    count = 0
-    slack_assigned = False  # Ensures only one slack bus is assigned
+    """
+    A bus of the network. `index` is the bus's position in the circuit it was added to; it is
+    assigned by Circuit.add_bus (None until then), so every circuit numbers its buses 0..n-1
+    in insertion order.
+    """
+
+    __slots__ = ("name", "base_kv", "index", "real_power", "reactive_power", "bus_type", "per_unit",
+                 "loads", "generators")
 
     def __init__(self, name: str, base_kv: float):
 
         self.name = name
         self.base_kv = base_kv
-        self.index = Bus.count
+        self.index = None
         self.real_power = 0.0
         self.reactive_power = 0.0
         self.bus_type = 'PQ Bus'
+        self.per_unit = 1.0  # Voltage setpoint in p.u. (set by a generator on the bus)
         self.loads = []
-        Bus.count += 1
-
-
-
-
-
-
+        self.generators = []
 
+    def __repr__(self):
+        return f"Bus(name='{self.name}', base_kv={self.base_kv}, index={self.index}, bus_type='{self.bus_type}')"
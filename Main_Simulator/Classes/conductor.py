@@ -1,4 +1,6 @@
 class Conductor:
+    __slots__ = ("name", "diam", "GMR", "resistance", "ampacity", "radius")
+
     def __init__(self, name:str, diam:float, GMR:float, resistance:float, ampacity:float):
         self.name = name
         self.diam = diam # Normally given in inches
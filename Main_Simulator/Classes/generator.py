@@ -1,17 +1,25 @@
 from Classes.bus import Bus
 import numpy as np
-import pandas as pd
 
 class Generator:
+    __slots__ = ("name", "bus", "real_power", "per_unit", "Q", "q_min", "q_max", "p_min", "p_max", "cost",
+                 "connection_type", "x1", "x2", "x0", "is_grounded", "Yn", "zn_pu", "Y1", "Y2", "Y0", "_shunts")
+
     def __init__(self, name: str, bus: Bus, real_power: float, per_unit: float,
                  x1=None, x2=None, x0=None,
                  system_settings=None, grounding_impedance_ohm=None, is_grounded=True,
-                 connection_type="wye"):
+                 connection_type="wye", q_min=None, q_max=None,
+                 p_min=None, p_max=None, cost=None):
         self.name = name
         self.bus = bus  # This should be a Bus object
         self.real_power = real_power  # Real power generation in MW
         self.per_unit = per_unit  # Voltage setpoint in p.u.
         self.Q = None  # Reactive power, to be calculated during power flow
+        self.q_min = q_min  # Reactive power limits in Mvar (None = unlimited)
+        self.q_max = q_max
+        self.p_min = p_min  # Real power limits in MW (None = 0 / unlimited)
+        self.p_max = p_max
+        self.cost = cost  # Polynomial cost (c2, c1, c0): c2·P² + c1·P + c0 in $/h, P in MW
         self.connection_type = connection_type.lower()
 
         # Initialize reactances (will be overwritten if conditions met)
@@ -22,17 +30,16 @@ class Generator:
         # Grounding
         self.is_grounded = is_grounded
         self.Yn = None  # Neutral-to-ground admittance in pu
+        self.zn_pu = None  # Neutral grounding impedance in pu (impedance-grounded only)
+        self.Y1 = self.Y2 = self.Y0 = None  # Sequence admittances, set by calc_admittances
+        self._shunts = None  # Per-sequence shunt admittances, computed on first use
 
-        # Set PV or Slack Bus behavior
+        # Set PV or Slack Bus behavior: the first generator of a bus sets its type and voltage,
+        # every unit on the bus adds to its injection
         if self.bus.bus_type not in ["Slack Bus", "PV Bus"]:
             self.bus.bus_type = "PV Bus"
             self.bus.per_unit = self.per_unit
-
-            if not hasattr(self.bus, 'generators'):
-                self.bus.generators = []
-            self.bus.generators.append(self)
-        else:
-            print(f"[INFO] Generator '{self.name}' is connected to Slack Bus '{self.bus.name}'. P will be calculated during power flow.")
+        self.bus.generators.append(self)
 
         # Conversion of x1, x2, x0 from generator base to system base
         if system_settings and x1 is not None and x2 is not None and x0 is not None:
@@ -91,6 +98,23 @@ class Generator:
         }
 
 
+    @property
+    def shunts(self):
+        """
+        Per-unit shunt admittance the generator adds to its bus in the power-flow ("pf", none)
+        and each sequence network, 0 where it has no path. Computed once and cached.
+        """
+        if self._shunts is None:
+            self.calc_admittances()
+            self._shunts = {
+                "pf": 0j,
+                "positive": complex(self.Y1) if self.Y1 is not None else 0j,
+                "negative": complex(self.Y2) if self.Y2 is not None else 0j,
+                # Zero sequence only through a grounded neutral
+                "zero": complex(self.Y0) if self.Y0 is not None and self.Yn is not None else 0j,
+            }
+        return self._shunts
+
     def calc_yprim_sequence(self, sequence='positive'):
         """
         Returns the sequence Yprim matrix (as 2×2 np.array for pos/neg,
@@ -124,4 +148,4 @@ class Generator:
     def __repr__(self):
         return (f"Generator(name='{self.name}', bus='{self.bus.name}', "
                 f"voltage_setpoint={self.per_unit} p.u., real_power={self.real_power} MW, "
-                f"x1={self.x1}, x2={self.x2}, x0={self.x0}, Yn={self.Yn})," f"connection_type='{self.connection_type}', ")
+                f"x1={self.x1}, x2={self.x2}, x0={self.x0}, Yn={self.Yn}, q_min={self.q_min}, q_max={self.q_max})," f"connection_type='{self.connection_type}', ")
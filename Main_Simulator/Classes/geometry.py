@@ -1,7 +1,15 @@
 import math
 
 class Geometry:
-    def __init__(self, name:str, xa:float, ya:float, xb:float, yb:float, xc:float, yc:float):
+    __slots__ = ("name", "xa", "ya", "xb", "yb", "xc", "yc", "Deq", "ground_wires", "ground_conductor")
+
+    def __init__(self, name:str, xa:float, ya:float, xb:float, yb:float, xc:float, yc:float,
+                 ground_wires=(), ground_conductor=None):
+        """
+        Phase positions (ft; y is the height above ground, 0 when unknown) and optional ground
+        wires: their (x, y) positions and the Conductor they are made of. Ground wires do not
+        change Deq; they enter the Carson's-equation constants (CarsonEquations).
+        """
         self.name = name
         self.xa = xa
         self.ya = ya
@@ -10,6 +18,10 @@ class Geometry:
         self.xc = xc
         self.yc = yc
         self.Deq = float # equivalent distance
+        self.ground_wires = tuple((float(x), float(y)) for x, y in ground_wires)
+        self.ground_conductor = ground_conductor
+        if self.ground_wires and ground_conductor is None:
+            raise ValueError(f"Geometry '{name}' has ground wires but no ground conductor.")
         self.calc_Deq()
 
     def calc_Deq(self):
@@ -25,4 +37,4 @@ class Geometry:
     def __repr__(self):
         """Returns a detailed string representation of the Geometry object."""
         return (f"Geometry(name='{self.name}', Deq={self.Deq:.4f} ft, "
-                f"Phase A=({self.xa}, {self.ya}), Phase B=({self.xb}, {self.yb}), Phase C=({self.xc}, {self.yc}))")
\ No newline at end of file
+                f"Phase A=({self.xa}, {self.ya}), Phase B=({self.xb}, {self.yb}), Phase C=({self.xc}, {self.yc}), ground_wires={len(self.ground_wires)})")
\ No newline at end of file
@@ -2,12 +2,56 @@ from Classes.bus import Bus
 
 
 class Load:
+    __slots__ = ("name", "bus", "real_power", "reactive_power")
+
+    connection = "wye"
+
     def __init__(self, name: str, bus, real_power: float, reactive_power: float):
         self.name = name
         self.bus = bus  # This should be a Bus object
         self.real_power = real_power  # MW
         self.reactive_power = reactive_power  # Mvar
 
+    def phase_powers(self):
+        """Per-phase real (MW) and reactive (Mvar) powers: a balanced load splits evenly."""
+        return (self.real_power / 3,) * 3, (self.reactive_power / 3,) * 3
+
     def __repr__(self):
         return (f"Load(name='{self.name}', bus='{self.bus.name}', "
-                f"real_power={self.real_power} MW, reactive_power={self.reactive_power} Mvar)")
\ No newline at end of file
+                f"real_power={self.real_power} MW, reactive_power={self.reactive_power} Mvar)")
+
+
+class UnbalancedLoad(Load):
+    """
+    Constant-power load given per phase: wye-connected (phases a, b, c to ground) or
+    delta-connected (phase pairs ab, bc, ca). `real_power` / `reactive_power` hold the
+    three-phase totals, which the balanced solvers use; when they are changed (set_load), the
+    phases are rescaled in proportion.
+    """
+
+    __slots__ = ("phase_real_power", "phase_reactive_power", "connection")
+
+    def __init__(self, name: str, bus, phase_real_power, phase_reactive_power, connection="wye"):
+        if len(phase_real_power) != 3 or len(phase_reactive_power) != 3:
+            raise ValueError("Unbalanced loads need three per-phase real and reactive powers.")
+        if connection not in ("wye", "delta"):
+            raise ValueError(f"Invalid load connection '{connection}'. Must be 'wye' or 'delta'.")
+        super().__init__(name, bus, float(sum(phase_real_power)), float(sum(phase_reactive_power)))
+        self.phase_real_power = tuple(float(p) for p in phase_real_power)  # MW per phase
+        self.phase_reactive_power = tuple(float(q) for q in phase_reactive_power)  # Mvar per phase
+        self.connection = connection
+
+    def phase_powers(self):
+        return (self._rescaled(self.phase_real_power, self.real_power),
+                self._rescaled(self.phase_reactive_power, self.reactive_power))
+
+    @staticmethod
+    def _rescaled(phases, total):
+        given = sum(phases)
+        if given == total or given == 0:
+            return phases
+        return tuple(p * total / given for p in phases)
+
+    def __repr__(self):
+        return (f"UnbalancedLoad(name='{self.name}', bus='{self.bus.name}', connection='{self.connection}', "
+                f"real_power={self.phase_real_power} MW, reactive_power={self.phase_reactive_power} Mvar)")
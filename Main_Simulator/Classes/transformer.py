@@ -1,7 +1,9 @@
 import cmath
 import math
-import pandas as pd
 import numpy as np
+from Classes.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
 
 class Transformer:
     """Represents a transformer in a power system network."""
@@ -10,7 +12,7 @@ class Transformer:
                  x_over_r_ratio: float, s_base: float,
                  primary_connection_type="wye", secondary_connection_type="wye",
                  grounding_impedance_ohm_bus1=0.0, grounding_impedance_ohm_bus2=0.0,
-                 is_grounded_bus1=True, is_grounded_bus2=True):
+                 is_grounded_bus1=True, is_grounded_bus2=True, tap_ratio=1.0, rating_mva=None):
         """
         Initializes a Transformer object.
 
@@ -21,6 +23,8 @@ class Transformer:
         - power_rating (float): Transformer power rating in MVA.
         - impedance_percent (float): Transformer impedance as a percentage.
         - x_over_r_ratio (float): Transformer X/R ratio.
+        - tap_ratio (float): Off-nominal turns ratio on the bus1 side (1.0 = nominal).
+        - rating_mva (float, optional): Thermal rating in MVA for the branch flows (default: power_rating).
         """
         self.name = name
         self.bus1 = bus1
@@ -28,6 +32,8 @@ class Transformer:
         self.power_rating = power_rating  # In MVA
         self.impedance_percent = impedance_percent
         self.x_over_r_ratio = x_over_r_ratio
+        self.tap_ratio = tap_ratio
+        self.rating_mva = rating_mva
 
         # Assign base values
         self.s_base = s_base  # System base power
@@ -56,9 +62,8 @@ class Transformer:
         self.r_pu_sys = self.z_pu_sys.real
         self.x_pu_sys = self.z_pu_sys.imag
 
-        # Compute Y-primitive matrices
-        self.yprim = self.calc_yprim()
-        self.yprim_pu = self.calc_yprim_pu()
+        # Per-unit stamps of every sequence, computed on first use (see `stamps`)
+        self._stamps = None
 
         # Used to compute the yprim sequences
         self.primary_connection_type = primary_connection_type.lower()
@@ -121,75 +126,127 @@ class Transformer:
         """Calculates the transformer's per-unit admittance on the system base."""
         return 1 / self.z_pu_sys if abs(self.z_pu_sys) > 1e-9 else complex(0, 0)
 
+    @property
+    def stamps(self):
+        """
+        Per-unit 2×2 admittance stamps [[y11, y12], [y21, y22]] (bus1, bus2 order) of the
+        power-flow network ("pf") and of each sequence network, as read-only complex arrays.
+        Computed once and cached.
+        """
+        if self._stamps is None:
+            self._stamps = self.calc_stamps()
+        return self._stamps
+
+    def calc_stamps(self):
+        """Computes the per-unit stamps of all sequences (see `stamps`)."""
+        # Pos/neg sequence (and power flow): no internal phase shift; an off-nominal tap scales the bus1 side
+        Y = self.y_pu_sys
+        t = self.tap_ratio
+        series = np.array([[Y / t ** 2, -Y / t],
+                           [-Y / t, Y]], dtype=complex)
+
+        # Zero sequence: only through WYE-connected windings, in series with their grounding impedance
+        Z_series = 1 / Y if Y != 0 else complex('inf')
+
+        if self.primary_connection_type == "wye" and self.is_grounded_bus1:
+            Zn1 = (1 / self.Yn1) if self.Yn1 else complex('inf')
+            Y11 = 1 / (Z_series + Zn1)
+        else:
+            Y11 = 0
+
+        if self.secondary_connection_type == "wye" and self.is_grounded_bus2:
+            Zn2 = (1 / self.Yn2) if self.Yn2 else complex('inf')
+            Y22 = 1 / (Z_series + Zn2)
+        else:
+            Y22 = 0
+
+        if (self.primary_connection_type == "wye" and self.secondary_connection_type == "wye"
+                and self.is_grounded_bus1 and self.is_grounded_bus2):
+            Ymutual = -1 / Z_series
+        else:
+            Ymutual = 0
+
+        # The off-nominal tap scales the bus1 side of the zero-sequence paths as well
+        zero = np.array([[Y11 / t ** 2, Ymutual / t],
+                         [Ymutual / t, Y22]], dtype=complex)
+
+        series.flags.writeable = False
+        zero.flags.writeable = False
+        return {"pf": series, "positive": series, "negative": series, "zero": zero}
+
+    def phase_stamp(self):
+        """
+        Per-unit 6×6 phase-domain admittance stamp (bus1 a, b, c, then bus2 a, b, c) from the
+        winding connections, for the three-phase power flow.
+
+        Built from three single-phase units of leakage admittance y_pu_sys: a wye winding k is
+        connected from phase k to its neutral, a delta winding k from phase k to phase k+1 (its
+        voltage scaled by 1/√3), so that bus1 leads bus2 by `phase_shift_deg`. Grounded neutrals
+        are solid when no grounding impedance is given; impedance-grounded and ungrounded
+        neutrals are eliminated (Kron). An off-nominal tap scales the bus1 side.
+        """
+        y = self.y_pu_sys
+        windings = ((self.primary_connection_type, self.is_grounded_bus1, self.Zn1_ohm, self.bus1.base_kv, 1 / self.tap_ratio),
+                    (self.secondary_connection_type, self.is_grounded_bus2, self.Zn2_ohm, self.bus2.base_kv, 1.0))
+
+        # Nodes: bus1 a, b, c, bus2 a, b, c, neutral 1, neutral 2
+        C = np.zeros((3, 2, 8), dtype=complex)  # winding k, side s -> incidence on the nodes
+        Y = np.zeros((8, 8), dtype=complex)
+        keep = list(range(6))
+        for side, (connection, grounded, zn_ohm, base_kv, scale) in enumerate(windings):
+            for k in range(3):
+                if connection == "delta":
+                    C[k, side, 3 * side + k] = scale / math.sqrt(3)
+                    C[k, side, 3 * side + (k + 1) % 3] = -scale / math.sqrt(3)
+                else:
+                    C[k, side, 3 * side + k] = scale
+                    C[k, side, 6 + side] = -scale
+            if connection != "delta" and not (grounded and not zn_ohm):
+                keep.append(6 + side)  # neutral not solidly grounded: eliminated below
+                if grounded:
+                    Y[6 + side, 6 + side] += (base_kv ** 2 / self.s_base) / zn_ohm
+
+        primitive = y * np.array([[1, -1], [-1, 1]])
+        for k in range(3):
+            Y += C[k].T @ primitive @ C[k]
+        Y = Y[np.ix_(keep, keep)]
+        if len(keep) > 6:
+            Y = Y[:6, :6] - Y[:6, 6:] @ np.linalg.solve(Y[6:, 6:], Y[6:, :6])
+        return Y
+
+    def frame(self, matrix):
+        """Labelled DataFrame (copy) of a 2×2 matrix in bus1, bus2 order."""
+        names = [self.bus1.name, self.bus2.name]
+        return pd.DataFrame(np.array(matrix, dtype=complex), index=names, columns=names)
+
+    @property
+    def yprim(self):
+        return self.calc_yprim()
+
+    @property
+    def yprim_pu(self):
+        return self.calc_yprim_pu()
+
     def calc_yprim(self):
         """Calculates the Y-primitive matrix in Siemens and returns a numerical Pandas DataFrame."""
-        yprim_matrix = pd.DataFrame(
-            [[self.yt, -self.yt],
-             [-self.yt, self.yt]],
-            index=[self.bus1.name, self.bus2.name],
-            columns=[self.bus1.name, self.bus2.name]
-        )
-        return yprim_matrix
+        return self.frame([[self.yt, -self.yt],
+                           [-self.yt, self.yt]])
 
     def calc_yprim_pu(self):
-        """Calculates the Y-primitive matrix in per-unit and returns a numerical Pandas DataFrame."""
-        yprim_pu_matrix = pd.DataFrame(
-            [[self.y_pu_sys, -self.y_pu_sys],
-             [-self.y_pu_sys, self.y_pu_sys]],
-            index=[self.bus1.name, self.bus2.name],
-            columns=[self.bus1.name, self.bus2.name]
-        )
-        return yprim_pu_matrix
-
+        """Returns the per-unit Y-primitive matrix (power-flow stamp) as a numerical Pandas DataFrame."""
+        return self.frame(self.stamps["pf"])
 
     def calc_yprim_sequence(self, sequence='positive'):
         """
-        Returns the 2×2 Yprim matrix for the specified sequence component.
-        - Positive and Negative: assumes standard transformer topology, no phase shift applied to Yprim.
-        - Zero-sequence: includes only if winding is WYE-connected, and depends on grounding impedance.
+        Returns the 2×2 Yprim matrix for the specified sequence component as a DataFrame.
+        - Positive and Negative: assumes standard transformer topology, no phase shift applied to Yprim;
+          an off-nominal tap scales the bus1 side.
+        - Zero-sequence: includes only if winding is WYE-connected, and depends on grounding impedance;
+          the off-nominal tap scales the bus1 side as well.
         """
-        Y = self.y_pu_sys
-        conn_primary = self.primary_connection_type
-        conn_secondary = self.secondary_connection_type
-
-        if sequence in ['positive', 'negative']:
-            # For pos/neg sequence, Yprim is symmetric with no internal phase shift
-            return pd.DataFrame([
-                [Y, -Y],
-                [-Y, Y]
-            ], index=[self.bus1.name, self.bus2.name],
-                columns=[self.bus1.name, self.bus2.name])
-
-        elif sequence == 'zero':
-            Z_series = 1 / Y if Y != 0 else complex('inf')
-
-            if conn_primary == "wye" and self.is_grounded_bus1:
-                Zn1 = (1 / self.Yn1) if self.Yn1 else complex('inf')
-                Y11 = 1 / (Z_series + Zn1)
-            else:
-                Y11 = 0
-
-            if conn_secondary == "wye" and self.is_grounded_bus2:
-                Zn2 = (1 / self.Yn2) if self.Yn2 else complex('inf')
-                Y22 = 1 / (Z_series + Zn2)
-            else:
-                Y22 = 0
-
-            if (conn_primary == "wye" and conn_secondary == "wye"
-                    and self.is_grounded_bus1 and self.is_grounded_bus2):
-                Ymutual = -1 / Z_series
-            else:
-                Ymutual = 0
-
-            return pd.DataFrame([
-                [Y11, Ymutual],
-                [Ymutual, Y22]
-            ], index=[self.bus1.name, self.bus2.name],
-                columns=[self.bus1.name, self.bus2.name])
-
-
-        else:
+        if sequence not in ('positive', 'negative', 'zero'):
             raise ValueError(f"Invalid sequence '{sequence}'. Must be 'positive', 'negative', or 'zero'.")
+        return self.frame(self.stamps[sequence])
 
     def adjust_sequence_voltage(self, V_seq, direction="primary_to_secondary"):
         """
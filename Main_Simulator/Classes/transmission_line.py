@@ -1,15 +1,126 @@
-import math
-import cmath
+from functools import lru_cache
+import numpy as np
+from Classes.CarsonEquations import (EARTH_RESISTIVITY, SEQUENCE_MATRIX, carson_constants,
+                                     line_configuration)
 from Classes.bus import Bus
 from Classes.bundle import Bundle
 from Classes.geometry import Geometry
-import pandas as pd
+from Classes.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
+
+def series_reactance(frequency, Deq, DSL, length):
+    """Series reactance (Ω) of a line of `length` miles. Works on scalars and NumPy arrays."""
+    return 2 * np.pi * frequency * 2e-7 * np.log(Deq / DSL) * 1609.34 * length
+
+
+def shunt_susceptance(frequency, Deq, DSC, length):
+    """Shunt susceptance (S) of a line of `length` miles. Works on scalars and NumPy arrays."""
+    return (2 * np.pi * frequency * (2 * np.pi * 8.854e-12)) / np.log(Deq / DSC) * 1609.34 * length
+
+
+class LineConstants:
+    """
+    Per-mile series resistance/reactance (Ω/mi) and shunt susceptance (S/mi) of a
+    conductor/bundle/geometry combination. Instances are shared and must not be modified.
+    """
+
+    __slots__ = ("r", "x", "b")
+
+    def __init__(self, r: float, x: float, b: float):
+        self.r = r
+        self.x = x
+        self.b = b
+
+    def scaled(self, length):
+        """Series resistance/reactance (Ω) and shunt susceptance (S) of `length` miles."""
+        return self.r * length, self.x * length, self.b * length
+
+    def __repr__(self):
+        return f"LineConstants(r={self.r:.6g} Ω/mi, x={self.x:.6g} Ω/mi, b={self.b:.6g} S/mi)"
+
+
+@lru_cache(maxsize=None)
+def _line_constants(resistance, num_conductors, DSL, DSC, Deq, frequency):
+    return LineConstants(resistance / num_conductors,
+                         float(series_reactance(frequency, Deq, DSL, 1.0)),
+                         float(shunt_susceptance(frequency, Deq, DSC, 1.0)))
+
+
+def line_constants(bundle, geometry, frequency):
+    """
+    Returns the shared per-mile constants of a bundle on a tower geometry. The lookup is keyed
+    by the values the formulas depend on, so equal conductors/bundles/geometries defined as
+    separate objects still resolve to the same instance and the logarithms are evaluated once.
+    """
+    return _line_constants(float(bundle.conductor.resistance), int(bundle.num_conductors),
+                           float(bundle.DSL), float(bundle.DSC), float(geometry.Deq), float(frequency))
+
+
+def phase_from_sequence(y0, y1, y2):
+    """3×3 phase-domain matrix A · diag(y0, y1, y2) · A⁻¹ of a sequence-decoupled element."""
+    return SEQUENCE_MATRIX @ np.diag([y0, y1, y2]).astype(complex) @ np.linalg.inv(SEQUENCE_MATRIX)
+
+
+# Line models: nominal π (lumped shunt split in halves) or exact equivalent π of the distributed line
+LINE_MODELS = ("nominal", "long")
+
+
+def equivalent_pi(z, y):
+    """
+    Exact equivalent π of distributed-parameter lines from their total series impedance z and
+    total shunt admittance y (matching shapes, e.g. lines × frequencies):
+
+        Z' = z · sinh(γl) / γl,    Y'/2 = y/2 · tanh(γl/2) / (γl/2),    γl = √(z·y)
+
+    Returns (Z', Y'). Short lines (|γl| → 0) use the series expansions of both factors, and
+    lines without shunt (y = 0) keep z.
+    """
+    z = np.asarray(z, dtype=complex)
+    y = np.asarray(y, dtype=complex)
+    gl = np.sqrt(z * y)
+    small = np.abs(gl) < 1e-4
+    safe = np.where(small, 1, gl)
+    series = np.where(small, 1 + gl ** 2 / 6, np.sinh(safe) / safe)
+    shunt = np.where(small, 1 - gl ** 2 / 12, np.tanh(safe / 2) / (safe / 2))
+    return z * series, y * shunt
+
+
+def equivalent_pi_matrix(z, y):
+    """
+    Matrix form of `equivalent_pi` for coupled phases: z, y are (..., n, n) total series
+    impedance and shunt admittance matrices. With the modes of z·y = T Λ T⁻¹ and γ = √Λ:
+
+        Z' = T sinh(γ)/γ T⁻¹ · z,    Y'/2 = z⁻¹ · T γ tanh(γ/2) T⁻¹
+    """
+    z = np.asarray(z, dtype=complex)
+    y = np.asarray(y, dtype=complex)
+    eigenvalues, modes = np.linalg.eig(z @ y)
+    gl = np.sqrt(eigenvalues)
+    safe = np.where(gl == 0, 1, gl)
+    series = np.where(gl == 0, 1, np.sinh(safe) / safe)
+    inverse = np.linalg.inv(modes)
+    z_pi = (modes * series[..., None, :]) @ inverse @ z
+    y_pi = 2 * np.linalg.solve(z, (modes * (gl * np.tanh(gl / 2))[..., None, :]) @ inverse)
+    return z_pi, y_pi
+
+
+def phase_constants(bundle, geometry, frequency, earth_resistivity=EARTH_RESISTIVITY):
+    """
+    Returns the shared per-mile phase-domain constants (CarsonConstants) of a bundle on a tower
+    geometry: Carson's equations over the individual subconductors and ground wires, reduced to
+    the three phases. Cached per configuration like line_constants.
+    """
+    return carson_constants([line_configuration(bundle, geometry, frequency, earth_resistivity)])[0]
+
 
 class TransmissionLine:
     """Represents a high-voltage transmission line between two buses."""
 
     def __init__(self, name: str, bus1, bus2, bundle, geometry, length: float, s_base: float,
-                 frequency:float, connection_type="transposed", zero_seq_model="enabled"):
+                 frequency:float, connection_type="transposed", zero_seq_model="enabled", line_model="nominal",
+                 rating_mva=None):
         """
         Initializes a TransmissionLine object.
 
@@ -22,11 +133,38 @@ class TransmissionLine:
         - length (float): Length of the transmission line in miles.
         - s_base (float): System base power in MVA.
         - frequency (float, optional): Operating frequency in Hz (default = 60 Hz).
+        - line_model (str): "nominal" π or "long" (exact equivalent π, see `equivalent_pi`).
+        - rating_mva (float, optional): Thermal rating in MVA (default: ampacity of the bundle).
         """
+        self.assign(name, bus1, bus2, bundle, geometry, length, s_base, frequency, connection_type, zero_seq_model,
+                    line_model, rating_mva)
 
+        # Calculate electrical parameters
+        self.set_parameters(self.calc_resistance(), self.calc_reactance(), self.calc_bshunt())
+
+    @classmethod
+    def from_parameters(cls, name: str, bus1, bus2, bundle, geometry, length: float, s_base: float,
+                        frequency: float, r_series: float, x_series: float, b_shunt: float,
+                        connection_type="transposed", zero_seq_model="enabled", line_model="nominal",
+                        rating_mva=None):
+        """
+        Builds a line from already computed series resistance/reactance (Ω) and shunt
+        susceptance (S), e.g. from the vectorized formulas used by the bulk loader.
+        """
+        line = cls.__new__(cls)
+        line.assign(name, bus1, bus2, bundle, geometry, length, s_base, frequency, connection_type, zero_seq_model,
+                    line_model, rating_mva)
+        line.set_parameters(r_series, x_series, b_shunt)
+        return line
+
+    def assign(self, name, bus1, bus2, bundle, geometry, length, s_base, frequency, connection_type, zero_seq_model,
+               line_model="nominal", rating_mva=None):
+        """Stores the line data and base values."""
         # Validation that bus voltages have the same value
         if bus1.base_kv != bus2.base_kv:
             raise ValueError("Buses must have the same voltage rating.")
+        if line_model not in LINE_MODELS:
+            raise ValueError(f"Unsupported line model: {line_model}. Must be 'nominal' or 'long'.")
 
         self.name = name
         self.bus1 = bus1
@@ -35,6 +173,10 @@ class TransmissionLine:
         self.geometry = geometry
         self.length = length
         self.frequency = frequency
+        self.connection_type = connection_type
+        self.zero_seq_model = zero_seq_model
+        self.line_model = line_model
+        self.rating_mva = rating_mva
 
         # Assign base values
         self.s_base = s_base
@@ -43,10 +185,16 @@ class TransmissionLine:
         # Calculate base values
         self.z_base_sys, self.y_base_sys = self.calc_base_values()
 
-        # Calculate electrical parameters
-        self.r_series = self.calc_resistance()
-        self.x_series = self.calc_reactance()
-        self.b_shunt = self.calc_bshunt()  # Shunt susceptance calculation
+        # Shared per-mile constants (None for lines defined by their impedances only)
+        self.constants = None
+        if bundle is not None and geometry is not None:
+            self.constants = line_constants(bundle, geometry, frequency)
+
+    def set_parameters(self, r_series, x_series, b_shunt):
+        """Derives the per-unit, Y-primitive and sequence quantities from R, X (Ω) and B (S)."""
+        self.r_series = r_series
+        self.x_series = x_series
+        self.b_shunt = b_shunt  # Shunt susceptance calculation
         self.z_series = complex(self.r_series, self.x_series)
         self.z_pu_sys = self.z_series / self.z_base_sys
         self.y_series = self.calc_yseries()  # Updated calculation for y_series
@@ -55,23 +203,32 @@ class TransmissionLine:
         self.y2_pu = self.y_pu_sys
         self.b_shunt_pu = self.b_shunt / self.y_base_sys if self.y_base_sys != 0 else complex(0, 0)
 
-        # Compute Y-primitive matrices
-        self.yprim = self.calc_yprim()
-        self.yprim_pu = self.calc_yprim_pu()
+        # Total shunt admittance of the π (p.u.); z_pu_sys and b_shunt_pu stay the line totals
+        self.y_shunt_pu = 1j * self.b_shunt_pu
+        if self.line_model == "long":
+            z_pi, y_pi = equivalent_pi(self.z_pu_sys, self.y_shunt_pu)
+            self.y_pu_sys = 1 / complex(z_pi) if z_pi != 0 else complex(0, 0)
+            self.y_series = self.y_pu_sys * self.y_base_sys
+            self.y_shunt_pu = complex(y_pi)
 
-        # Assign all sequence impedances
-        if connection_type == "transposed":
+        # Per-unit stamps of every sequence, recomputed on first use after a parameter change
+        self._stamps = None
+
+        # Assign all sequence impedances (the zero sequence has no charging, hence no long-line correction)
+        if self.connection_type == "transposed":
             self.z0_pu = self.z_pu_sys  # Balanced case
-        elif connection_type == "untransposed":
-            r0 = self.r_series
-            x0 = self.x_series
-            self.z0 = 2.5 * complex(r0, x0)
+        elif self.connection_type == "untransposed":
+            if self.constants is not None:
+                # Zero-sequence self impedance of the actual conductor arrangement (Carson's equations)
+                self.z0 = phase_constants(self.bundle, self.geometry, self.frequency).z0 * self.length
+            else:
+                self.z0 = 2.5 * complex(self.r_series, self.x_series)  # No geometry: typical z0/z1 ratio
             self.z0_pu = self.z0 / self.z_base_sys
 
         else:
-            raise ValueError(f"Unsupported connection type: {connection_type}")
+            raise ValueError(f"Unsupported connection type: {self.connection_type}")
 
-        self.y0_pu = 1 / self.z0_pu if zero_seq_model == "enabled" else 0
+        self.y0_pu = 1 / self.z0_pu if self.zero_seq_model == "enabled" else 0
         self.y1_pu = self.y_pu_sys
         self.y2_pu = self.y_pu_sys
 
@@ -82,73 +239,131 @@ class TransmissionLine:
         y_base = 1 / z_base if z_base != 0 else 0  # Base admittance in Siemens
         return z_base, y_base
 
+    def set_line_model(self, line_model):
+        """Switches between the nominal π and the exact long-line equivalent π ("nominal" / "long")."""
+        if line_model not in LINE_MODELS:
+            raise ValueError(f"Unsupported line model: {line_model}. Must be 'nominal' or 'long'.")
+        self.line_model = line_model
+        self.set_parameters(self.r_series, self.x_series, self.b_shunt)
+
+    def set_length(self, length: float):
+        """Changes the line length (miles) and rescales all derived quantities from the shared constants."""
+        if self.constants is None:
+            raise ValueError(f"Line '{self.name}' has no bundle/geometry; its length does not define its impedance.")
+        self.length = length
+        self.set_parameters(*self.constants.scaled(length))
+
     def calc_resistance(self):
         """Calculates the series resistance (Ω)."""
-        return (self.bundle.conductor.resistance / self.bundle.num_conductors) * self.length
+        return self.constants.r * self.length
 
     def calc_reactance(self):
         """Calculates the series reactance (Ω)."""
-        return (2 * math.pi * self.frequency * 2e-7 *
-                math.log(self.geometry.Deq / self.bundle.DSL) * 1609.34 * self.length)
+        return self.constants.x * self.length
 
     def calc_bshunt(self):
         """Calculates the shunt susceptance (B_shunt) in Siemens."""
-        return ((2 * math.pi * self.frequency * (2 * math.pi * 8.854e-12)) /
-                math.log(self.geometry.Deq / self.bundle.DSC) * 1609.34 * self.length)
+        return self.constants.b * self.length
 
     def calc_yseries(self):
         """Calculates the series admittance (Y_series)."""
         return 1 / self.z_series if self.z_series != 0 else complex(0, 0)
 
+    @property
+    def stamps(self):
+        """
+        Per-unit 2×2 admittance stamps [[y11, y12], [y21, y22]] (bus1, bus2 order) of the
+        power-flow network ("pf", with the line charging) and of each sequence network, as
+        read-only complex arrays. Computed once per set of parameters and cached.
+        """
+        if self._stamps is None:
+            self._stamps = self.calc_stamps()
+        return self._stamps
+
+    def calc_stamps(self):
+        """Computes the per-unit stamps of all sequences (see `stamps`)."""
+        Y = self.y_pu_sys
+        Y_shunt = self.y_shunt_pu / 2
+        stamps = {
+            "pf": np.array([[Y + Y_shunt, -Y],
+                            [-Y, Y + Y_shunt]], dtype=complex),
+            "positive": np.array([[self.y1_pu, -self.y1_pu],
+                                  [-self.y1_pu, self.y1_pu]], dtype=complex),
+            "negative": np.array([[self.y2_pu, -self.y2_pu],
+                                  [-self.y2_pu, self.y2_pu]], dtype=complex),
+            "zero": np.array([[self.y0_pu, -self.y0_pu],
+                              [-self.y0_pu, self.y0_pu]], dtype=complex),
+        }
+        for stamp in stamps.values():
+            stamp.flags.writeable = False
+        return stamps
+
+    def frame(self, matrix):
+        """Labelled DataFrame (copy) of a 2×2 matrix in bus1, bus2 order."""
+        names = [self.bus1.name, self.bus2.name]
+        return pd.DataFrame(np.array(matrix, dtype=complex), index=names, columns=names)
+
+    @property
+    def yprim(self):
+        return self.calc_yprim()
+
+    @property
+    def yprim_pu(self):
+        return self.calc_yprim_pu()
+
     def calc_yprim(self):
         """Calculates the Y-primitive matrix in Siemens and returns a numerical Pandas DataFrame."""
-        yprim_matrix = pd.DataFrame(
-            [[self.y_series + (1j * self.b_shunt / 2), -self.y_series],
-             [-self.y_series, self.y_series + (1j * self.b_shunt / 2)]],
-            index=[self.bus1.name, self.bus2.name],
-            columns=[self.bus1.name, self.bus2.name]
-        )
-        return yprim_matrix
+        y_shunt = self.y_shunt_pu * self.y_base_sys / 2
+        return self.frame([[self.y_series + y_shunt, -self.y_series],
+                           [-self.y_series, self.y_series + y_shunt]])
 
     def calc_yprim_pu(self):
-        """Calculates the Y-primitive matrix in per-unit and returns a numerical Pandas DataFrame."""
-        yprim_pu_matrix = pd.DataFrame(
-            [[self.y_pu_sys + (1j * self.b_shunt_pu / 2), -self.y_pu_sys],
-             [-self.y_pu_sys, self.y_pu_sys + (1j * self.b_shunt_pu / 2)]],
-            index=[self.bus1.name, self.bus2.name],
-            columns=[self.bus1.name, self.bus2.name]
-        )
-        return yprim_pu_matrix
-
-
+        """Returns the per-unit Y-primitive matrix (power-flow stamp) as a numerical Pandas DataFrame."""
+        return self.frame(self.stamps["pf"])
 
     def calc_yprim_sequence(self, sequence='positive'):
         """
-        Returns the sequence-dependent Y-primitive matrix (per unit).
+        Returns the sequence-dependent Y-primitive matrix (per unit) as a DataFrame.
         Supports: 'positive', 'negative', 'zero'
         """
-        if sequence == 'positive':
-            Y = self.y1_pu
-        elif sequence == 'negative':
-            Y = self.y2_pu
-        elif sequence == 'zero':
-            Y = self.y0_pu
-            if Y == 0:
-                return pd.DataFrame(
-                    [[0.0, 0.0],
-                     [0.0, 0.0]],
-                    index=[self.bus1.name, self.bus2.name],
-                    columns=[self.bus1.name, self.bus2.name]
-                )
-        else:
+        if sequence not in ('positive', 'negative', 'zero'):
             raise ValueError(f"Invalid sequence '{sequence}'. Must be 'positive', 'negative', or 'zero'.")
+        return self.frame(self.stamps[sequence])
 
-        # Return Yprim for all valid sequences
-        return pd.DataFrame([
-            [Y, -Y],
-            [-Y, Y]
-        ], index=[self.bus1.name, self.bus2.name],
-            columns=[self.bus1.name, self.bus2.name])
+    def phase_admittances(self, earth_resistivity=EARTH_RESISTIVITY):
+        """
+        Per-unit 3×3 series admittance and total shunt admittance matrices (phases a, b, c) for
+        the phase-domain power flow.
+
+        Lines with a bundle/geometry use the Carson's-equation constants of the actual phase
+        positions (untransposed) or their phase average (transposed); the shunt matrix comes from
+        the potential coefficients when the geometry gives conductor heights (y > 0), otherwise
+        from b_shunt on every phase. Lines defined by impedances only are built from their
+        sequence impedances. line_model="long" turns the matrices into the exact equivalent π
+        (`equivalent_pi_matrix`). zero_seq_model="disabled" removes the zero-sequence path.
+        """
+        if self.constants is not None:
+            constants = phase_constants(self.bundle, self.geometry, self.frequency, earth_resistivity)
+            z = constants.z * self.length / self.z_base_sys
+            if self.connection_type == "transposed":
+                z_self, z_mutual = np.trace(z) / 3, (z.sum() - np.trace(z)) / 6
+                z = np.full((3, 3), z_mutual) + np.eye(3) * (z_self - z_mutual)
+            if constants.y is not None:
+                shunt = constants.y * self.length / self.y_base_sys
+            else:
+                shunt = np.eye(3) * 1j * self.b_shunt_pu
+            if self.line_model == "long":
+                z, shunt = equivalent_pi_matrix(z, shunt)
+            series = np.linalg.inv(z)
+        else:
+            series = phase_from_sequence(self.y0_pu, self.y1_pu, self.y2_pu)
+            shunt = np.eye(3) * self.y_shunt_pu
+
+        if self.zero_seq_model != "enabled":
+            # Projection onto the positive/negative sequences, I - J/3
+            project = np.eye(3) - 1 / 3
+            series = project @ series @ project
+        return series, shunt
 
     def __repr__(self):
         """Returns a detailed string representation of the TransmissionLine object."""
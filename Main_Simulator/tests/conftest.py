@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# The simulator is run from Main_Simulator/Classes: modules import each other both as
+# `Classes.X` and by their bare names (e.g. `from MainSolver import Solver`)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, "Classes")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture
+def seven_bus():
+    """A fresh seven-bus case (Seven_Bus_System.build_circuit)."""
+    from Classes.Seven_Bus_System import build_circuit
+    return build_circuit()
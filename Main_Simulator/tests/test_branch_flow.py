@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from Classes.BranchFlow import BranchFlowKernel
+from Classes.Newton_Raphson import NewtonRaphson
+from Classes.PowerFlowSolver import PowerFlowSolver
+
+
+def solved_flows(circuit):
+    solver = NewtonRaphson(PowerFlowSolver(1, circuit))
+    solver.solve(tol=1e-10)
+    V = solver.results().complex_voltage
+    kernel = BranchFlowKernel.from_circuit(circuit)
+    return kernel, V, kernel.compute(V)
+
+
+def test_losses_balance_the_bus_injections(seven_bus):
+    kernel, V, flows = solved_flows(seven_bus)
+    # The power-flow Ybus holds only the branch stamps: the injections sum to the branch losses
+    injections = V * np.conj(kernel.network.ybus["pf"] @ V)
+    assert flows.total_losses == pytest.approx(complex(injections.sum()), abs=1e-12)
+    assert kernel.total_losses(V) == pytest.approx(flows.total_losses, abs=1e-12)
+    assert np.all(flows.losses.real > 0)
+
+
+def test_line_flow_matches_its_pi_model(seven_bus):
+    kernel, V, flows = solved_flows(seven_bus)
+    line = seven_bus.transmission_lines["L1"]
+    z_base = line.bus1.base_kv ** 2 / seven_bus.get_base_power()
+    y = z_base / complex(line.r_series, line.x_series)
+    half_b = 0.5j * line.b_shunt * z_base
+
+    V_f, V_t = (V[kernel.network.bus_names.tolist().index(bus.name)] for bus in (line.bus1, line.bus2))
+    k = flows.index("L1")
+    assert flows["s_from"][k] == pytest.approx(V_f * np.conj((y + half_b) * V_f - y * V_t), abs=1e-12)
+    assert flows["s_to"][k] == pytest.approx(V_t * np.conj(-y * V_f + (y + half_b) * V_t), abs=1e-12)
+    assert flows["from_bus"][k] == "Bus 2" and flows["to_bus"][k] == "Bus 4"
+
+
+def test_currents_and_loading_against_the_ampacity(seven_bus):
+    kernel, V, flows = solved_flows(seven_bus)
+    line = seven_bus.transmission_lines["L1"]
+    k = flows.index("L1")
+    V_f = V[kernel.network.bus_names.tolist().index("Bus 2")]
+    i_base = seven_bus.get_base_power() * 1e3 / (np.sqrt(3) * 230)
+    assert flows["i_from"][k] == pytest.approx(abs(np.conj(flows["s_from"][k] / V_f)) * i_base, rel=1e-12)
+
+    # Two Partridge subconductors of 460 A each
+    rated = line.bundle.num_conductors * line.bundle.conductor.ampacity
+    assert rated == 920
+    assert flows["loading"][k] == pytest.approx(100 * max(flows["i_from"][k], flows["i_to"][k]) / rated, rel=1e-12)
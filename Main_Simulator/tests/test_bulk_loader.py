@@ -0,0 +1,54 @@
+import numpy as np
+
+from Classes.BulkLoader import BulkNetworkLoader
+from Classes.CompiledNetwork import SEQUENCES
+from Classes.bundle import Bundle
+from Classes.conductor import Conductor
+from Classes.geometry import Geometry
+from Classes.system_setting import SystemSettings
+
+
+def loader():
+    """Four buses behind a tapped step-up unit: bundled and per-unit lines, with and without rating_mva."""
+    conductor = Conductor("Partridge", diam=0.642, GMR=0.0217, resistance=0.385, ampacity=460)
+    return BulkNetworkLoader(
+        SystemSettings(frequency=60, base_power=100),
+        buses={"name": ["A", "B", "C", "D"], "base_kv": [20, 230, 230, 230]},
+        lines={"name": ["B-C", "C-D", "B-D"], "bus1": ["B", "C", "B"], "bus2": ["C", "D", "D"],
+               "bundle": ["Double", None, "Double"], "geometry": ["Flat", None, "Flat"],
+               "length": [20, 1, 35], "r_pu": [np.nan, 0.01, np.nan], "x_pu": [np.nan, 0.08, np.nan],
+               "b_pu": [np.nan, 0.1, np.nan], "connection_type": ["untransposed", "transposed", "transposed"],
+               "line_model": ["nominal", "nominal", "long"], "rating_mva": [np.nan, 300, 500]},
+        transformers={"name": ["T1"], "bus1": ["A"], "bus2": ["B"], "power_rating": [125], "impedance_percent": [8.5],
+                      "x_over_r_ratio": [10], "primary_connection_type": ["delta"], "is_grounded_bus1": [False],
+                      "grounding_impedance_ohm_bus2": [1.0], "tap_ratio": [1.02], "rating_mva": [150]},
+        generators={"name": ["G1", "G2"], "bus": ["A", "D"], "per_unit": [1.0, 1.01], "real_power": [0, 80],
+                    "x1": [0.12, 0.2], "x2": [0.14, 0.2], "x0": [0.05, 0.08], "grounding_impedance_ohm": [0, 2]},
+        loads={"name": ["L1"], "bus": ["C"], "real_power": [150], "reactive_power": [60]},
+        bundles={"Double": Bundle("Double", 2, 1.5, conductor)},
+        geometries={"Flat": Geometry("Flat", 0, 0, 19.5, 0, 39, 0)})
+
+
+def test_compile_matches_the_circuit():
+    bulk = loader()
+    direct = bulk.compile()
+    circuit = bulk.to_circuit().compile()
+
+    assert direct.bus_names.tolist() == circuit.bus_names.tolist()
+    assert direct.branch_names.tolist() == circuit.branch_names.tolist()
+    assert np.array_equal(direct.bus_type, circuit.bus_type)
+    assert np.allclose(direct.p_spec, circuit.p_spec) and np.allclose(direct.q_spec, circuit.q_spec)
+    assert np.allclose(direct.v_set, circuit.v_set)
+    for sequence in SEQUENCES:
+        assert np.allclose(direct.branch_stamps[sequence], circuit.branch_stamps[sequence], rtol=1e-12, atol=0)
+        assert np.allclose(direct.gen_shunts[sequence], circuit.gen_shunts[sequence], rtol=1e-12, atol=0)
+        assert np.allclose(direct.ybus_dense(sequence), circuit.ybus_dense(sequence), rtol=1e-12, atol=1e-12)
+
+
+def test_ratings_follow_one_rule():
+    bulk = loader()
+    direct = bulk.compile()
+    # T1: rating_mva over the nameplate; B-C: the bundle ampacity (2 × 460 A at 230 kV); C-D, B-D: rating_mva
+    expected = [150, np.sqrt(3) * 230 * 920 / 1e3, 300, 500]
+    assert np.allclose(direct.branch_rating, expected)
+    assert np.allclose(bulk.to_circuit().compile().branch_rating, expected)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from Classes import CarsonEquations
+from Classes.CarsonEquations import carson_constants, line_configuration
+from Classes.bundle import Bundle
+from Classes.conductor import Conductor
+from Classes.geometry import Geometry
+from Classes.transmission_line import line_constants
+
+
+def kersting_configuration():
+    """
+    Kersting, Distribution System Modeling and Analysis, Example 4.1: 336,400 26/7 ACSR phases
+    and a 4/0 6/1 ACSR neutral. The neutral at y = 0 (height unknown) selects the modified
+    Carson's equations used in the example.
+    """
+    phase = Conductor("336,400 26/7 ACSR", diam=0.721, GMR=0.0244, resistance=0.306, ampacity=530)
+    neutral = Conductor("4/0 6/1 ACSR", diam=0.563, GMR=0.00814, resistance=0.5920, ampacity=340)
+    geometry = Geometry("Example 4.1", 0, 4, 2.5, 4, 7, 4, ground_wires=[(4, 0)], ground_conductor=neutral)
+    return Bundle("Single", 1, 0, phase), geometry
+
+
+def test_kersting_example_4_1():
+    constants, = carson_constants([line_configuration(*kersting_configuration(), 60)])
+    z_abc = np.array([[0.4576 + 1.0780j, 0.1560 + 0.5017j, 0.1535 + 0.3849j],
+                      [0.1560 + 0.5017j, 0.4666 + 1.0482j, 0.1580 + 0.4236j],
+                      [0.1535 + 0.3849j, 0.1580 + 0.4236j, 0.4615 + 1.0651j]])
+    assert np.allclose(constants.z, z_abc, atol=2e-4)
+    assert constants.z0 == pytest.approx(0.7735 + 1.9373j, abs=2e-4)
+    assert constants.z1 == pytest.approx(0.3061 + 0.6270j, abs=2e-4)
+    assert constants.y is None
+
+
+def test_positive_sequence_matches_the_gmd_formula(seven_bus):
+    # Without ground wires the positive sequence of the modified equations is
+    # r/n + j2ωG·ln(Deq/GMR_bundle): the classical line constants, up to the bundle reduction
+    line = seven_bus.transmission_lines["L1"]
+    constants, = carson_constants([line_configuration(line.bundle, line.geometry, 60)])
+    classical = line_constants(line.bundle, line.geometry, 60)
+    assert constants.z1 == pytest.approx(complex(classical.r, classical.x), rel=1e-3)
+    assert constants.z1 == pytest.approx(constants.z2)
+    # The flat untransposed arrangement couples the sequences
+    assert abs(constants.z012[1, 2]) > 0.01
+
+
+def test_configurations_are_keyed_by_value():
+    bundle, geometry = kersting_configuration()
+    same_bundle, same_geometry = kersting_configuration()
+    first, second = carson_constants([line_configuration(bundle, geometry, 60),
+                                      line_configuration(same_bundle, same_geometry, 60)])
+    assert first is second
+    assert not first.z.flags.writeable
+
+
+def test_batch_matches_single_evaluation():
+    conductor = Conductor("Partridge", diam=0.642, GMR=0.0217, resistance=0.385, ampacity=460)
+    bundle = Bundle("Double", 2, 1.5, conductor)
+    # Tower types of one shape, with (heights) and without known conductor heights
+    keys = [line_configuration(bundle, Geometry("H", 0, 50, 20, 50 + rise, 40, 50), 60) for rise in (0, 5, 10)]
+    keys.append(line_configuration(bundle, Geometry("Flat", 0, 0, 19.5, 0, 39, 0), 60))
+    batch = CarsonEquations._evaluate(keys, 2, 0)
+    for key, constants in zip(keys, batch):
+        single, = CarsonEquations._evaluate([key], 2, 0)
+        assert np.allclose(constants.z, single.z, rtol=1e-12)
+        assert (constants.y is None) == (single.y is None)
+        if single.y is not None:
+            assert np.allclose(constants.y, single.y, rtol=1e-12)
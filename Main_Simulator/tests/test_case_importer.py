@@ -0,0 +1,163 @@
+import numpy as np
+import pytest
+
+from Classes.CaseImporter import read_matpower, read_psse_raw
+from Classes.OptimalPowerFlow import dc_opf
+
+# Three buses; bus 2 has two units with different linear costs
+MULTI_UNIT_CASE = """function mpc = multi_unit
+mpc.baseMVA = 100;
+mpc.bus = [
+	1	3	0	0	0	0	1	1	0	230	1	1.1	0.9;
+	2	2	0	0	0	0	1	1	0	230	1	1.1	0.9;
+	3	1	120	40	0	0	1	1	0	230	1	1.1	0.9;
+];
+mpc.gen = [
+	1	0	0	300	-300	1.02	100	1	200	0	0	0	0	0	0	0	0	0	0	0	0;
+	2	40	0	300	-300	1.01	100	1	50	0	0	0	0	0	0	0	0	0	0	0	0;
+	2	60	0	300	-300	1.01	100	1	100	0	0	0	0	0	0	0	0	0	0	0	0;
+];
+mpc.branch = [
+	1	3	0.01	0.1	0.02	500	500	500	0	0	1	-360	360;
+	2	3	0.01	0.1	0.02	500	500	500	0	0	1	-360	360;
+	1	2	0.01	0.1	0.02	500	500	500	0	0	1	-360	360;
+];
+mpc.gencost = [
+	2	0	0	2	30	0;
+	2	0	0	2	10	0;
+	2	0	0	2	20	0;
+];
+"""
+
+
+# Two buses joined by a transformer with an off-nominal tap
+TAPPED_CASE = """function mpc = tapped
+mpc.baseMVA = 100;
+mpc.bus = [
+	1	3	0	0	0	0	1	1	0	230	1	1.1	0.9;
+	2	1	50	10	0	0	1	1	0	115	1	1.1	0.9;
+];
+mpc.gen = [
+	1	0	0	300	-300	1.0	100	1	200	0	0	0	0	0	0	0	0	0	0	0	0;
+];
+mpc.branch = [
+	1	2	0.005	0.08	0	200	200	200	1.05	0	1	-360	360;
+];
+"""
+
+
+# One line and a tapped transformer, in both formats
+THREE_BUS_RAW = """0,   100.00, 33, 0, 1, 60.00     / PSS(R)E-33    three-bus test
+three-bus test
+
+     1,'BUS1        ', 230.0000,3,   1,   1,   1,1.02000,   0.0000,1.10000,0.90000,1.10000,0.90000
+     2,'BUS2        ', 230.0000,2,   1,   1,   1,1.01000,   0.0000,1.10000,0.90000,1.10000,0.90000
+     3,'BUS3        ', 115.0000,1,   1,   1,   1,1.00000,   0.0000,1.10000,0.90000,1.10000,0.90000
+0 / END OF BUS DATA, BEGIN LOAD DATA
+     3,'1 ',1,   1,   1,    90.000,    30.000,     0.000,     0.000,     0.000,     0.000,   1,1,0
+0 / END OF LOAD DATA, BEGIN FIXED SHUNT DATA
+0 / END OF FIXED SHUNT DATA, BEGIN GENERATOR DATA
+     1,'1 ',     0.000,     0.000,   300.000,  -300.000,1.02000,     0,   100.000, 0.00000E+0, 1.00000E+0, 0.00000E+0, 0.00000E+0,1.00000,1,  100.0,   250.000,    0.000,   1,1.0000
+     2,'1 ',    60.000,     0.000,   300.000,  -300.000,1.01000,     0,   100.000, 0.00000E+0, 1.00000E+0, 0.00000E+0, 0.00000E+0,1.00000,1,  100.0,   150.000,    0.000,   1,1.0000
+0 / END OF GENERATOR DATA, BEGIN BRANCH DATA
+     1,     2,'1 ', 1.00000E-2, 1.00000E-1,   0.02000,   250.00,   250.00,   250.00,  0.00000,  0.00000,  0.00000,  0.00000,1,1,   0.00,   1,1.0000
+0 / END OF BRANCH DATA, BEGIN TRANSFORMER DATA
+     2,     3,     0,'1 ',1,1,1, 0.00000E+0, 0.00000E+0,2,'            ',1,   1,1.0000
+ 5.00000E-3, 8.00000E-2,   100.00
+1.05000,   0.000,   0.000,   200.00,   200.00,   200.00, 0,      0, 1.10000, 0.90000, 1.10000, 0.90000,  33, 0, 0.00000, 0.00000,  0.000
+1.00000,   0.000
+0 / END OF TRANSFORMER DATA, BEGIN AREA DATA
+0 / END OF AREA DATA
+Q
+"""
+
+THREE_BUS_CASE = """function mpc = three_bus
+mpc.baseMVA = 100;
+mpc.bus = [
+	1	3	0	0	0	0	1	1.02	0	230	1	1.1	0.9;
+	2	2	0	0	0	0	1	1.01	0	230	1	1.1	0.9;
+	3	1	90	30	0	0	1	1	0	115	1	1.1	0.9;
+];
+mpc.gen = [
+	1	0	0	300	-300	1.02	100	1	250	0	0	0	0	0	0	0	0	0	0	0	0;
+	2	60	0	300	-300	1.01	100	1	150	0	0	0	0	0	0	0	0	0	0	0	0;
+];
+mpc.branch = [
+	1	2	0.01	0.1	0.02	250	250	250	0	0	1	-360	360;
+	2	3	0.005	0.08	0	200	200	200	1.05	0	1	-360	360;
+];
+"""
+
+
+@pytest.fixture
+def multi_unit_case(tmp_path):
+    path = tmp_path / "multi_unit.m"
+    path.write_text(MULTI_UNIT_CASE)
+    return read_matpower(path)
+
+
+def test_units_with_costs_are_kept_separate(multi_unit_case):
+    gens = multi_unit_case.generators.set_index("name")
+    assert gens.index.tolist() == ["G1", "G2", "G2-2"]
+    assert gens.loc["G2", "p_max"] == 50 and gens.loc["G2-2", "p_max"] == 100
+    assert gens.loc["G2-2", "cost_c1"] == 20
+
+    # Both units add to the injection of bus 2, in the circuit and the compiled network
+    circuit = multi_unit_case.to_circuit()
+    assert circuit.real_power_vector()["2"] == 100
+    network = multi_unit_case.compile()
+    assert network.p_spec[network.bus_index()["2"]] == 100
+
+
+def test_lmp_at_a_multi_unit_bus(multi_unit_case):
+    result = dc_opf(multi_unit_case.to_circuit())
+    dispatch = result.dispatch()
+    # Merit order: the 10 $/MWh unit at its limit, the 20 $/MWh unit marginal, G1 idle
+    assert dispatch["G2"] == pytest.approx(50)
+    assert dispatch["G2-2"] == pytest.approx(70)
+    assert dispatch["G1"] == pytest.approx(0, abs=1e-6)
+    assert np.allclose(result.lmp, 20)
+    assert result.objective == pytest.approx(50 * 10 + 70 * 20)
+
+
+def test_units_without_costs_are_merged(tmp_path):
+    path = tmp_path / "no_cost.m"
+    path.write_text(MULTI_UNIT_CASE.split("mpc.gencost")[0])
+    gens = read_matpower(path).generators.set_index("name")
+    assert gens.index.tolist() == ["G1", "G2"]
+    assert gens.loc["G2", "real_power"] == 100 and gens.loc["G2", "p_max"] == 150
+
+
+def test_tap_applies_to_every_sequence(tmp_path):
+    path = tmp_path / "tapped.m"
+    path.write_text(TAPPED_CASE)
+    loader = read_matpower(path)
+    assert loader.transformers["tap_ratio"].tolist() == [1.05]
+
+    compiled = loader.compile()
+    from_objects = loader.to_circuit().compile()
+    for sequence in ("pf", "positive", "negative", "zero"):
+        assert np.allclose(compiled.branch_stamps[sequence], from_objects.branch_stamps[sequence])
+    # Grounded wye-wye without neutral impedances: only the mutual zero-sequence term, which
+    # carries the tap like the positive sequence
+    stamps = compiled.branch_stamps
+    assert stamps["zero"][0, 0, 1] == pytest.approx(stamps["positive"][0, 0, 1])
+    assert stamps["positive"][0, 0, 0] == pytest.approx(-stamps["positive"][0, 0, 1] / 1.05)
+
+
+def test_psse_raw_matches_matpower(tmp_path):
+    raw, case = tmp_path / "three_bus.raw", tmp_path / "three_bus.m"
+    raw.write_text(THREE_BUS_RAW)
+    case.write_text(THREE_BUS_CASE)
+    from_raw, from_case = read_psse_raw(raw).compile(), read_matpower(case).compile()
+
+    assert from_raw.bus_names.tolist() == from_case.bus_names.tolist()
+    assert from_raw.branch_names.tolist() == from_case.branch_names.tolist() == ["2-3-1", "1-2-1"]
+    for sequence in ("pf", "positive", "zero"):
+        assert np.allclose(from_raw.ybus_dense(sequence), from_case.ybus_dense(sequence))
+    assert np.array_equal(from_raw.bus_type, from_case.bus_type)
+    assert np.allclose(from_raw.p_spec, [0, 60, -90]) and np.allclose(from_case.p_spec, [0, 60, -90])
+    assert np.allclose(from_raw.q_spec, from_case.q_spec)
+    assert np.allclose(from_raw.v_set, from_case.v_set)
+    # RATEA (RAW) and rateA (MATPOWER) of the line
+    assert from_raw.branch_rating[1] == from_case.branch_rating[1] == 250
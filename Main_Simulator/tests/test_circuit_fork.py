@@ -0,0 +1,46 @@
+import numpy as np
+
+
+def test_fork_changes_do_not_reach_the_root(seven_bus):
+    root_p = seven_bus.real_power_vector()
+    fork = seven_bus.fork()
+    fork.set_load("Load 3", real_power=150)
+    fork.outage("L1")
+
+    assert fork.real_power_vector()["Bus 3"] == -150
+    assert seven_bus.real_power_vector() == root_p
+    assert "L1" not in fork.transmission_lines
+    assert "L1" in seven_bus.transmission_lines
+
+
+def test_parent_change_after_fork_keeps_child_offsets(seven_bus):
+    f1 = seven_bus.fork()
+    f1.set_load("Load 3", 120)
+    f2 = f1.fork()
+    f1.set_load("Load 3", 200)
+
+    assert f2.real_power_vector()["Bus 3"] == -120
+    assert f1.real_power_vector()["Bus 3"] == -200
+    assert np.isclose(f2.compile().p_spec[seven_bus.bus_index()["Bus 3"]], -120)
+
+
+def test_parent_change_after_fork_keeps_child_outages(seven_bus):
+    f1 = seven_bus.fork()
+    f1.outage("L1")
+    f3 = f1.fork()
+    f1.restore("L1")
+
+    assert "L1" not in f3.transmission_lines
+    assert "L1" in f1.transmission_lines
+
+
+def test_child_change_keeps_parent(seven_bus):
+    f1 = seven_bus.fork()
+    f1.set_load("Load 3", 120)
+    f1.outage("L1")
+    f2 = f1.fork()
+    f2.set_load("Load 3", 200)
+    f2.restore("L1")
+
+    assert f1.real_power_vector()["Bus 3"] == -120
+    assert "L1" not in f1.transmission_lines
@@ -0,0 +1,57 @@
+import numpy as np
+
+from Classes.CompiledNetwork import CompiledNetwork, NetworkCache, circuit_fingerprint
+from Classes.SequenceNetworks import SEQUENCE_ORDER
+
+
+def test_ybus_matches_the_circuit(seven_bus):
+    network = seven_bus.compile()
+    # Same stamps; the CSR conversion may sum the duplicate entries in another order
+    assert np.allclose(network.ybus_dense("pf"), np.asarray(seven_bus.calc_ybus(), dtype=complex), rtol=0, atol=1e-12)
+    for sequence in SEQUENCE_ORDER:
+        expected = np.asarray(getattr(seven_bus, f"calc_ybus_{sequence}")(), dtype=complex)
+        assert np.allclose(network.ybus_dense(sequence), expected, rtol=0, atol=1e-12)
+
+
+def test_save_and_memory_mapped_load(seven_bus, tmp_path):
+    network = seven_bus.compile()
+    network.save(tmp_path)
+    loaded = CompiledNetwork.load(tmp_path)
+    # Memory-mapped read-only; mmap=False reads private copies
+    assert not loaded.p_spec.flags.writeable and not loaded.branch_stamps["pf"].flags.writeable
+    assert CompiledNetwork.load(tmp_path, mmap=False).p_spec.flags.writeable
+    assert loaded.bus_names.tolist() == network.bus_names.tolist()
+    assert np.array_equal(loaded.p_spec, network.p_spec)
+    assert np.array_equal(loaded.branch_rating, network.branch_rating, equal_nan=True)
+    for sequence in ("pf", *SEQUENCE_ORDER):
+        assert np.array_equal(loaded.branch_stamps[sequence], network.branch_stamps[sequence])
+        assert np.array_equal(loaded.ybus_dense(sequence), network.ybus_dense(sequence))
+
+
+def test_cache_builds_once_per_key(seven_bus, tmp_path):
+    cache = NetworkCache(tmp_path)
+    key = circuit_fingerprint(seven_bus)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return seven_bus
+
+    first = cache.get_or_compile(key, build)
+    second = cache.get_or_compile(key, build)
+    assert len(builds) == 1 and key in cache
+    assert np.array_equal(first.ybus_dense(), second.ybus_dense())
+    assert np.array_equal(second.ybus_dense(), seven_bus.compile().ybus_dense())
+
+
+def test_fingerprint_follows_the_parameters(seven_bus):
+    key = circuit_fingerprint(seven_bus)
+    assert circuit_fingerprint(seven_bus) == key
+
+    seven_bus.transmission_lines["L2"].set_line_model("long")
+    long_key = circuit_fingerprint(seven_bus)
+    assert long_key != key
+
+    seven_bus.transmission_lines["L2"].set_line_model("nominal")
+    seven_bus.transmission_lines["L3"].connection_type = "transposed"
+    assert circuit_fingerprint(seven_bus) not in (key, long_key)
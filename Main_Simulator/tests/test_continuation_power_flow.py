@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from Classes.ContinuationPowerFlow import ContinuationPowerFlow, continuation_power_flow
+
+
+@pytest.fixture
+def network(seven_bus):
+    return seven_bus.compile()
+
+
+def test_nose_of_the_seven_bus_case(network):
+    curve = continuation_power_flow(network)
+    assert curve.nose_reached and curve.status == "nose"
+    # λmax of a fine fixed-step trace (step 0.0005)
+    assert curve.max_lambda == pytest.approx(1.522099, abs=1e-4)
+    assert curve.lam[curve.nose_index] == curve.max_lambda
+
+
+def test_augmented_solve_under_the_stored_ordering(network):
+    cpf = ContinuationPowerFlow(network)
+    V = cpf.solve_base()
+    z = np.random.default_rng(0).normal(size=cpf.n_a + len(cpf.pq) + 1)
+    rhs = np.random.default_rng(1).normal(size=len(z))
+    J = cpf.jacobian(V).toarray()
+    dense = np.block([[J, cpf.F_lam[:, None]], [z[None, :-1], z[-1:, None]]])
+    assert np.allclose(cpf.augmented(V, z)(rhs), np.linalg.solve(dense, rhs))
+    assert cpf.augmented_ordering(cpf.jacobian(V)) is cpf._ordering
+
+
+def test_partial_curve_when_the_nose_is_not_reached(network):
+    curve = continuation_power_flow(network, max_steps=3)
+    assert not curve.nose_reached and curve.status == "max_steps"
+    assert len(curve.lam) == 4 and np.all(np.diff(curve.lam) > 0)
+
+    curve = continuation_power_flow(network, step=0.5, min_step=0.2, max_corrector=1)
+    assert not curve.nose_reached and curve.status == "step_failed"
+    assert curve.lam[0] == 0
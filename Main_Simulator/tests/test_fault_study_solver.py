@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from Classes.FaultStudySolver import FaultStudySolver
+
+# Bolted faults at Bus 5 of the seven-bus case: fault current (pu, degrees)
+FAULT_CURRENT = {
+    "3ph": (12.757147, -86.1822),
+    "slg": (9.829298, -83.5939),
+    "ll": (10.596260, -176.3393),
+    "dlg": (11.834988, 162.6588),
+}
+
+
+def _phasors(voltages):
+    mag, ang = np.array(list(voltages.values())).T
+    return mag * np.exp(1j * np.radians(ang))
+
+
+def test_result_views_can_be_assigned(seven_bus):
+    solver = FaultStudySolver(seven_bus, "Bus 5", "slg", verbose=False).solve()
+    voltages, seq_voltages, phase_voltages = solver.voltages, solver.seq_voltages, solver.phase_voltages
+
+    # Writing a view back leaves the results unchanged
+    V012, Vabc = solver.V012.copy(), solver.Vabc.copy()
+    solver.seq_voltages = seq_voltages
+    solver.phase_voltages = phase_voltages
+    solver.voltages = voltages
+    assert np.allclose(solver.V012, V012) and np.allclose(solver.Vabc, Vabc)
+    assert np.allclose(_phasors(solver.voltages), _phasors(voltages))
+
+    scaled = {bus: (2 * mag, ang) for bus, (mag, ang) in voltages.items()}
+    solver.voltages = scaled
+    assert solver.voltages["Bus 3"] == pytest.approx(scaled["Bus 3"])
+
+
+def test_assigned_views_before_solving(seven_bus):
+    solver = FaultStudySolver(seven_bus, "Bus 5", "slg", verbose=False)
+    solver.seq_voltages = {"Bus 1": (0, 1, 0), "Bus 2": (0.1, 0.9, -0.1)}
+    assert solver.bus_order == ["Bus 1", "Bus 2"]
+    assert solver.seq_voltages["Bus 2"] == (0.1, 0.9, -0.1)
+    with pytest.raises(ValueError):
+        solver.seq_voltages = {"Bus 1": (0, 1, 0)}
+
+
+@pytest.mark.parametrize("fault_type", sorted(FAULT_CURRENT))
+def test_fault_current(seven_bus, fault_type):
+    solver = FaultStudySolver(seven_bus, "Bus 5", fault_type, verbose=False).solve()
+    magnitude, angle = FAULT_CURRENT[fault_type]
+    assert solver.fault_current[0] == pytest.approx(magnitude, abs=1e-5)
+    assert solver.fault_current[1] == pytest.approx(angle, abs=1e-3)
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from Classes.FaultStudySolver import FaultStudySolver, FaultSweep
+
+
+@pytest.mark.parametrize("bus", ["Bus 2", "Bus 3", "Bus 5"])
+def test_delta_side_currents_of_ground_fault(seven_bus, bus):
+    # T1 is delta (Bus 1) - grounded wye (Bus 2): a ground fault on the 230 kV side draws
+    # current in two phases on the delta side and none in the third
+    result = FaultSweep(seven_bus, "slg").solve([bus], branches=True)
+    k = result.branch_names.tolist().index("T1")
+    Ia, Ib, Ic = np.abs(result.Iabc_from[0, :, k])
+    assert Ib < 0.02 * Ia
+    assert Ia == pytest.approx(Ic, rel=1e-2)
+    assert abs(result.Iabc_from[0, :, k].sum()) < 1e-9
+
+
+def test_phase_shift_across_transformer(seven_bus):
+    result = FaultSweep(seven_bus, "3ph").solve(["Bus 3"], branches=True)
+    k = result.branch_names.tolist().index("T1")
+    I_from, I_to = result.Iabc_from[0, 0, k], result.Iabc_to[0, 0, k]
+    assert abs(I_from) == pytest.approx(abs(I_to))
+    assert np.degrees(np.angle(-I_to / I_from)) == pytest.approx(seven_bus.transformers["T1"].phase_shift_deg)
+
+
+def test_shifts_keep_fault_conditions_and_magnitudes(seven_bus):
+    sweep = FaultSweep(seven_bus, "dlg")
+    result = sweep.solve(branches=True)
+    faults = np.arange(len(result))
+    # Phases b and c are grounded at every faulted bus
+    assert np.allclose(result.Vabc[faults, 1:, faults], 0, atol=1e-12)
+
+    # Back in the frame of the sequence networks the currents differ only in angle
+    _, _, _, I_from, I_to = sweep.branch_currents(result.V012 / sweep.sequence_shifts(faults))
+    assert np.allclose(np.abs(result.I012_from), np.abs(I_from))
+    assert np.allclose(np.abs(result.I012_to), np.abs(I_to))
+
+
+@pytest.mark.parametrize("fault_type", ["3ph", "slg", "ll", "dlg"])
+def test_sweep_matches_single_fault(seven_bus, fault_type):
+    result = FaultSweep(seven_bus, fault_type, fault_impedance=0.01).solve()
+    for bus in result.names.tolist():
+        solver = FaultStudySolver(seven_bus, bus, fault_type, fault_impedance=0.01, verbose=False).solve()
+        k = result.index(bus)
+        if fault_type == "3ph":
+            assert abs(result.I012[1, k]) == pytest.approx(solver.fault_current[0])
+        else:
+            assert np.allclose(result.I012[:, k], solver.seq_fault_current)
+        assert result.fault(bus).meta["fault_current"][0] == pytest.approx(solver.fault_current[0])
+        # Both apply the phase shifts of bus_phase_shifts relative to the faulted bus; the
+        # single-fault solver also overwrites one sequence voltage at the faulted bus (SLG, LL)
+        other = np.arange(len(result.bus_names)) != solver.bus_order.index(bus)
+        assert np.allclose(result.V012[k][:, other], solver.V012[:, other])
+
+
+@pytest.mark.parametrize("fault_type", ["slg", "dlg"])
+def test_sweep_phase_voltages_match_single_fault(seven_bus, fault_type):
+    result = FaultSweep(seven_bus, fault_type).solve()
+    for bus in result.names.tolist():
+        solver = FaultStudySolver(seven_bus, bus, fault_type, verbose=False).solve()
+        assert solver.bus_order == result.bus_names.tolist()
+        assert np.allclose(result.Vabc[result.index(bus)], solver.Vabc, atol=1e-12)
+
+
+def test_dlg_fault_conditions(seven_bus):
+    solver = FaultStudySolver(seven_bus, "Bus 5", "dlg", verbose=False).solve()
+    n = solver.bus_order.index("Bus 5")
+    assert np.allclose(solver.Vabc[1:, n], 0, atol=1e-12)
+    assert abs(sum(solver.seq_fault_current)) < 1e-12
+
+
+def test_branch_table_of_the_whole_sweep(seven_bus):
+    result = FaultSweep(seven_bus, "slg").solve(branches=True)
+    table = result.branch_currents()
+    m = len(result.branch_names)
+    assert len(table) == len(result) * m
+    for k, bus in enumerate(result.names.tolist()):
+        rows = slice(k * m, (k + 1) * m)
+        single = result.branch_currents(bus)
+        assert (table["faulted_bus"][rows] == bus).all()
+        assert (single["faulted_bus"] == bus).all()
+        assert np.array_equal(table["ia_from"][rows], single["ia_from"])
+        assert np.array_equal(table.names[rows], single.names)
+
+
+def test_writer_keeps_the_faulted_bus_of_every_row(seven_bus, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from Classes.Results import ResultWriter
+
+    result = FaultSweep(seven_bus, "3ph").solve(["Bus 3", "Bus 5"], branches=True)
+    with ResultWriter(tmp_path / "branches.parquet") as writer:
+        for bus in result.names.tolist():
+            writer.write(result.branch_currents(bus))
+    faulted = pq.read_table(tmp_path / "branches.parquet").column("faulted_bus").to_pylist()
+    m = len(result.branch_names)
+    assert faulted == ["Bus 3"] * m + ["Bus 5"] * m
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from Classes.Circuit import Circuit
+from Classes.FrequencyScan import FrequencyScan
+from Classes.SequenceNetworks import SEQUENCE_ORDER, SequenceNetworks
+from Classes.bus import Bus
+from Classes.system_setting import SystemSettings
+from Classes.transformer import Transformer
+
+
+@pytest.mark.parametrize("sequence", SEQUENCE_ORDER)
+def test_nominal_frequency_matches_the_sequence_networks(seven_bus, sequence):
+    scan = FrequencyScan(seven_bus, sequence, charging=False)
+    expected = SequenceNetworks.from_circuit(seven_bus).dense(sequence)
+    assert np.allclose(scan.ybus(60).toarray(), expected, rtol=0, atol=1e-12)
+    # The driving-point and transfer impedances are the entries of Zbus = Ybus⁻¹
+    assert np.allclose(scan.scan(60).Z[0], np.linalg.inv(expected), rtol=1e-10)
+
+
+def test_zero_sequence_follows_the_tap(seven_bus):
+    # A tapped grounded wye-wye unit in parallel with T2 carries the zero sequence through
+    seven_bus.add_transformer(Transformer("T3", seven_bus.buses["Bus 7"], seven_bus.buses["Bus 6"], 200, 10.5, 12, 100,
+                                          grounding_impedance_ohm_bus1=0.5, grounding_impedance_ohm_bus2=1.0,
+                                          tap_ratio=1.05))
+    scan = FrequencyScan(seven_bus, "zero", charging=False).ybus(60).toarray()
+    assert np.allclose(scan, SequenceNetworks.from_circuit(seven_bus).dense("zero"), rtol=0, atol=1e-12)
+
+
+def test_dense_and_sparse_solutions_agree(seven_bus):
+    scan = FrequencyScan(seven_bus, loads=True)
+    frequencies = np.linspace(30, 1500, 50)
+    buses = ["Bus 2", "Bus 5", "Bus 6"]
+    dense = scan.scan(frequencies, buses)
+    sparse = scan.scan(frequencies, buses, dense_limit=0)
+    assert np.allclose(dense.Z, sparse.Z, rtol=1e-10, atol=1e-14)
+    assert np.allclose(dense.transfer("Bus 2", "Bus 6"), dense.transfer("Bus 6", "Bus 2"))
+
+
+def test_parallel_lc_resonance():
+    # A generator reactance x1 = 0.12 pu in parallel with a 100 Mvar capacitor (b = 1 pu):
+    # |Z| peaks at h = 1/√(x1·b)
+    circuit = Circuit("LC", SystemSettings(frequency=60, base_power=100))
+    circuit.add_bus(Bus("Bus 1", 20))
+    circuit.add_generator("G1", "Bus 1", per_unit=1.0, real_power=0, x1=0.12, x2=0.14, x0=0.05)
+    circuit.add_load("C1", "Bus 1", 0, -100)
+    result = FrequencyScan(circuit, loads=True).scan(np.arange(60, 600, 0.5))
+    resonance, = result.resonances("Bus 1")
+    assert resonance == pytest.approx(60 / np.sqrt(0.12), abs=0.25)
+    assert result.resonances("Bus 1", kind="series").size == 0
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from Classes import Kernels
+
+
+@pytest.fixture
+def state(seven_bus):
+    """CSR power-flow Ybus of the seven-bus case and a non-flat voltage state."""
+    ybus = Kernels.ybus_csr(seven_bus.calc_ybus())
+    rng = np.random.default_rng(0)
+    n = ybus.shape[0]
+    return ybus, rng.uniform(0.9, 1.1, n), rng.uniform(-0.2, 0.2, n)
+
+
+def _loop_kernels(backend):
+    """The loop kernels run as plain Python, or compiled with Numba."""
+    loops = (Kernels._injections_loop, Kernels._jacobian_loop, Kernels._sequence_voltages_loop)
+    if backend == "python":
+        return loops
+    numba = pytest.importorskip("numba")
+    return tuple(numba.njit(kernel) for kernel in loops)
+
+
+@pytest.mark.parametrize("backend", ["python", "numba"])
+def test_loop_kernels_match_numpy(state, backend):
+    injections, jacobian, sequence_voltages = _loop_kernels(backend)
+    ybus, Vm, Va = state
+    args = (ybus.indptr, ybus.indices, ybus.data, Vm, Va)
+
+    for loop, vectorized in zip(injections(*args), Kernels._injections_numpy(*args)):
+        assert np.allclose(loop, vectorized, rtol=0, atol=1e-12)
+    for loop, vectorized in zip(jacobian(*args), Kernels._jacobian_numpy(*args)):
+        assert np.allclose(loop, vectorized, rtol=0, atol=1e-12)
+
+    rng = np.random.default_rng(1)
+    Z = rng.normal(size=(3, len(Vm))) + 1j * rng.normal(size=(3, len(Vm)))
+    I012 = np.array([0.5 - 2j, 1 - 3j, 0.5 - 1j])
+    assert np.allclose(sequence_voltages(Z, I012, 1.0 + 0j), Kernels._sequence_voltages_numpy(Z, I012, 1.0 + 0j),
+                       rtol=0, atol=1e-12)
+
+
+def test_sparse_jacobian_matches_finite_differences(state):
+    ybus, Vm, Va = state
+    n = len(Vm)
+    J = Kernels.sparse_jacobian(ybus, Vm, Va).toarray()
+
+    eps = 1e-7
+    x = np.concatenate([Va, Vm])
+    base = np.concatenate(Kernels.csr_injections(ybus, Vm, Va))
+    numeric = np.empty((2 * n, 2 * n))
+    for k in range(2 * n):
+        step = x.copy()
+        step[k] += eps
+        numeric[:, k] = (np.concatenate(Kernels.csr_injections(ybus, step[n:], step[:n])) - base) / eps
+    assert np.allclose(J, numeric, atol=1e-5)
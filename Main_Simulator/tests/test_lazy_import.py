@@ -0,0 +1,15 @@
+import sys
+
+from Classes.lazy_import import LazyModule, lazy_import
+
+
+def test_imported_module_is_returned_as_is():
+    assert lazy_import("json") is __import__("json")
+    assert lazy_import("sys") is sys
+
+
+def test_module_is_imported_on_first_access():
+    module = lazy_import("colorsys") if "colorsys" not in sys.modules else LazyModule("colorsys")
+    assert isinstance(module, LazyModule) and "not loaded" in repr(module)
+    assert module.rgb_to_hsv(1, 0, 0) == (0.0, 1.0, 1.0)
+    assert "colorsys" in sys.modules and "(loaded)" in repr(module)
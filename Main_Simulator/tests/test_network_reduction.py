@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from Classes.NetworkReduction import kron_reduce
+from Classes.Newton_Raphson import NewtonRaphson
+from Classes.PowerFlowSolver import PowerFlowSolver
+
+
+def solve(circuit):
+    solver = NewtonRaphson(PowerFlowSolver(1, circuit))
+    solver.solve(tol=1e-10)
+    result = solver.results()
+    return dict(zip(result.names.tolist(), result.complex_voltage.tolist()))
+
+
+def test_kron_reduction_keeps_the_retained_response():
+    rng = np.random.default_rng(0)
+    A = rng.normal(size=(6, 6)) + 1j * rng.normal(size=(6, 6))
+    Y = A @ A.T + 6 * np.eye(6)
+    keep, eliminate = [0, 2, 5], [1, 3, 4]
+    Y_eq, T = kron_reduce(Y, keep, eliminate)
+    # With no injections at the eliminated buses, Y_eq maps the retained voltages to currents
+    V = np.linalg.solve(Y, np.array([1, 0, 2, 0, 0, 1j]))
+    assert np.allclose(Y_eq @ V[keep], np.array([1, 2, 1j]))
+    assert np.allclose(T, Y[np.ix_(keep, eliminate)] @ np.linalg.inv(Y[np.ix_(eliminate, eliminate)]))
+
+
+def test_ward_equivalent_reproduces_the_retained_voltages(seven_bus):
+    full = solve(seven_bus)
+    reduced = solve(seven_bus.reduce(["Bus 3"], voltages=full))
+    assert set(reduced) == set(full) - {"Bus 3"}
+    for bus, V in reduced.items():
+        assert V == pytest.approx(full[bus], abs=1e-9)
+
+
+@pytest.mark.parametrize("bus", ["Bus 1", "Bus 7"])
+def test_generator_buses_cannot_be_eliminated(seven_bus, bus):
+    with pytest.raises(ValueError, match="cannot be eliminated"):
+        seven_bus.reduce([bus])
+
+
+def test_sparse_input_and_parent_left_untouched(seven_bus):
+    from scipy import sparse
+    Y = np.asarray(seven_bus.calc_ybus(), dtype=complex)
+    keep, eliminate = [0, 1, 3, 4, 5, 6], [2]
+    dense, T = kron_reduce(Y, keep, eliminate)
+    from_sparse, T_sparse = kron_reduce(sparse.csr_matrix(Y), keep, eliminate)
+    assert np.allclose(dense, from_sparse) and np.allclose(T, T_sparse)
+
+    seven_bus.ybus = None
+    seven_bus.reduce(["Bus 3"])
+    assert seven_bus.ybus is None
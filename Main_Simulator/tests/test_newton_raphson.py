@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from Classes.Newton_Raphson import NewtonRaphson
+from Classes.PowerFlowSolver import PowerFlowSolver
+
+# Converged power flow of the seven-bus case (|V| pu, δ degrees), Bus 1 to Bus 7
+VOLTAGE = [1.0, 0.9369206, 0.9204888, 0.9297988, 0.9267275, 0.9396814, 1.0]
+ANGLE = [0.0, -4.44496, -5.46570, -4.70419, -4.83548, -3.95310, 2.14931]
+
+
+@pytest.mark.parametrize("method", ["newton", "iwamoto", "dishonest"])
+def test_power_flow(seven_bus, method):
+    solver = NewtonRaphson(PowerFlowSolver(1, seven_bus))
+    solver.solve(tol=1e-8, method=method)
+    result = solver.results()
+    assert result.converged
+    assert result.names.tolist() == [f"Bus {k}" for k in range(1, 8)]
+    assert np.allclose(result["voltage"], VOLTAGE, atol=1e-6)
+    assert np.allclose(np.degrees(result["delta"]), ANGLE, atol=1e-4)
+    # Scheduled injections are met: loads at Bus 3-5, 200 MW at Bus 7
+    assert np.allclose(result["p"][1:], [0, -1.1, -1.0, -1.0, 0, 2.0], atol=1e-7)
+
+
+def test_newton_iterations(seven_bus):
+    solver = NewtonRaphson(PowerFlowSolver(1, seven_bus))
+    solver.solve(tol=1e-8)
+    assert solver.results().iterations == 4
+
+
+def test_reactive_limit_switches_the_generator_bus(seven_bus):
+    # G2 needs about 108.8 Mvar to hold 1.0 pu; with 80 Mvar Bus 7 becomes a PQ bus
+    seven_bus.generators["G2"].q_max = 80
+    solver = NewtonRaphson(PowerFlowSolver(1, seven_bus))
+    assert solver.solve(tol=1e-8, enforce_q_limits=True)
+    result = solver.results()
+    k = result.index("Bus 7")
+    assert solver.q_limited == {"Bus 7": "Q max"}
+    assert seven_bus.generators["G2"].Q == pytest.approx(80, abs=1e-5)
+    assert result["q"][k] == pytest.approx(0.8, abs=1e-7)
+    assert result["voltage"][k] < 1.0
+    assert result["p"][k] == pytest.approx(2.0, abs=1e-7)
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from Classes.CaseImporter import read_matpower
+from Classes.OptimalPowerFlow import DCOptimalPowerFlow, dc_opf, economic_dispatch
+
+# Three buses joined by equal reactances; the cheap unit at bus 1 is limited by the
+# 60 MW rating of line 1-3
+CONGESTED_CASE = """function mpc = congested
+mpc.baseMVA = 100;
+mpc.bus = [
+	1	3	0	0	0	0	1	1	0	230	1	1.1	0.9;
+	2	2	0	0	0	0	1	1	0	230	1	1.1	0.9;
+	3	1	150	50	0	0	1	1	0	230	1	1.1	0.9;
+];
+mpc.gen = [
+	1	0	0	300	-300	1.0	100	1	200	0	0	0	0	0	0	0	0	0	0	0	0;
+	2	0	0	300	-300	1.0	100	1	200	0	0	0	0	0	0	0	0	0	0	0	0;
+];
+mpc.branch = [
+	1	3	0	0.1	0	60	60	60	0	0	1	-360	360;
+	2	3	0	0.1	0	0	0	0	0	0	1	-360	360;
+	1	2	0	0.1	0	0	0	0	0	0	1	-360	360;
+];
+mpc.gencost = [
+	2	0	0	2	10	0;
+	2	0	0	2	30	0;
+];
+"""
+
+
+@pytest.fixture
+def congested_case(tmp_path):
+    path = tmp_path / "congested.m"
+    path.write_text(CONGESTED_CASE)
+    # The line ratings come from rateA (0: unlimited)
+    return read_matpower(path).to_circuit()
+
+
+def test_unconstrained_dispatch_has_one_price(congested_case):
+    circuit = congested_case
+    result = economic_dispatch(circuit)
+    assert result.dispatch() == pytest.approx({"G1": 150, "G2": 0})
+    assert np.allclose(result.lmp, 10)
+
+
+def test_congestion_separates_the_prices(congested_case):
+    circuit = congested_case
+    assert np.array_equal(circuit.compile().branch_rating, [60, np.nan, np.nan], equal_nan=True)
+    result = dc_opf(circuit)
+    # Flow on 1-3 is 2/3 P1 + 1/3 P2 = 60 MW with P1 + P2 = 150 MW
+    assert result.dispatch() == pytest.approx({"G1": 30, "G2": 120})
+    assert result.flow[result.branch_names.tolist().index("1-3-1")] == pytest.approx(60)
+    # Serving 1 MW more at bus 3 within the limit takes +2 MW at bus 2 and -1 MW at bus 1
+    assert result.lmp == pytest.approx([10, 30, 50])
+    assert result.objective == pytest.approx(30 * 10 + 120 * 30)
+
+
+def test_binding_set_carries_over_between_scenarios(congested_case):
+    opf = DCOptimalPowerFlow(congested_case)
+    light, heavy = opf.solve_scenarios([[0, 0, 60], [0, 0, 150]])
+    assert light.lmp == pytest.approx([10, 10, 10])
+    assert heavy.lmp == pytest.approx([10, 30, 50])
+    assert opf.active.tolist() == [0]
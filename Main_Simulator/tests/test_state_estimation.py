@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from Classes.Newton_Raphson import NewtonRaphson
+from Classes.PowerFlowSolver import PowerFlowSolver
+from Classes.StateEstimation import MeasurementSet, StateEstimator
+
+
+@pytest.fixture
+def measured(seven_bus):
+    """Compiled seven-bus network, its power-flow voltages and an exact measurement set."""
+    solver = NewtonRaphson(PowerFlowSolver(1, seven_bus))
+    solver.solve(tol=1e-10)
+    result = solver.results()
+    network = seven_bus.compile()
+    assert result.names.tolist() == network.bus_names.tolist()
+    V = result["voltage"] * np.exp(1j * result["delta"])
+
+    S = V * np.conj(network.ybus["pf"] @ V)
+    stamps = network.branch_stamps["pf"]
+    Vf, Vt = V[network.branch_from], V[network.branch_to]
+    Sf = Vf * np.conj(stamps[:, 0, 0] * Vf + stamps[:, 0, 1] * Vt)
+
+    records = []
+    for name, v, s in zip(network.bus_names, np.abs(V), S):
+        records += [("v", name, v, 0.004), ("p", name, s.real, 0.01), ("q", name, s.imag, 0.01)]
+    for name, s in zip(network.branch_names, Sf):
+        records += [("pf", name, s.real, 0.008), ("qf", name, s.imag, 0.008)]
+    return network, V, MeasurementSet.from_records(records)
+
+
+def test_exact_measurements_recover_the_power_flow(measured):
+    network, V, measurements = measured
+    estimator = StateEstimator(network, measurements)
+    result = estimator.estimate(tol=1e-10)
+    assert result.converged
+    assert np.allclose(result["voltage"], np.abs(V), atol=1e-8)
+    assert np.allclose(result["delta"], np.angle(V), atol=1e-8)
+    assert estimator.objective < 1e-12
+
+
+def test_measurement_stream_warm_starts(measured):
+    network, V, measurements = measured
+    estimator = StateEstimator(network, measurements)
+    estimator.estimate()
+    first = estimator.iterations
+    ordering = estimator._ordering
+
+    noise = np.random.default_rng(0).normal(scale=measurements.sigmas)
+    result = estimator.estimate(measurements.values + noise)
+    assert result.converged
+    assert estimator.iterations < first
+    assert estimator._ordering is ordering
+    # Redundant measurements filter the noise: the estimate stays close to the true state
+    assert np.abs(result["voltage"] - np.abs(V)).max() < 0.004
+    assert estimator.objective == pytest.approx(np.sum((estimator.residuals / measurements.sigmas) ** 2))
+
+
+def test_unobservable_measurement_set(measured):
+    network, _, measurements = measured
+    with pytest.raises(ValueError):
+        StateEstimator(network, MeasurementSet(measurements.kinds[:5], measurements.locations[:5],
+                                               measurements.values[:5], measurements.sigmas[:5]))
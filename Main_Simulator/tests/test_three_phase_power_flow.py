@@ -0,0 +1,52 @@
+import numpy as np
+
+from Classes.Newton_Raphson import NewtonRaphson
+from Classes.PowerFlowSolver import PowerFlowSolver
+from Classes.ThreePhasePowerFlow import ThreePhasePowerFlow
+
+
+def balanced_power_flow(circuit):
+    solver = NewtonRaphson(PowerFlowSolver(1, circuit))
+    solver.solve(tol=1e-10)
+    return solver.results()
+
+
+def test_transposed_lines_reproduce_the_balanced_power_flow(seven_bus):
+    reference = balanced_power_flow(seven_bus)
+    for line in seven_bus.transmission_lines.values():
+        line.connection_type = "transposed"
+    solver = ThreePhasePowerFlow(seven_bus)
+    assert solver.solve()
+    result = solver.results()
+
+    assert result.names.tolist() == reference.names.tolist()
+    assert result.unbalance.max() < 1e-12
+    assert np.allclose(np.abs(result["va"]), reference["voltage"], atol=1e-5)
+    # The 230 kV buses lie behind the delta-wye units and are shifted by their -30°
+    shift = np.degrees(np.angle(result["va"])) - np.degrees(reference["delta"])
+    assert np.allclose(shift, [0, 30, 30, 30, 30, 30, 0], atol=1e-3)
+    p = (result["sa"] + result["sb"] + result["sc"]).real
+    assert np.allclose(p, reference["p"], atol=1e-5)
+
+
+def test_untransposed_lines_unbalance_the_voltages(seven_bus):
+    solver = ThreePhasePowerFlow(seven_bus)
+    assert solver.solve()
+    unbalance = solver.results().unbalance
+    # The slack bus is held balanced; the line couplings unbalance the 230 kV buses
+    assert unbalance[0] < 1e-12
+    assert np.all(unbalance[1:6] > 1e-4)
+
+
+def test_unbalanced_loads_are_served_per_phase(seven_bus):
+    seven_bus.add_unbalanced_load("U1", "Bus 4", (30, 10, 5), (10, 3, 2))
+    solver = ThreePhasePowerFlow(seven_bus)
+    assert solver.solve()
+    result = solver.results()
+    k = result.index("Bus 4")
+    # Load 4 (100 + j70 MVA, balanced) plus U1, in pu of the three-phase base
+    served = -np.array([result["sa"][k], result["sb"][k], result["sc"][k]]) * 100
+    expected = (100 + 70j) / 3 + np.array([30 + 10j, 10 + 3j, 5 + 2j])
+    assert np.allclose(served, expected, atol=1e-5)
+    assert result.converged and result.iterations < 10
+    assert np.abs(solver.mismatch()).max() < 1e-8
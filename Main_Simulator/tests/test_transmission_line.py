@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from Classes.transmission_line import equivalent_pi, equivalent_pi_matrix, phase_from_sequence
+
+
+def test_equivalent_pi_matches_the_distributed_line():
+    # Totals of lines up to a few hundred miles, shaped (lines, frequencies)
+    z = np.array([[0.02 + 0.3j, 0.02 + 1.5j], [0.05 + 0.8j, 0.05 + 4.0j]])
+    y = np.array([[0.9j, 4.5j], [2.0j, 10.0j]])
+    z_pi, y_pi = equivalent_pi(z, y)
+    gl = np.sqrt(z * y)
+    # ABCD parameters of the exact line: A = cosh γl, B = Zc sinh γl
+    assert np.allclose(z_pi, np.sqrt(z / y) * np.sinh(gl))
+    assert np.allclose(1 + z_pi * y_pi / 2, np.cosh(gl))
+
+
+def test_short_lines_and_lines_without_charging():
+    z_pi, y_pi = equivalent_pi([1e-4 + 1e-3j, 0.1 + 0.5j], [1e-6j, 0])
+    assert z_pi == pytest.approx([1e-4 + 1e-3j, 0.1 + 0.5j], rel=1e-9)
+    assert y_pi == pytest.approx([1e-6j, 0], rel=1e-9)
+
+
+def test_matrix_form_of_decoupled_phases():
+    z0, z1 = 0.06 + 0.9j, 0.02 + 0.3j
+    y0, y1 = 0.5j, 0.9j
+    z_pi, y_pi = equivalent_pi_matrix(phase_from_sequence(z0, z1, z1), phase_from_sequence(y0, y1, y1))
+    (z0_pi, z1_pi), (y0_pi, y1_pi) = equivalent_pi([z0, z1], [y0, y1])
+    assert np.allclose(z_pi, phase_from_sequence(z0_pi, z1_pi, z1_pi))
+    assert np.allclose(y_pi, phase_from_sequence(y0_pi, y1_pi, y1_pi))
+
+
+def test_long_line_model_of_a_line(seven_bus):
+    line = seven_bus.transmission_lines["L6"]
+    nominal = line.stamps["pf"].copy()
+    line.set_length(300)
+    line.set_line_model("long")
+
+    z_pi, y_pi = equivalent_pi(line.z_pu_sys, 1j * line.b_shunt_pu)
+    assert line.y_pu_sys == pytest.approx(1 / z_pi)
+    assert line.y_shunt_pu == pytest.approx(y_pi)
+    assert line.stamps["pf"][0, 0] == pytest.approx(1 / z_pi + y_pi / 2)
+    # The sequence networks carry no charging and keep the series correction only
+    assert line.stamps["positive"][0, 1] == pytest.approx(-1 / z_pi)
+
+    line.set_length(35)
+    line.set_line_model("nominal")
+    assert np.allclose(line.stamps["pf"], nominal)
+    with pytest.raises(ValueError):
+        line.set_line_model("medium")